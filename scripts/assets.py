@@ -0,0 +1,280 @@
+"""
+Asset Collector
+
+Finds images and diagrams referenced by a deck, backing the gc command of
+manage-slides.py and the reference rewriting of the image optimizer.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from deck import CACHE_DIR_NAME, ExitCode, SlideManager, atomic_write_text, format_size
+from snapshots import SnapshotStore
+
+
+class AssetCollector:
+    """
+    Reference index and garbage collector for public/images/ and diagrams/
+
+    slides.md and every slides/*.md file are scanned (in parallel) for
+    references to images/... and diagrams/... paths. Per-file results are
+    cached in .slidev-cache/assets.json by mtime and size, so repeated runs
+    only re-scan edited slides.
+
+    For gc, references in these count as well, so nothing that undo or the
+    theme would bring back is deleted:
+        - slide files and slides.md versions kept in the undo history
+          (.slidev-history/), cached by content hash
+        - layouts/, components/, styles/, setup/ and the global Vue/CSS
+          files next to slides.md
+
+    Liveness rules:
+        public/images/<name>/   live if anything below it is referenced
+                                (keeps alternative platform renders together)
+        public/images/<file>    live if referenced
+        diagrams/<slug>.*       live if referenced, or if public/images/<slug>/ is live
+    """
+
+    VERSION = 2
+    IMAGE_REF_RE = re.compile(r'\b(images/[^\s)"\'<>?#`]+)')
+    DIAGRAM_REF_RE = re.compile(r'\b(diagrams/[^\s)"\'<>?#`]+)')
+    # Deck-wide Slidev sources that may reference assets
+    GLOBAL_DIRS = ('layouts', 'components', 'styles', 'setup')
+    GLOBAL_FILES = ('global-top.vue', 'global-bottom.vue', 'custom-nav-controls.vue', 'style.css')
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.images_dir = self.root / 'public' / 'images'
+        self.diagrams_dir = self.root / 'diagrams'
+        self.cache_file = self.root / CACHE_DIR_NAME / 'assets.json'
+        self.rescanned = 0
+        self.history_only: List[tuple[Path, int]] = []
+
+    @classmethod
+    def scan_references(cls, path: Path) -> List[str]:
+        """
+        Extract asset references from one file
+
+        Returns:
+            Sorted list of normalized 'images/...' and 'diagrams/...' paths
+        """
+        return cls.scan_text(path.read_text(errors='replace'))
+
+    @classmethod
+    def scan_text(cls, text: str) -> List[str]:
+        """Extract asset references from slide Markdown"""
+        refs = set()
+        for regex in (cls.IMAGE_REF_RE, cls.DIAGRAM_REF_RE):
+            for ref in regex.findall(text):
+                refs.add(ref.rstrip('.,;:!\'"'))
+        return sorted(refs)
+
+    def _load_cache(self) -> dict:
+        """Load assets.json (silently starts empty if missing or stale)"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('version') == self.VERSION:
+                return cached
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_cache(self, cached: dict):
+        cached['version'] = self.VERSION
+        self.cache_file.parent.mkdir(exist_ok=True)
+        atomic_write_text(self.cache_file, json.dumps(cached, separators=(',', ':')))
+
+    def reference_index(self) -> Dict[str, List[str]]:
+        """
+        Build the reference index, re-scanning only files changed since the last run
+
+        Returns:
+            Dict mapping scanned file (relative path) to its references
+        """
+        cached = self._load_cache()
+        cached_files = cached.get('files', {})
+
+        sources = [self.manager.slides_md]
+        if self.manager.slides_dir.exists():
+            sources += sorted(self.manager.slides_dir.glob('*.md'))
+
+        files = {}
+        stale = []
+        for path in sources:
+            rel = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            entry = cached_files.get(rel)
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                files[rel] = entry
+            else:
+                files[rel] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+                stale.append((rel, path))
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+                for (rel, _), refs in zip(stale, pool.map(lambda item: self.scan_references(item[1]), stale)):
+                    files[rel]['refs'] = refs
+            self.rescanned = len(stale)
+
+        if stale or set(files) != set(cached_files):
+            cached['files'] = files
+            self._save_cache(cached)
+
+        return {rel: entry['refs'] for rel, entry in files.items()}
+
+    def history_references(self) -> set:
+        """
+        References in the slide files and slides.md versions kept by the undo history
+
+        Snapshot blobs never change, so their references are cached by content hash.
+        """
+        blobs = SnapshotStore(self.manager).retained_blobs()
+        cached = self._load_cache()
+        cached_blobs = cached.get('blobs', {})
+        blob_refs = {digest: cached_blobs[digest] for digest in blobs if digest in cached_blobs}
+        for digest, path in blobs.items():
+            if digest not in blob_refs:
+                try:
+                    blob_refs[digest] = self.scan_references(path)
+                except FileNotFoundError:
+                    blob_refs[digest] = []
+        if set(blob_refs) != set(cached_blobs):
+            cached['blobs'] = blob_refs
+            self._save_cache(cached)
+        return {ref for refs in blob_refs.values() for ref in refs}
+
+    def global_references(self) -> set:
+        """References in layouts/, components/, styles/, setup/ and the global Vue/CSS files"""
+        paths = [self.root / name for name in self.GLOBAL_FILES if (self.root / name).is_file()]
+        for name in self.GLOBAL_DIRS:
+            if (self.root / name).is_dir():
+                paths += sorted(p for p in (self.root / name).rglob('*') if p.is_file())
+        return {ref for path in paths for ref in self.scan_references(path)}
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+        return path.stat().st_size
+
+    def _orphans(self, refs: set) -> List[Path]:
+        """Assets not live under the liveness rules for a set of references"""
+        live_images = {ref.split('/')[1] for ref in refs if ref.startswith('images/')}
+        live_diagrams = {ref.split('/')[1] for ref in refs if ref.startswith('diagrams/')}
+
+        orphans = []
+        if self.images_dir.is_dir():
+            for path in sorted(self.images_dir.iterdir()):
+                if path.name not in live_images:
+                    orphans.append(path)
+
+        if self.diagrams_dir.is_dir():
+            for path in sorted(self.diagrams_dir.iterdir()):
+                slug = path.name.split('.', 1)[0]
+                if path.name not in live_diagrams and slug not in live_images:
+                    orphans.append(path)
+
+        return orphans
+
+    def find_unreferenced(self) -> List[tuple[Path, int]]:
+        """
+        List assets nothing refers to: no slide, no undo snapshot, no layout or component
+
+        Assets only the undo history still refers to are kept in self.history_only.
+
+        Returns:
+            List of (path, size in bytes), directories before the files in diagrams/
+        """
+        refs = {ref for file_refs in self.reference_index().values() for ref in file_refs}
+        refs |= self.global_references()
+        candidates = self._orphans(refs)
+        if not candidates:
+            return []
+
+        kept = set(self._orphans(refs | self.history_references()))
+        self.history_only = [(path, self._size(path)) for path in candidates if path not in kept]
+        return [(path, self._size(path)) for path in candidates if path in kept]
+
+    def delete(self, paths: List[Path]):
+        """
+        Remove assets: tracked paths with one git rm call, the rest directly
+        """
+        rel_paths = [str(p.relative_to(self.root)) for p in paths]
+        result = subprocess.run(
+            ['git', 'ls-files', '--'] + rel_paths,
+            capture_output=True,
+            text=True,
+            cwd=self.root
+        )
+        tracked_files = set(result.stdout.splitlines()) if result.returncode == 0 else set()
+        tracked = [rel for rel in rel_paths
+                   if rel in tracked_files or any(f.startswith(rel + '/') for f in tracked_files)]
+
+        if tracked:
+            try:
+                subprocess.run(
+                    ['git', 'rm', '-r', '-q', '-f', '--'] + tracked,
+                    check=True,
+                    capture_output=True,
+                    cwd=self.root
+                )
+            except subprocess.CalledProcessError as e:
+                print(f"Git remove failed: {e.stderr.decode()}", file=sys.stderr)
+                sys.exit(ExitCode.GIT_ERROR)
+
+        # Untracked files, and untracked leftovers inside tracked directories
+        for path in paths:
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+
+
+def run_gc(manager: SlideManager, delete: bool, as_json: bool):
+    """Report unreferenced assets and optionally remove them"""
+    collector = AssetCollector(manager)
+    orphans = collector.find_unreferenced()
+    total = sum(size for _, size in orphans)
+    kept_total = sum(size for _, size in collector.history_only)
+
+    if as_json:
+        print(json.dumps({
+            'unreferenced': [
+                {'path': path.relative_to(collector.root).as_posix() + ('/' if path.is_dir() else ''),
+                 'size': size}
+                for path, size in orphans
+            ],
+            'total_size': total,
+            'kept_for_undo': [
+                {'path': path.relative_to(collector.root).as_posix() + ('/' if path.is_dir() else ''),
+                 'size': size}
+                for path, size in collector.history_only
+            ],
+            'deleted': delete,
+        }, indent=2))
+    elif not orphans:
+        print("✓ No unreferenced assets in public/images/ or diagrams/")
+    else:
+        print(f"Unreferenced assets ({len(orphans)}, {format_size(total)}):")
+        for path, size in orphans:
+            rel = path.relative_to(collector.root).as_posix() + ('/' if path.is_dir() else '')
+            print(f"  {rel:<60} {format_size(size):>10}")
+
+    if delete and orphans:
+        collector.delete([path for path, _ in orphans])
+        if not as_json:
+            print(f"\n✓ Removed {len(orphans)} assets ({format_size(total)})")
+    elif orphans and not as_json:
+        print("\nRun with --delete to remove them (git rm for tracked files).")
+
+    if collector.history_only and not as_json:
+        print(f"\nKept {len(collector.history_only)} asset(s) ({format_size(kept_total)}) that only slides "
+              f"in the undo history still use; they become collectable once those snapshots are dropped.")
@@ -0,0 +1,324 @@
+"""
+Deck Bundler
+
+Converts between the one-file-per-slide layout (slides.md with src: entries)
+and a single inlined slides.md, backing the bundle and explode commands of
+manage-slides.py.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from deck import ExitCode, SlideManager, atomic_write_text, split_slide
+from slugs import SlugIndex
+
+
+SLIDE_MARKER_RE = re.compile(r'^<!--\s*Slide\s+(\d+):\s*(.+?)\s*-->\s*$')
+SRC_MARKER_RE = re.compile(r'^<!--\s*src:\s*slides/\d+-([a-z0-9][a-z0-9-]*)\.md(?:\s+entry:\s*([\w\s,-]*?))?\s*-->\s*$')
+FRONTMATTER_KEY_RE = re.compile(r'^([A-Za-z_][\w-]*)\s*:')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+
+
+def iter_inline_slides(lines):
+    """
+    Split an inlined Slidev deck into slides, one slide at a time
+
+    Slides are separated by '---' lines outside code fences. A separator
+    directly followed by 'key: value' lines and a closing '---' opens the
+    slide's frontmatter; a blank line before the closing '---' means the
+    lines were body text after all.
+
+    Args:
+        lines: Iterable of lines (with line endings), e.g. an open file
+
+    Yields:
+        (frontmatter lines or None, body lines); the first item is the headmatter slide
+    """
+    it = iter(lines)
+    line = next(it, None)
+    at_start = True
+    while True:
+        frontmatter = None
+        body = []
+        if line is not None and (line.rstrip('\n') == '---' if at_start else FRONTMATTER_KEY_RE.match(line)):
+            candidate = [] if at_start else [line]
+            line = next(it, None)
+            while line is not None and line.rstrip('\n') != '---' and (at_start or line.strip()):
+                candidate.append(line)
+                line = next(it, None)
+            if line is not None and line.rstrip('\n') == '---':
+                frontmatter = candidate
+                line = next(it, None)
+            else:
+                body = candidate
+        at_start = False
+
+        fence = None
+        while line is not None:
+            stripped = line.rstrip('\n')
+            if fence:
+                if stripped.lstrip().startswith(fence):
+                    fence = None
+            elif match := FENCE_RE.match(stripped):
+                fence = match.group(1)
+            elif stripped == '---':
+                break
+            body.append(line)
+            line = next(it, None)
+
+        yield frontmatter, body
+        if line is None:
+            return
+        line = next(it, None)
+
+
+def merge_frontmatter(file_lines: List[str], entry_lines: List[str]) -> List[str]:
+    """
+    Frontmatter of a src slide as Slidev sees it: keys of the slides.md entry win
+
+    Args:
+        file_lines: Frontmatter lines of the slide file
+        entry_lines: Keys of the src entry other than src:
+
+    Returns:
+        The file's lines whose key the entry does not set, then the entry's lines
+    """
+    entry_keys = {match.group(1) for line in entry_lines if (match := FRONTMATTER_KEY_RE.match(line))}
+    merged = []
+    shadowed = False
+    for line in file_lines:
+        if match := FRONTMATTER_KEY_RE.match(line):
+            shadowed = match.group(1) in entry_keys
+        if not shadowed:
+            merged.append(line)
+    return merged + entry_lines
+
+
+def split_entry_keys(lines: List[str], keys: set) -> tuple:
+    """
+    Split merged frontmatter back into the src entry's keys and the file's
+
+    Args:
+        lines: Frontmatter lines of a bundled slide
+        keys: Keys that came from the slides.md entry
+
+    Returns:
+        (entry lines, file lines); continuation lines go with their key
+    """
+    entry, rest = [], []
+    target = rest
+    for line in lines:
+        if match := FRONTMATTER_KEY_RE.match(line):
+            target = entry if match.group(1) in keys else rest
+        target.append(line)
+    return entry, rest
+
+
+class DeckBundler:
+    """
+    Convert between one file per slide (src: entries) and a single inlined slides.md
+
+    Both directions make one streaming pass: bundle copies the slide files
+    line by line into the output, explode holds one slide at a time in memory.
+    Bundled slides keep their <!-- Slide N: Title --> marker as the first line
+    after their frontmatter, followed by <!-- src: slides/NN-slug.md -->, which
+    explode uses to give the files their old names again. Keys of the src:
+    entry in slides.md are merged into the slide's frontmatter (the entry
+    wins, as in Slidev) and listed in the marker ("entry: layout, hide") so
+    explode can put them back on the entry; file keys they override are
+    dropped, Slidev never showed them. Slide files are
+    removed with git rm and created ones staged with git add, as the other
+    slide operations do.
+    """
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+
+    def bundle(self, output: Path, in_place: bool = False):
+        """
+        Inline every slide file into one deck
+
+        Args:
+            output: Bundled deck to write (ignored with in_place)
+            in_place: Replace slides.md and remove the slide files
+        """
+        slides = self.manager.parse_slides_md()
+        if not slides:
+            print("Error: slides.md has no src entries (already bundled?)", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        if in_place:
+            output = self.manager.slides_md
+        tmp = output.with_name(f'.{output.name}.tmp.{os.getpid()}')
+        try:
+            with open(tmp, 'w') as out:
+                out.write(self.manager.read_preamble().rstrip('\n') + '\n')
+                for slide in slides:
+                    path = self.root / slide.src
+                    entry = [line + '\n' for line in slide.frontmatter.splitlines() if line.strip()]
+                    entry_keys = [match.group(1) for line in entry if (match := FRONTMATTER_KEY_RE.match(line))]
+                    out.write('\n---\n')
+                    with open(path, 'r') as f:
+                        line = f.readline()
+                        frontmatter = None
+                        if line.rstrip('\n') == '---':
+                            frontmatter = []
+                            for line in f:
+                                if line.rstrip('\n') == '---':
+                                    break
+                                frontmatter.append(line)
+                            line = ''
+                        if frontmatter is not None or entry:
+                            out.write(''.join(merge_frontmatter(frontmatter or [], entry)) + '---\n')
+                        out.write(f'<!-- Slide {slide.number}: {slide.title} -->\n')
+                        if entry_keys:
+                            out.write(f'<!-- src: {slide.src} entry: {", ".join(entry_keys)} -->\n')
+                        else:
+                            out.write(f'<!-- src: {slide.src} -->\n')
+                        out.write(line)
+                        for line in f:
+                            out.write(line)
+                        if line and not line.endswith('\n'):
+                            out.write('\n')
+            os.replace(tmp, output)
+        except FileNotFoundError as e:
+            tmp.unlink(missing_ok=True)
+            print(f"Error: Slide file not found: {e.filename}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        if in_place:
+            self._remove_files([self.root / slide.src for slide in slides])
+            self._stage_files([output])
+            print(f"✓ Bundled {len(slides)} slides into {output.name}; slide files removed")
+        else:
+            print(f"✓ Bundled {len(slides)} slides into {output}")
+
+    def explode(self, source: Optional[Path] = None):
+        """
+        Split an inlined deck into numbered slide files and rewrite slides.md with src entries
+
+        Slide files are named NN-<slug>.md from 02 on. A slide bundled from a
+        file keeps that file's slug (from its <!-- src: ... --> marker); other
+        slides get a slug of their title that is unique in the deck. The title
+        comes from the slide's <!-- Slide N: Title --> marker, else its first
+        heading, else its title: frontmatter. Keys the bundle marker lists as
+        entry keys go back on the src: entry. Slides that already are src:
+        entries are kept with all their keys.
+
+        Args:
+            source: Inlined deck to split (default: slides.md)
+        """
+        source = source or self.manager.slides_md
+        previous = self.manager.parse_slides_md()
+        if source == self.manager.slides_md and previous:
+            print("Error: slides.md already uses one file per slide (src entries)", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        self.manager.slides_dir.mkdir(exist_ok=True)
+        # Files of the replaced layout are rewritten or removed: their slugs are free
+        slug_index = SlugIndex(self.root)
+        slug_index.taken -= {re.sub(r'^\d+-', '', Path(slide.src).stem) for slide in previous}
+        # Names recorded by bundle are kept, so new slides must not take them
+        with open(source, 'r') as f:
+            slug_index.taken.update(match.group(1) for line in f if (match := SRC_MARKER_RE.match(line)))
+        used = set()  # Slugs of the slide files written so far
+        tmp = self.manager.slides_md.with_name(f'.{self.manager.slides_md.name}.tmp.{os.getpid()}')
+        written = set()
+        count = 0
+        with open(source, 'r') as f, open(tmp, 'w') as out:
+            for index, (frontmatter, body) in enumerate(iter_inline_slides(f)):
+                while body and not body[-1].strip():
+                    body.pop()
+                if index == 0:
+                    if frontmatter is not None:
+                        out.write('---\n' + ''.join(frontmatter) + '---\n')
+                    out.write(''.join(body))
+                    continue
+
+                number = index + 1
+                title = None
+                if body and (match := SLIDE_MARKER_RE.match(body[0])):
+                    title = match.group(2)
+                    body = body[1:]
+                recorded = None
+                entry_keys = set()
+                if body and (match := SRC_MARKER_RE.match(body[0])):
+                    recorded = match.group(1)
+                    entry_keys = {key.strip() for key in (match.group(2) or '').split(',') if key.strip()}
+                    body = body[1:]
+                src = None
+                for line in frontmatter or []:
+                    if line.startswith('src:'):
+                        src = line.split(':', 1)[1].strip().lstrip('./')
+                        slug_index.taken.add(re.sub(r'^\d+-', '', Path(src).stem))
+                    elif title is None and (match := re.match(r'^title:\s*(.+?)\s*$', line)):
+                        title = match.group(1).strip('\'"')
+                if title is None:
+                    lines = body
+                    if src and (self.root / src).exists():
+                        lines = split_slide((self.root / src).read_text()).body.splitlines()
+                    heading = next((line for line in lines if re.match(r'^#\s+\S', line)), None)
+                    title = heading[1:].strip() if heading else f"Slide {number}"
+
+                if src is not None:
+                    entry = [line for line in frontmatter if not line.startswith('src:')]
+                else:
+                    entry = []
+                    if entry_keys:
+                        entry, frontmatter = split_entry_keys(frontmatter or [], entry_keys)
+                        frontmatter = frontmatter or None  # Only the entry had frontmatter
+                    if recorded and recorded not in used:
+                        slug = recorded
+                        slug_index.taken.add(slug)
+                    else:
+                        slug = self.manager.unique_slug(title, slug_index)
+                    used.add(slug)
+                    src = f"slides/{number:02d}-{slug}.md"
+                    if frontmatter is None:
+                        while body and not body[0].strip():
+                            body.pop(0)
+                        content = ''.join(body)
+                    else:
+                        content = '---\n' + ''.join(frontmatter) + '---\n' + ''.join(body)
+                    atomic_write_text(self.root / src, content)
+                written.add(src)
+                out.write(f'\n---\nsrc: ./{src}\n' + ''.join(entry) + f'---\n<!-- Slide {number}: {title} -->\n')
+                count += 1
+
+        os.replace(tmp, self.manager.slides_md)
+        # Files of the layout that was replaced and were not written again
+        self._remove_files([self.root / slide.src for slide in previous if slide.src not in written])
+        self._stage_files([self.manager.slides_md] + [self.root / src for src in sorted(written)])
+        print(f"✓ Exploded {count} slides from {source.name} into slides/")
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], capture_output=True, text=True, cwd=self.root)
+
+    def _remove_files(self, paths: List[Path]):
+        """Remove slide files: tracked ones with one git rm call, the rest directly"""
+        if not paths:
+            return
+        rel_paths = [str(p.relative_to(self.root)) for p in paths]
+        result = self._git('ls-files', '--', *rel_paths)
+        tracked = result.stdout.splitlines() if result.returncode == 0 else []
+        if tracked:
+            result = self._git('rm', '-q', '-f', '--', *tracked)
+            if result.returncode != 0:
+                print(f"Git remove failed: {result.stderr}", file=sys.stderr)
+                sys.exit(ExitCode.GIT_ERROR)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _stage_files(self, paths: List[Path]):
+        """Stage written files with one git add call (only inside a work tree)"""
+        if self._git('rev-parse', '--is-inside-work-tree').returncode != 0:
+            return
+        result = self._git('add', '--', *[str(p.relative_to(self.root)) for p in paths])
+        if result.returncode != 0:
+            print(f"Git add failed: {result.stderr}", file=sys.stderr)
+            sys.exit(ExitCode.GIT_ERROR)
@@ -0,0 +1,1113 @@
+"""
+Deck Model
+
+Parsing of slides.md and git-aware slide file operations (add, delete, move,
+renumber, scaffold) for Slidev presentations, plus the small file helpers
+shared by the other modules in this directory. The command line interface
+lives in manage-slides.py.
+
+IMPORTANT: Slide 1 is always the title from frontmatter (no file).
+           First slide file is ALWAYS 02-xxx.md (never 01-).
+           Renumbering preserves this gap: 02, 03, 04, ... (never 01)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from slugs import SLIDE_SLUG_MAX, SlugIndex, slide_slug
+
+
+class ExitCode:
+    """Exit code constants"""
+    SUCCESS = 0
+    GENERAL_ERROR = 1
+    INVALID_ARGS = 2
+    SLIDE_NOT_FOUND = 3
+    GIT_ERROR = 4
+    LOCKED = 5
+    CONFLICT = 6
+
+
+@dataclass
+class Slide:
+    """Represents a slide entry from slides.md"""
+    number: int
+    src: str
+    title: str
+    # Other keys of the entry's --- block (e.g. "layout: center"), one per line
+    frontmatter: str = ''
+
+
+@dataclass
+class SlideParts:
+    """Frontmatter, body and presenter notes of a single slide file"""
+    frontmatter: str
+    body: str
+    notes: str
+
+
+CACHE_DIR_NAME = '.slidev-cache'
+
+# "TIMING: 90s" / "timing: 2 min" in presenter notes
+TIMING_RE = re.compile(r'timing:\s*(\d+)\s*(s|sec|secs|seconds|m|min|mins|minutes)?\b', re.IGNORECASE)
+
+
+def split_slide(text: str) -> SlideParts:
+    """
+    Split slide file content into frontmatter, body and presenter notes
+
+    Presenter notes are the trailing <!-- ... --> comment of the slide, as
+    defined by Slidev. Comments elsewhere in the body are left untouched.
+
+    Args:
+        text: Raw slide file content
+
+    Returns:
+        SlideParts (any missing part is an empty string)
+    """
+    frontmatter = ''
+    body = text
+    if text.startswith('---\n'):
+        end = text.find('\n---', 3)
+        if end != -1:
+            frontmatter = text[4:end]
+            body = text[end + 4:].lstrip('\n')
+
+    notes = ''
+    stripped = body.rstrip()
+    if stripped.endswith('-->'):
+        start = stripped.rfind('<!--')
+        if start != -1:
+            notes = stripped[start + 4:-3].strip()
+            body = stripped[:start]
+
+    return SlideParts(frontmatter, body.strip(), notes)
+
+
+def set_slide_notes(text: str, notes: str) -> str:
+    """
+    Replace the presenter notes of a slide file
+
+    Args:
+        text: Raw slide file content
+        notes: New notes ('' removes the notes comment)
+
+    Returns:
+        Slide file content with the trailing <!-- ... --> comment replaced, added or removed
+    """
+    head = text.rstrip()
+    body_start = 0
+    if text.startswith('---\n'):
+        end = text.find('\n---', 3)
+        if end != -1:
+            body_start = end + 4
+    if head.endswith('-->'):
+        start = head.rfind('<!--')
+        if start >= body_start:
+            head = head[:start].rstrip()
+    if not notes:
+        return head + '\n'
+    return f"{head}\n\n<!--\n{notes}\n-->\n"
+
+
+def notes_timing(notes: str) -> Optional[int]:
+    """
+    Read the planned speaking time from presenter notes
+
+    Args:
+        notes: Presenter notes text
+
+    Returns:
+        Seconds from the first TIMING: marker (minutes converted), or None without one
+    """
+    match = TIMING_RE.search(notes)
+    if not match:
+        return None
+    seconds = int(match.group(1))
+    if (match.group(2) or 's').lower().startswith('m'):
+        seconds *= 60
+    return seconds
+
+
+def format_size(size: float) -> str:
+    """Human readable file size"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def atomic_write_text(path: Path, content: str):
+    """Write file content via a temporary file and rename"""
+    tmp = path.with_name(f'.{path.name}.tmp.{os.getpid()}')
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+class SlideManager:
+    """Manages slide file operations with git awareness and automatic renumbering"""
+
+    # Slide entries in slides.md; keeps file numbers within the two-digit NN- prefix scheme
+    MAX_SLIDES = 99
+
+    def __init__(self, slides_md_path: Path):
+        self.slides_md = slides_md_path
+        self.slides_dir = slides_md_path.parent / "slides"
+        self.backup_file: Optional[Path] = None
+        self.moved_files: List[tuple[Path, Path]] = []  # For rollback
+        self.created_files: List[Path] = []  # For rollback
+
+    def parse_slides_md(self, text: Optional[str] = None) -> List[Slide]:
+        """
+        Extract slide entries from slides.md
+
+        Returns slides in the order they appear, preserving any gaps in numbering.
+
+        Args:
+            text: slides.md content already read by the caller (default: read the file)
+
+        Returns:
+            List of Slide objects with number, src path, title and other entry keys
+        """
+        slides = []
+        current_src = None
+        block = None  # Lines of the --- block being read
+        frontmatter = []
+
+        if text is None:
+            with open(self.slides_md, 'r') as f:
+                text = f.read()
+
+        for line in text.splitlines():
+            line = line.rstrip()
+            if line == '---':
+                if block is None:
+                    block = []
+                else:
+                    if current_src:
+                        frontmatter = block
+                    block = None
+            elif block is not None:
+                if line.startswith('src:'):
+                    # Extract src path, remove leading './'
+                    current_src = line.split(':', 1)[1].strip().lstrip('./')
+                else:
+                    block.append(line)
+            elif match := re.match(r'<!--\s*Slide\s+(\d+):\s*(.+?)\s*-->', line):
+                number = int(match.group(1))
+                title = match.group(2)
+                if current_src:
+                    slides.append(Slide(number, current_src, title, '\n'.join(frontmatter)))
+                current_src = None
+                frontmatter = []
+
+        return slides
+
+    def detect_gaps(self, slides: List[Slide], ignore_beginning: bool = True) -> List[int]:
+        """
+        Detect gaps in slide numbering
+
+        Args:
+            slides: List of slides
+            ignore_beginning: If True, ignore gaps before the second slide
+                            (e.g., slide 1 then slide 5 is OK, but gaps in middle are not)
+
+        Returns:
+            List of missing slide numbers (empty if no gaps)
+        """
+        if not slides or len(slides) < 2:
+            return []
+
+        slide_numbers = sorted([s.number for s in slides])
+
+        if ignore_beginning:
+            # Start checking from the second slide
+            # This allows slide 1 (title) then slide 5 (first content)
+            start_num = slide_numbers[1]
+        else:
+            start_num = slide_numbers[0]
+
+        max_num = slide_numbers[-1]
+
+        # Find gaps from second slide onwards
+        existing = set(slide_numbers)
+        expected = set(range(start_num, max_num + 1))
+        gaps = sorted(expected - existing)
+
+        return gaps
+
+    def is_git_tracked(self, filepath: Path) -> bool:
+        """
+        Check if a file is tracked by git
+
+        Args:
+            filepath: Path to check
+
+        Returns:
+            True if file is git-tracked, False otherwise
+        """
+        try:
+            subprocess.run(
+                ['git', 'ls-files', '--error-unmatch', str(filepath)],
+                check=True,
+                capture_output=True,
+                cwd=self.slides_md.parent
+            )
+            return True
+        except subprocess.CalledProcessError:
+            return False
+
+    def move_file(self, src: Path, dest: Path):
+        """
+        Move file with git awareness
+
+        Args:
+            src: Source path
+            dest: Destination path
+
+        Raises:
+            subprocess.CalledProcessError: If git mv fails
+            Exception: If regular move fails
+        """
+        try:
+            if self.is_git_tracked(src):
+                subprocess.run(
+                    ['git', 'mv', str(src), str(dest)],
+                    check=True,
+                    capture_output=True,
+                    cwd=self.slides_md.parent
+                )
+            else:
+                shutil.move(str(src), str(dest))
+
+            self.moved_files.append((src, dest))  # Track for rollback
+        except subprocess.CalledProcessError as e:
+            print(f"Git move failed: {e.stderr.decode()}", file=sys.stderr)
+            raise
+        except Exception as e:
+            print(f"Move failed: {e}", file=sys.stderr)
+            raise
+
+    def backup_state(self):
+        """Backup slides.md before modifications"""
+        import time
+        self.backup_file = self.slides_md.with_suffix(f'.md.backup.{int(time.time())}')
+        shutil.copy(self.slides_md, self.backup_file)
+
+    def rollback(self):
+        """Rollback all changes on error"""
+        print("Rolling back changes...", file=sys.stderr)
+
+        # Restore slides.md
+        if self.backup_file and self.backup_file.exists():
+            shutil.move(self.backup_file, self.slides_md)
+
+        # Undo file moves (reverse order)
+        for src, dest in reversed(self.moved_files):
+            if dest.exists():
+                try:
+                    # Move back without git (rollback scenario)
+                    shutil.move(str(dest), str(src))
+                except Exception as e:
+                    print(f"Warning: Failed to rollback move {dest} -> {src}: {e}", file=sys.stderr)
+
+        # Remove created files
+        for filepath in self.created_files:
+            if filepath.exists():
+                try:
+                    filepath.unlink()
+                except Exception as e:
+                    print(f"Warning: Failed to remove {filepath}: {e}", file=sys.stderr)
+
+    def generate_slug(self, title: str) -> str:
+        """
+        Generate kebab-case slug from title
+
+        Args:
+            title: Slide title
+
+        Returns:
+            Slug string (max 40 chars)
+        """
+        return slide_slug(title)
+
+    def unique_slug(self, title: str, index: Optional[SlugIndex] = None) -> str:
+        """
+        Generate a slide slug not yet used in slides/, diagrams/ or public/images/
+
+        Args:
+            title: Slide title
+            index: Slug index to reuse across calls (scanned from the deck if omitted)
+
+        Returns:
+            Slug string (max 40 chars), suffixed -2, -3, ... on collision
+        """
+        if index is None:
+            index = SlugIndex(self.slides_md.parent)
+        return index.unique(self.generate_slug(title) or 'slide', SLIDE_SLUG_MAX)
+
+    def create_slide_file(self, filepath: Path, title: str, layout: str = 'default',
+                          body: str = 'Content here', notes: str = 'Presenter notes'):
+        """
+        Create new slide file with template
+
+        Args:
+            filepath: Path for new slide file
+            title: Slide title
+            layout: Slidev layout (default: 'default')
+            body: Slide content below the title
+            notes: Presenter notes
+        """
+        content = f"""---
+layout: {layout}
+---
+
+# {title}
+
+{body.strip()}
+
+<!--
+{notes.strip()}
+-->
+"""
+        filepath.write_text(content)
+        self.created_files.append(filepath)
+
+    def read_preamble(self) -> str:
+        """
+        Read slides.md up to its first src entry
+
+        An entry is found with the same rule as parse_slides_md(): a --- block
+        with a src: line anywhere in it (other keys such as layout: may come
+        first). The preamble ends before the --- that opens that block.
+
+        Returns:
+            Global frontmatter, global <style> block and slide 1 (the whole file if it has no src entries)
+        """
+        preamble = []
+        block_start = None  # Index of the opening --- while inside a block
+        with open(self.slides_md, 'r') as f:
+            for line in f:
+                if line.rstrip() == '---':
+                    block_start = len(preamble) if block_start is None else None
+                elif block_start is not None and line.startswith('src:'):
+                    return ''.join(preamble[:block_start])
+                preamble.append(line)
+        return ''.join(preamble)
+
+    def rebuild_slides_md(self, slides: List[Slide]):
+        """
+        Rebuild slides.md with updated slide list
+
+        Everything before the first src: entry (global frontmatter, global
+        <style> block, slide 1 comment) is preserved as is. Entry keys other
+        than src: are written back after it.
+
+        Args:
+            slides: List of Slide objects to write
+        """
+        # Preserve global frontmatter and anything before the first slide entry
+        preamble = self.read_preamble().splitlines(keepends=True)
+        while preamble and not preamble[-1].strip():
+            preamble.pop()
+        if preamble and not preamble[-1].endswith('\n'):
+            preamble[-1] += '\n'
+
+        # Write new slides.md (atomically, lock-free readers never see a partial file)
+        content = preamble
+        for slide in slides:
+            content.append('\n')
+            content.append('---\n')
+            content.append(f'src: ./{slide.src}\n')
+            if slide.frontmatter:
+                content.append(slide.frontmatter + '\n')
+            content.append('---\n')
+            content.append(f'<!-- Slide {slide.number}: {slide.title} -->\n')
+        atomic_write_text(self.slides_md, ''.join(content))
+
+    def deck_hash(self, slides_md_content: Optional[bytes] = None) -> str:
+        """
+        Content hash of the deck (slides.md plus name and content of every slides/*.md)
+
+        Used for optimistic concurrency: read it without locking, pass it back
+        with --expect-hash, and the operation fails if anything changed since.
+
+        Args:
+            slides_md_content: slides.md bytes already read by the caller (default: read the file)
+
+        Returns:
+            16 hex digit hash
+        """
+        # Readers do not lock, so a concurrent writer may rename a file
+        # between listing and reading it; just start over in that case
+        for attempt in range(10):
+            try:
+                if slides_md_content is None:
+                    digest = hashlib.sha256(self.slides_md.read_bytes())
+                else:
+                    digest = hashlib.sha256(slides_md_content)
+                if self.slides_dir.exists():
+                    for path in sorted(self.slides_dir.glob('*.md')):
+                        digest.update(path.name.encode() + b'\0')
+                        digest.update(hashlib.sha256(path.read_bytes()).digest())
+                return digest.hexdigest()[:16]
+            except FileNotFoundError:
+                if attempt == 9:
+                    raise
+
+    def validate_preconditions(self, operation: str, position: int) -> List[Slide]:
+        """
+        Validate preconditions before operation
+
+        Args:
+            operation: 'add' or 'delete'
+            position: Slide position
+
+        Returns:
+            List of current slides
+
+        Raises:
+            SystemExit: If validation fails
+        """
+        # Check slides.md exists
+        if not self.slides_md.exists():
+            print(f"Error: slides.md not found at {self.slides_md}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Check slides/ directory exists
+        if not self.slides_dir.exists():
+            print(f"Error: slides/ directory not found at {self.slides_dir}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Check write permissions
+        if not os.access(self.slides_md, os.W_OK):
+            print(f"Error: No write permission for {self.slides_md}", file=sys.stderr)
+            sys.exit(ExitCode.GENERAL_ERROR)
+
+        # Parse slides
+        slides = self.parse_slides_md()
+
+        if not slides:
+            print("Error: No slides found in slides.md", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Validate position range
+        if operation == 'delete':
+            if position < 1 or position > len(slides):
+                print(f"Error: Position must be 1-{len(slides)}", file=sys.stderr)
+                sys.exit(ExitCode.INVALID_ARGS)
+        elif operation == 'add':
+            if position < 1 or position > len(slides) + 1:
+                print(f"Error: Position must be 1-{len(slides) + 1}", file=sys.stderr)
+                sys.exit(ExitCode.INVALID_ARGS)
+
+        # Check max slides limit
+        if operation == 'add' and len(slides) >= self.MAX_SLIDES:
+            print(f"Error: Maximum {self.MAX_SLIDES} slides supported. Consider splitting presentation.",
+                  file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        return slides
+
+    def verify_postconditions(self, expected_count: int, allow_gaps: bool = False):
+        """
+        Verify postconditions after operation
+
+        Args:
+            expected_count: Expected number of slides
+            allow_gaps: If True, don't fail on numbering gaps
+
+        Raises:
+            Exception: If verification fails
+        """
+        # Reparse slides.md
+        new_slides = self.parse_slides_md()
+
+        # Check count
+        if len(new_slides) != expected_count:
+            raise Exception(f"Slide count mismatch: expected {expected_count}, got {len(new_slides)}")
+
+        # Verify numbering sequence (warn about gaps but don't fail if allow_gaps=True)
+        gaps = self.detect_gaps(new_slides)
+        if gaps and not allow_gaps:
+            raise Exception(f"Numbering gaps detected at positions: {gaps}")
+        elif gaps:
+            print(f"Warning: Numbering gaps exist at positions: {gaps}", file=sys.stderr)
+            print(f"Tip: Run 'manage-slides.py renumber' to fix gaps", file=sys.stderr)
+
+        # Verify all files exist
+        for slide in new_slides:
+            filepath = self.slides_md.parent / slide.src
+            if not filepath.exists():
+                raise Exception(f"Missing file: {filepath}")
+
+    def delete_slide(self, slide_number: int, renumber: bool = False):
+        """
+        Delete slide by slide number
+
+        Args:
+            slide_number: Slide number to delete (from <!-- Slide N: ... --> comment)
+                         Example: slide_number=6 deletes the slide marked as "Slide 6"
+            renumber: If True, renumber all slides after deletion to close gaps
+        """
+        # Parse slides first
+        slides = self.parse_slides_md()
+
+        if not slides:
+            print("Error: No slides found in slides.md", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Find slide by number
+        target_slide = None
+        target_position = None
+        for i, slide in enumerate(slides):
+            if slide.number == slide_number:
+                target_slide = slide
+                target_position = i + 1  # 1-indexed position
+                break
+
+        if not target_slide:
+            print(f"Error: Slide {slide_number} not found", file=sys.stderr)
+            print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Validate preconditions using position
+        slides = self.validate_preconditions('delete', target_position)
+
+        print(f"Deleting Slide {slide_number} (position {target_position} in list)")
+        print(f"  Title: {target_slide.title}")
+        print(f"  File: {target_slide.src}")
+
+        # Backup state
+        self.backup_state()
+
+        try:
+            # Get the file to delete
+            target_file = self.slides_md.parent / target_slide.src
+
+            # Remove target slide from list
+            slides.pop(target_position - 1)
+
+            if renumber:
+                # Renumber slides sequentially, preserving gap at beginning
+                # Slide 1 = title (frontmatter), first file = 02-
+                print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
+
+                # First slide file should always be 02- (after title which is slide 1)
+                first_file_num = 2
+
+                for i, slide in enumerate(slides):
+                    new_num = first_file_num + i
+                    old_path = self.slides_md.parent / slide.src
+
+                    # Parse old filename
+                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
+                    if not match:
+                        raise Exception(f"Invalid filename format: {slide.src}")
+
+                    old_num = int(match.group(1))
+                    slug = match.group(2)
+
+                    if old_num != new_num:
+                        new_filename = f"{new_num:02d}-{slug}.md"
+                        new_path = self.slides_dir / new_filename
+
+                        print(f"  {old_path.name} -> {new_path.name}")
+                        self.move_file(old_path, new_path)
+
+                        # Update slide object
+                        slide.number = new_num
+                        slide.src = f"slides/{new_filename}"
+
+            # Rebuild slides.md
+            self.rebuild_slides_md(slides)
+
+            # Delete target file (after slides.md is updated)
+            if target_file.exists():
+                if self.is_git_tracked(target_file):
+                    # -f: the file may have staged changes (e.g. a rename by an earlier --renumber)
+                    subprocess.run(['git', 'rm', '-q', '-f', '--', str(target_file)], check=True,
+                                   cwd=self.slides_md.parent)
+                else:
+                    target_file.unlink()
+
+            # Verify postconditions (allow gaps if not renumbering)
+            self.verify_postconditions(len(slides), allow_gaps=(not renumber))
+
+            # Cleanup backup
+            if self.backup_file:
+                self.backup_file.unlink()
+
+            print(f"\n✓ Successfully deleted slide")
+            if renumber:
+                print(f"✓ Renumbered all slides sequentially")
+            else:
+                # Check for gaps
+                gaps = self.detect_gaps(slides)
+                if gaps:
+                    print(f"\n⚠ Warning: Numbering gaps exist at positions: {gaps}")
+                    print(f"Tip: Use --renumber flag to fix gaps automatically")
+
+        except Exception as e:
+            print(f"Error during deletion: {e}", file=sys.stderr)
+            self.rollback()
+            sys.exit(ExitCode.GENERAL_ERROR)
+
+    def add_slide(self, slide_number: int, title: str, layout: str = 'default', renumber: bool = False):
+        """
+        Add slide at slide number
+
+        Args:
+            slide_number: Slide number where to insert (from <!-- Slide N: ... --> comment)
+                         Example: slide_number=6 inserts a new "Slide 6", shifting existing 6+ forward
+            title: New slide title
+            layout: Slidev layout (default: 'default')
+            renumber: If True, renumber all slides after insertion to be sequential
+        """
+        # Parse slides first to find position
+        slides = self.parse_slides_md()
+
+        if not slides:
+            # Empty presentation, add as first slide
+            target_position = 1
+        else:
+            # Find where to insert based on slide number
+            target_position = None
+            for i, slide in enumerate(slides):
+                if slide.number >= slide_number:
+                    target_position = i + 1  # Insert before this slide
+                    break
+
+            if target_position is None:
+                # Insert at end
+                target_position = len(slides) + 1
+
+        # Validate preconditions
+        slides = self.validate_preconditions('add', target_position)
+
+        # Use the requested slide number
+        new_slide_num = slide_number
+
+        slug = self.unique_slug(title)
+        new_filename = f"{new_slide_num:02d}-{slug}.md"
+        new_filepath = self.slides_dir / new_filename
+
+        print(f"Adding Slide {slide_number} at position {target_position}")
+        print(f"  Title: {title}")
+        print(f"  File: slides/{new_filename}")
+        print(f"  Layout: {layout}")
+
+        # Backup state
+        self.backup_state()
+
+        try:
+            # Create new slide file
+            print(f"\nCreating new slide: {new_filepath}")
+            self.create_slide_file(new_filepath, title, layout)
+
+            # Insert new slide into list
+            new_slide = Slide(number=new_slide_num, src=f"slides/{new_filename}", title=title)
+            slides.insert(target_position - 1, new_slide)
+
+            if renumber:
+                # Renumber slides sequentially, preserving gap at beginning
+                # Slide 1 = title (frontmatter), first file = 02-
+                print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
+
+                # First slide file should always be 02- (after title which is slide 1)
+                first_file_num = 2
+
+                for i, slide in enumerate(slides):
+                    new_num = first_file_num + i
+                    old_path = self.slides_md.parent / slide.src
+
+                    # Parse old filename
+                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
+                    if not match:
+                        raise Exception(f"Invalid filename format: {slide.src}")
+
+                    old_num = int(match.group(1))
+                    slug_part = match.group(2)
+
+                    if old_num != new_num:
+                        new_filename_renumber = f"{new_num:02d}-{slug_part}.md"
+                        new_path = self.slides_dir / new_filename_renumber
+
+                        print(f"  {old_path.name} -> {new_path.name}")
+                        self.move_file(old_path, new_path)
+
+                        # Update slide object
+                        slide.number = new_num
+                        slide.src = f"slides/{new_filename_renumber}"
+
+            # Rebuild slides.md
+            self.rebuild_slides_md(slides)
+
+            # Verify postconditions (allow gaps if not renumbering)
+            self.verify_postconditions(len(slides), allow_gaps=(not renumber))
+
+            # Cleanup backup
+            if self.backup_file:
+                self.backup_file.unlink()
+
+            print(f"\n✓ Successfully added Slide {slide_number} at position {target_position}")
+            if renumber:
+                print(f"✓ Renumbered all slides sequentially")
+            else:
+                # Check for gaps
+                gaps = self.detect_gaps(slides)
+                if gaps:
+                    print(f"\n⚠ Warning: Numbering gaps exist at positions: {gaps}")
+                    print(f"Tip: Use --renumber flag to fix gaps automatically")
+
+        except Exception as e:
+            print(f"Error during addition: {e}", file=sys.stderr)
+            self.rollback()
+            sys.exit(ExitCode.GENERAL_ERROR)
+
+    def move_slide(self, from_slide_number: int, after_slide_number: int):
+        """
+        Move slide to position after specified slide number
+
+        Args:
+            from_slide_number: Slide number to move (from <!-- Slide N: ... --> comment)
+            after_slide_number: Slide number to place FROM slide after
+                               Example: from=6, after=3 → slide 6 becomes new slide 4
+
+        Example:
+            Current: Slide 2, 3, 4, 5, 6, 7
+            move_slide(6, 3)
+            Result:  Slide 2, 3, 4, 5, 6, 7 (renumbered: old 2,3,6,4,5,7 → new 2,3,4,5,6,7)
+        """
+        # 1. Parse slides
+        slides = self.parse_slides_md()
+
+        if not slides:
+            print("Error: No slides found in slides.md", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # 2. Find FROM slide
+        from_slide = None
+        from_position = None
+        for i, slide in enumerate(slides):
+            if slide.number == from_slide_number:
+                from_slide = slide
+                from_position = i + 1  # 1-indexed
+                break
+
+        if not from_slide:
+            print(f"Error: Slide {from_slide_number} not found", file=sys.stderr)
+            print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # 3. Validate FROM slide is not slide 1
+        if from_slide_number == 1:
+            print("Error: Cannot move slide 1 (title from frontmatter)", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        # 4. Find AFTER slide position
+        after_position = None
+        if after_slide_number == 1:
+            # Move to beginning (becomes slide 2)
+            after_position = 0
+        else:
+            for i, slide in enumerate(slides):
+                if slide.number == after_slide_number:
+                    after_position = i + 1  # 1-indexed
+                    break
+
+            if after_position is None:
+                print(f"Error: Target slide {after_slide_number} not found", file=sys.stderr)
+                print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
+                sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # 5. Validate move makes sense
+        if from_slide_number == after_slide_number:
+            print(f"Error: Cannot move slide {from_slide_number} after itself", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        # Check if already in position (from is immediately after target)
+        if from_position == after_position + 1:
+            print(f"Slide {from_slide_number} is already after slide {after_slide_number}")
+            print("No changes needed.")
+            return
+
+        # 6. Preview move
+        print(f"Moving Slide {from_slide_number} to position after Slide {after_slide_number}")
+        print(f"  Title: {from_slide.title}")
+        print(f"  File: {from_slide.src}")
+        print(f"  Current position: {from_position}")
+        print(f"  New position: {after_position + 1}")
+
+        # 7. Backup state
+        self.backup_state()
+
+        try:
+            # 8. Remove slide from current position
+            slides.pop(from_position - 1)
+
+            # 9. Calculate insert position (adjust if moving forward)
+            if from_position < after_position:
+                # Removed from earlier, so target position shifted back by 1
+                insert_index = after_position - 1
+            else:
+                # Moving backward, insert position stays same
+                insert_index = after_position
+
+            # 10. Insert at new position
+            slides.insert(insert_index, from_slide)
+
+            # 11. Renumber all slides sequentially (always for move)
+            print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
+
+            # First slide file should always be 02- (after title which is slide 1)
+            first_file_num = 2
+
+            for i, slide in enumerate(slides):
+                new_num = first_file_num + i
+                old_path = self.slides_md.parent / slide.src
+
+                # Parse old filename
+                match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
+                if not match:
+                    raise Exception(f"Invalid filename format: {slide.src}")
+
+                old_num = int(match.group(1))
+                slug = match.group(2)
+
+                if old_num != new_num:
+                    new_filename = f"{new_num:02d}-{slug}.md"
+                    new_path = self.slides_dir / new_filename
+
+                    print(f"  {old_path.name} -> {new_path.name}")
+                    self.move_file(old_path, new_path)
+
+                    # Update slide object
+                    slide.number = new_num
+                    slide.src = f"slides/{new_filename}"
+
+            # 12. Rebuild slides.md
+            self.rebuild_slides_md(slides)
+
+            # 13. Verify postconditions (no gaps after renumbering)
+            self.verify_postconditions(len(slides), allow_gaps=False)
+
+            # 14. Cleanup backup
+            if self.backup_file:
+                self.backup_file.unlink()
+
+            print(f"\n✓ Successfully moved slide {from_slide_number} to position after {after_slide_number}")
+            print(f"✓ Renumbered all slides sequentially")
+
+        except Exception as e:
+            print(f"Error during move: {e}", file=sys.stderr)
+            self.rollback()
+            sys.exit(ExitCode.GENERAL_ERROR)
+
+    def renumber_all(self):
+        """
+        Renumber all slides to close middle gaps while preserving beginning gap
+
+        Preserves the gap between slide 1 and slide 2 (typical: title at 1, content at 5+)
+        but fixes any gaps in the middle sequence.
+
+        Example:
+            Before: [1, 5, 6, 9, 10] (gap at beginning: 1->5, gap in middle: 6->9)
+            After:  [1, 5, 6, 7, 8]  (beginning gap preserved, middle gap fixed)
+        """
+        # Parse current slides
+        slides = self.parse_slides_md()
+
+        if not slides:
+            print("No slides found", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+
+        # Check for gaps (ignore beginning gap)
+        gaps = self.detect_gaps(slides, ignore_beginning=True)
+        if not gaps:
+            print("No gaps detected in middle. Slides are properly numbered.")
+            print("(Beginning gap between slides 1 and 2 is preserved as designed)")
+            return
+
+        print(f"Detected gaps in middle at positions: {gaps}")
+        print(f"Renumbering {len(slides)} slides to close middle gaps...")
+        print(f"(Preserving gap between slide 1 and slide 2)")
+
+        # Backup state
+        self.backup_state()
+
+        try:
+            # Preserve first slide number
+            # Start sequential numbering from second slide onwards
+            if len(slides) >= 2:
+                first_slide_num = slides[0].number
+                second_slide_num = slides[1].number
+
+                print(f"\nPreserving beginning gap: slide {first_slide_num} -> slide {second_slide_num}")
+
+                # Keep first slide unchanged
+                # Renumber slides 2-N sequentially from second slide's number
+                for i, slide in enumerate(slides):
+                    if i == 0:
+                        # Keep first slide number unchanged
+                        new_num = first_slide_num
+                    else:
+                        # Sequential from second slide's number onwards
+                        new_num = second_slide_num + (i - 1)
+
+                    old_path = self.slides_md.parent / slide.src
+
+                    # Parse old filename
+                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
+                    if not match:
+                        raise Exception(f"Invalid filename format: {slide.src}")
+
+                    old_num = int(match.group(1))
+                    slug = match.group(2)
+
+                    if old_num != new_num:
+                        new_filename = f"{new_num:02d}-{slug}.md"
+                        new_path = self.slides_dir / new_filename
+
+                        print(f"  {old_path.name} -> {new_path.name}")
+                        self.move_file(old_path, new_path)
+
+                        # Update slide object
+                        slide.number = new_num
+                        slide.src = f"slides/{new_filename}"
+            else:
+                # Only one slide, keep it unchanged
+                print("Only one slide found, no renumbering needed")
+
+            # Rebuild slides.md
+            self.rebuild_slides_md(slides)
+
+            # Verify postconditions (allow beginning gap)
+            # Check for middle gaps only
+            new_gaps = self.detect_gaps(slides, ignore_beginning=True)
+            if new_gaps:
+                raise Exception(f"Middle gaps still exist after renumbering: {new_gaps}")
+
+            # Cleanup backup
+            if self.backup_file:
+                self.backup_file.unlink()
+
+            print(f"\n✓ Successfully renumbered all slides")
+            if len(slides) >= 2:
+                print(f"✓ Slides: {slides[0].number}, {slides[1].number}-{slides[-1].number} (beginning gap preserved)")
+            else:
+                print(f"✓ Slide: {slides[0].number}")
+
+        except Exception as e:
+            print(f"Error during renumbering: {e}", file=sys.stderr)
+            self.rollback()
+            sys.exit(ExitCode.GENERAL_ERROR)
+
+    def scaffold(self, entries: List[dict], append: bool = False, deck_title: str = 'Presentation'):
+        """
+        Create many slides in one pass
+
+        Writes all slide files from the create_slide_file template, rewrites
+        slides.md once and stages the new files with a single git add,
+        instead of one parse/backup/rebuild/verify cycle per slide.
+
+        Args:
+            entries: Dicts with 'title' and optional 'layout', 'body', 'notes'
+            append: If True, add after the existing slides; otherwise the deck
+                    must not contain any slides yet
+            deck_title: Title (slide 1) of a new slides.md, if the deck has none yet
+        """
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not str(entry.get('title', '')).strip():
+                print(f"Error: Outline entry {i + 1} has no title", file=sys.stderr)
+                sys.exit(ExitCode.INVALID_ARGS)
+            layout = entry.get('layout')
+            # Written into the slide's frontmatter: one line, nothing after it
+            if layout is not None and not (isinstance(layout, str) and layout.splitlines() in ([], [layout])):
+                print(f"Error: Outline entry {i + 1} has an invalid layout: {layout!r}", file=sys.stderr)
+                sys.exit(ExitCode.INVALID_ARGS)
+
+        fresh = not self.slides_md.exists()
+        slides = [] if fresh else self.parse_slides_md()
+        if slides and not append:
+            print(f"Error: Deck already has {len(slides)} slides. Use --append to add after them.",
+                  file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        # Same limit as add, checked before any file is written
+        if len(slides) + len(entries) > self.MAX_SLIDES:
+            print(f"Error: Maximum {self.MAX_SLIDES} slides supported; the deck has {len(slides)} and the "
+                  f"outline adds {len(entries)}. Consider splitting presentation.", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        # Slide 1 is the title from frontmatter, first file is 02-
+        first_num = slides[-1].number + 1 if slides else 2
+
+        print(f"Scaffolding {len(entries)} slides ({first_num}-{first_num + len(entries) - 1})")
+
+        if not self.slides_dir.exists():
+            self.slides_dir.mkdir()
+        if fresh:
+            # Quoted: a title such as "Kubernetes: Deep Dive" is not a plain YAML scalar
+            title_yaml = json.dumps(deck_title, ensure_ascii=False)
+            self.slides_md.write_text(f"---\ntheme: default\ntitle: {title_yaml}\n---\n")
+        self.backup_state()
+        slug_index = SlugIndex(self.slides_md.parent)
+
+        try:
+            for i, entry in enumerate(entries):
+                number = first_num + i
+                title = ' '.join(str(entry['title']).split())
+                filename = f"{number:02d}-{self.unique_slug(title, slug_index)}.md"
+                filepath = self.slides_dir / filename
+                if filepath.exists():
+                    raise Exception(f"File already exists: slides/{filename}")
+
+                self.create_slide_file(
+                    filepath,
+                    title,
+                    entry.get('layout') or 'default',
+                    entry.get('body') or 'Content here',
+                    entry.get('notes') or 'Presenter notes',
+                )
+                slides.append(Slide(number=number, src=f"slides/{filename}", title=title))
+                print(f"  slides/{filename}")
+
+            self.rebuild_slides_md(slides)
+            self.verify_postconditions(len(slides), allow_gaps=True)
+
+            # Stage everything with one git call (only inside a work tree)
+            inside_git = subprocess.run(
+                ['git', 'rev-parse', '--is-inside-work-tree'],
+                capture_output=True,
+                cwd=self.slides_md.parent
+            ).returncode == 0
+            if inside_git:
+                subprocess.run(
+                    ['git', 'add', '--', str(self.slides_md)] + [str(p) for p in self.created_files],
+                    check=True,
+                    capture_output=True,
+                    cwd=self.slides_md.parent
+                )
+
+            if self.backup_file:
+                self.backup_file.unlink()
+
+            print(f"\n✓ Successfully scaffolded {len(entries)} slides")
+            if inside_git:
+                print(f"✓ Staged {len(self.created_files)} slide files and slides.md in git")
+
+        except Exception as e:
+            print(f"Error during scaffold: {e}", file=sys.stderr)
+            self.rollback()
+            if fresh:
+                self.slides_md.unlink(missing_ok=True)
+            sys.exit(ExitCode.GENERAL_ERROR)
@@ -0,0 +1,388 @@
+"""
+Deck Exporter
+
+Incremental, sharded PDF/PNG export through the Slidev CLI: only pages whose
+content key changed are re-rendered, in parallel shards, and the cached pages
+are stitched into the final output (pypdf or qpdf for PDF). Backs the export
+command of manage-slides.py.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from assets import AssetCollector
+from deck import CACHE_DIR_NAME, SlideManager, atomic_write_text, split_slide
+
+# Slidev globals and components that render the page number or page count
+PAGE_NUMBER_RE = re.compile(r'\$(page|nav)\b|\$slidev\.nav\b|\b(currentPage|SlideCurrentNo|SlidesTotal)\b'
+                            r'|<(slide-current-no|slides-total)\b')
+
+
+class PdfTool:
+    """
+    Page count, split and merge of PDF files
+
+    Uses pypdf if installed, otherwise the qpdf command line tool.
+    """
+
+    def __init__(self):
+        try:
+            import pypdf
+        except ImportError:
+            pypdf = None
+        self.pypdf = pypdf
+        self.qpdf = shutil.which('qpdf')
+        if not self.pypdf and not self.qpdf:
+            raise RuntimeError("PDF export needs pypdf (pip install pypdf) or qpdf")
+
+    def page_count(self, path: Path) -> int:
+        if self.pypdf:
+            return len(self.pypdf.PdfReader(str(path)).pages)
+        result = subprocess.run([self.qpdf, '--show-npages', str(path)], check=True, capture_output=True, text=True)
+        return int(result.stdout.strip())
+
+    def split(self, path: Path, outputs: List[Path]):
+        """Write page i of path to outputs[i]"""
+        if self.pypdf:
+            reader = self.pypdf.PdfReader(str(path))
+            for page, output in zip(reader.pages, outputs):
+                writer = self.pypdf.PdfWriter()
+                writer.add_page(page)
+                with open(output, 'wb') as f:
+                    writer.write(f)
+            return
+        for number, output in enumerate(outputs, start=1):
+            subprocess.run([self.qpdf, '--empty', '--pages', str(path), str(number), '--', str(output)],
+                           check=True, capture_output=True)
+
+    def merge(self, paths: List[Path], output: Path):
+        if self.pypdf:
+            writer = self.pypdf.PdfWriter()
+            for path in paths:
+                writer.append(str(path))
+            with open(output, 'wb') as f:
+                writer.write(f)
+            return
+        subprocess.run([self.qpdf, '--empty', '--pages', *map(str, paths), '--', str(output)],
+                       check=True, capture_output=True)
+
+
+class DeckExporter:
+    """
+    Incremental, sharded export to PDF or per-slide PNG
+
+    Every page gets a key: the hash of its slide file, the frontmatter of its
+    src entry in slides.md, the files it references under public/images/ and
+    diagrams/, the export options and everything that affects all pages
+    (slides.md before the first slide entry, styles/, components/, layouts/,
+    setup/, Vite/UnoCSS config, package.json). Keys do not depend on the page
+    number, so inserting or moving slides re-renders only the slides that
+    changed. Only slides that show the page number or count ($page, $nav,
+    <SlideCurrentNo>, ...) have them in their key; if a global file or the
+    headmatter shows them, every page has. Pages whose key is in
+    .slidev-cache/export/ are reused; the others are exported with
+    `slidev export --range`, split across up to --workers concurrent slidev
+    processes, and cached one file per page. The final PDF or PNG set is then
+    stitched from the cache.
+
+    Page 1 is the slides.md headmatter slide; page N+1 is the N-th src entry.
+    Slides with hide/disabled frontmatter are not exported by Slidev and get no
+    page. Decks without src entries are exported in one piece.
+    """
+
+    VERSION = 2
+    GLOBAL_PATHS = ('styles', 'components', 'layouts', 'setup', 'global-top.vue', 'global-bottom.vue',
+                    'uno.config.ts', 'unocss.config.ts', 'vite.config.ts', 'package.json')
+    # A slidev process costs several seconds to start; do not shard below this
+    MIN_PAGES_PER_SHARD = 5
+
+    def __init__(self, manager: SlideManager, fmt: str = 'pdf', dark: bool = False, with_clicks: bool = False):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.format = fmt
+        self.options = {'format': fmt, 'dark': dark, 'with_clicks': with_clicks}
+        self.cache_dir = self.root / CACHE_DIR_NAME / 'export' / fmt
+        self.manifest_file = self.root / CACHE_DIR_NAME / 'export.json'
+        self.manifest = {'files': {}, 'pages': {}}
+        self.pdf = PdfTool() if fmt == 'pdf' else None
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.manifest = data
+        except (OSError, ValueError):
+            pass
+
+    def _save_manifest(self):
+        self.manifest['version'] = self.VERSION
+        self.manifest_file.parent.mkdir(exist_ok=True)
+        atomic_write_text(self.manifest_file, json.dumps(self.manifest, indent=1))
+
+    def _file_entry(self, path: Path) -> Optional[dict]:
+        """Manifest entry of a file (content hash), refreshed when mtime or size change"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        rel = path.relative_to(self.root).as_posix()
+        entry = self.manifest['files'].get(rel)
+        if not entry or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                     'sha256': hashlib.sha256(path.read_bytes()).hexdigest()}
+            self.manifest['files'][rel] = entry
+        return entry
+
+    def _file_hash(self, path: Path) -> str:
+        """Content hash of a file, cached by mtime and size ('' if missing)"""
+        entry = self._file_entry(path)
+        return entry['sha256'] if entry else ''
+
+    def _shows_page_number(self, path: Path) -> bool:
+        """Whether a text file renders the page number or count, cached like the hash"""
+        entry = self._file_entry(path)
+        if entry is None:
+            return False
+        if 'page_number' not in entry:
+            entry['page_number'] = bool(PAGE_NUMBER_RE.search(path.read_text(errors='replace')))
+        return entry['page_number']
+
+    def _asset_path(self, ref: str) -> Path:
+        if ref.startswith('images/'):
+            return self.root / 'public' / ref
+        return self.root / ref
+
+    def _content_key(self, path: Path, text: Optional[str] = None) -> str:
+        """Hash of a file (or of text taken from it) plus every asset it references"""
+        if text is None:
+            digest = hashlib.sha256(self._file_hash(path).encode())
+            refs = AssetCollector.scan_references(path) if path.exists() else []
+        else:
+            digest = hashlib.sha256(text.encode())
+            refs = AssetCollector.scan_text(text)
+        for ref in refs:
+            asset = self._asset_path(ref)
+            files = sorted(p for p in asset.rglob('*') if p.is_file()) if asset.is_dir() else [asset]
+            for file in files:
+                digest.update(f"{file.relative_to(self.root).as_posix()}:{self._file_hash(file)}".encode())
+        return digest.hexdigest()
+
+    def _global_key(self, preamble: str) -> tuple[str, bool]:
+        """
+        Hash everything that affects all pages
+
+        Returns:
+            (key, whether the headmatter or a global file shows the page number or count)
+        """
+        digest = hashlib.sha256(preamble.encode())
+        digest.update(json.dumps(self.options, sort_keys=True).encode())
+        page_number = bool(PAGE_NUMBER_RE.search(preamble))
+        for name in self.GLOBAL_PATHS:
+            path = self.root / name
+            files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+            for file in files:
+                digest.update(f"{file.relative_to(self.root).as_posix()}:{self._file_hash(file)}".encode())
+                if file.suffix in ('.vue', '.ts', '.js', '.md', '.html') and self._shows_page_number(file):
+                    page_number = True
+        return digest.hexdigest(), page_number
+
+    def page_keys(self) -> List[tuple[int, str, str]]:
+        """
+        Key every exported page
+
+        Returns:
+            List of (page number, label, key); empty if the deck has no src entries
+        """
+        slides = self.manager.parse_slides_md()
+        if not slides:
+            return []
+        preamble = self.manager.read_preamble()
+        global_key, all_numbered = self._global_key(preamble)
+
+        # Page 1 shows the headmatter slide, including assets it references
+        contents = [('slides.md', self._content_key(self.manager.slides_md, preamble), False)]
+        for slide in slides:
+            path = self.root / slide.src
+            frontmatter = slide.frontmatter  # Entry keys override the slide file's
+            numbered = False
+            if path.exists():
+                if re.search(r'^(hide|disabled):\s*true\s*$',
+                             frontmatter + '\n' + split_slide(path.read_text()).frontmatter, re.M):
+                    continue
+                numbered = self._shows_page_number(path)
+            content_key = hashlib.sha256(f"{frontmatter}\n{self._content_key(path)}".encode()).hexdigest()
+            contents.append((slide.src, content_key, numbered))
+
+        pages = []
+        for number, (label, content_key, numbered) in enumerate(contents, start=1):
+            position = f"{number}/{len(contents)}" if all_numbered or numbered else ''
+            key = hashlib.sha256(f"{global_key}:{position}:{content_key}".encode()).hexdigest()[:24]
+            pages.append((number, label, key))
+        return pages
+
+    @staticmethod
+    def _slidev_command() -> List[str]:
+        return ['slidev'] if shutil.which('slidev') else ['npx', 'slidev']
+
+    def _export_range(self, pages: Optional[List[int]], output: Path):
+        """Run one slidev export for the given pages (None: whole deck)"""
+        command = [*self._slidev_command(), 'export', self.manager.slides_md.name,
+                   '--format', self.format, '--output', str(output)]
+        label = 'slidev export'
+        if pages is not None:
+            page_range = ','.join(map(str, pages))
+            command += ['--range', page_range]
+            label += f" --range {page_range}"
+        if self.options['dark']:
+            command.append('--dark')
+        if self.options['with_clicks']:
+            command.append('--with-clicks')
+        result = subprocess.run(command, cwd=self.root, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{label} failed:\n{(result.stderr or result.stdout).strip()[-2000:]}")
+
+    def _png_files(self, directory: Path) -> List[Path]:
+        """PNGs written by slidev, in page order"""
+        return sorted(directory.glob('*.png'), key=lambda p: [int(n) for n in re.findall(r'\d+', p.stem)])
+
+    def _render_shard(self, shard: List[tuple[int, str, str]], work_dir: Path) -> Dict[str, List[str]]:
+        """
+        Export one shard and store one cache entry per page
+
+        If the shard does not come back with exactly one file/page per slide
+        (clicks, several slides in one file), its slides are exported one by
+        one and each result is cached as a whole.
+
+        Returns:
+            key -> cache file names
+        """
+        numbers = [number for number, _, _ in shard]
+        work_dir.mkdir(parents=True)
+        entries = {}
+        if self.format == 'pdf':
+            output = work_dir / 'shard.pdf'
+            self._export_range(numbers, output)
+            if self.pdf.page_count(output) == len(shard):
+                targets = [self.cache_dir / f"{key}.pdf" for _, _, key in shard]
+                self.pdf.split(output, targets)
+                return {key: [target.name] for (_, _, key), target in zip(shard, targets)}
+        else:
+            output = work_dir / 'shard'
+            self._export_range(numbers, output)
+            files = self._png_files(output)
+            if len(files) == len(shard):
+                for (_, _, key), file in zip(shard, files):
+                    os.replace(file, self.cache_dir / f"{key}.png")
+                    entries[key] = [f"{key}.png"]
+                return entries
+
+        if len(shard) == 1:
+            number, _, key = shard[0]
+            if self.format == 'pdf':
+                os.replace(output, self.cache_dir / f"{key}.pdf")
+                return {key: [f"{key}.pdf"]}
+            names = []
+            for index, file in enumerate(self._png_files(output), start=1):
+                os.replace(file, self.cache_dir / f"{key}-{index}.png")
+                names.append(f"{key}-{index}.png")
+            return {key: names}
+
+        for index, page in enumerate(shard):
+            entries.update(self._render_shard([page], work_dir / f"page-{index}"))
+        return entries
+
+    def _shards(self, pages: List[tuple[int, str, str]], workers: int) -> List[List[tuple[int, str, str]]]:
+        """Split pages into at most `workers` contiguous shards of similar size"""
+        count = max(1, min(workers, len(pages) // self.MIN_PAGES_PER_SHARD))
+        size = math.ceil(len(pages) / count)
+        return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+    def run(self, output: Path, workers: int = 2, force: bool = False, dry_run: bool = False):
+        """
+        Export the deck, re-rendering only pages whose key is not cached
+
+        Args:
+            output: PDF file, or directory for PNGs
+            workers: Maximum concurrent slidev processes
+            force: Re-render every page
+            dry_run: Only report which pages would be re-rendered
+        """
+        self._load_manifest()
+        pages = self.page_keys()
+        cached = self.manifest['pages'].get(self.format, {})
+
+        def is_cached(key: str) -> bool:
+            return key in cached and all((self.cache_dir / name).exists() for name in cached[key])
+
+        stale = pages if force else [page for page in pages if not is_cached(page[2])]
+
+        if not pages:
+            print("No src slide entries in slides.md; exporting the whole deck")
+            if not dry_run:
+                output.parent.mkdir(parents=True, exist_ok=True)
+                self._export_range(None, output)
+            return
+
+        print(f"{len(stale)} of {len(pages)} slide(s) changed")
+        for number, label, _ in stale:
+            print(f"  {number:>3}  {label}")
+        if dry_run:
+            self._save_manifest()
+            return
+
+        started = time.monotonic()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if stale:
+            shards = self._shards(stale, workers)
+            print(f"Exporting in {len(shards)} shard(s)...")
+            with tempfile.TemporaryDirectory(dir=self.cache_dir.parent) as tmp, \
+                    ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                futures = [pool.submit(self._render_shard, shard, Path(tmp) / f"shard-{i}")
+                           for i, shard in enumerate(shards)]
+                errors = []
+                for future in futures:
+                    try:
+                        cached.update(future.result())
+                    except (RuntimeError, OSError, subprocess.CalledProcessError) as e:
+                        errors.append(e)
+            if errors:
+                # Keep what the other shards rendered for the next run
+                self.manifest['pages'][self.format] = cached
+                self._save_manifest()
+                raise RuntimeError(str(errors[0]))
+
+        # Stitch the output from the cache
+        files = [self.cache_dir / name for _, _, key in pages for name in cached[key]]
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if self.format == 'pdf':
+            tmp_output = output.with_name(f".{output.name}.tmp.{os.getpid()}")
+            self.pdf.merge(files, tmp_output)
+            os.replace(tmp_output, output)
+        else:
+            output.mkdir(exist_ok=True)
+            for stale_png in output.glob('slide-*.png'):
+                stale_png.unlink()
+            for number, file in enumerate(files, start=1):
+                shutil.copyfile(file, output / f"slide-{number}.png")
+
+        # Keep only the entries of the current deck
+        live = {key for _, _, key in pages}
+        for key in set(cached) - live:
+            for name in cached.pop(key):
+                (self.cache_dir / name).unlink(missing_ok=True)
+        self.manifest['pages'][self.format] = cached
+        self._save_manifest()
+
+        print(f"✓ Exported {len(pages)} slide(s) to {output} "
+              f"({len(stale)} re-rendered, {time.monotonic() - started:.1f}s)")
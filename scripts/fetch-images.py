@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Batch Image Fetcher
+
+Downloads many images at once for /slidev:visuals. Replaces one curl process
+per image with:
+
+- Bounded parallelism: --jobs downloads at a time, at most --per-host of them
+  against the same host
+- Pooled keep-alive connections: finished connections go back to a per-host
+  pool and are reused by the next download
+- Retries with exponential backoff on connection errors, 429 and 5xx
+  (honoring a numeric Retry-After)
+- A content-addressed store shared by all decks (default
+  ~/.cache/slidev/images): every file is stored once per sha256 and copied
+  into the deck (a copy-on-write clone where the file system supports it),
+  so an image used on several slides or decks is downloaded once and a deck
+  may edit its copy in place. Stored objects are checked against their size
+  and sha256 before use; a damaged object is evicted and downloaded again.
+
+URLs fetched before are served from the store without touching the network
+unless --refresh is given.
+
+Usage:
+    python fetch-images.py [--output-dir public/images] [--jobs 8] [--per-host 4]
+                           [--retries 3] [--store DIR] [--refresh] [--json] [URL ...]
+
+    Without URL arguments, URLs are read from stdin, one per line. A line may
+    give the file name after the URL, separated by whitespace:
+
+        https://images.unsplash.com/photo-123   arch/cluster.jpg
+
+    Without a file name, the name is taken from the URL (query stripped); if
+    it has no image extension, one is derived from the Content-Type. Given
+    names must be relative paths without '..'. Existing files with different
+    content are never overwritten: the image gets a -2, -3, ... name instead.
+
+Exit Codes:
+    0: All images downloaded
+    1: One or more downloads failed
+    2: Invalid arguments
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: plain copies
+
+from deck import format_size
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.avif')
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/svg+xml': '.svg',
+    'image/avif': '.avif',
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = 'slidev-fetch-images/1.0'
+FICLONE = 0x40049409  # Linux ioctl: share a file's blocks copy-on-write (btrfs, XFS)
+
+
+class FetchError(Exception):
+    """Download failed and should not be retried"""
+
+
+class RetryableError(Exception):
+    """Download failed but may succeed on another attempt"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections, pooled per (scheme, host, port)
+
+    A per-host semaphore bounds how many connections to one host are in use
+    at the same time; idle connections are handed to the next request.
+    """
+
+    def __init__(self, per_host: int = 4, timeout: float = 30.0):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ssl_context = ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self.opened = 0
+
+    @staticmethod
+    def key(url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise FetchError(f"unsupported URL: {url}")
+        return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+    def slot(self, key: Tuple[str, str, int]) -> threading.BoundedSemaphore:
+        """Semaphore limiting concurrent connections to one host"""
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[key]
+
+    def acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take an idle connection or open a new one
+
+        Returns:
+            (connection, reused) - reused connections may have been closed by the server
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self.connect(key), False
+
+    def connect(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        """Open a new connection to a host"""
+        with self._lock:
+            self.opened += 1
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection):
+        """Return a connection whose response was read completely"""
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+class ImageStore:
+    """
+    Content-addressed image store shared between decks
+
+    Layout:
+        objects/ab/cdef...   file contents, one file per sha256 (read-only)
+        urls.json            URL -> {sha256, size, content_type}
+
+    Decks get copies, never hard links: a deck file edited in place must not
+    change the object other decks are served from.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects_dir = root / 'objects'
+        self.urls_file = root / 'urls.json'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.urls: Dict[str, dict] = self._load_urls()
+        self._new_urls: Dict[str, dict] = {}
+        self._verified = set()  # Digests of objects checked during this run
+
+    def _load_urls(self) -> Dict[str, dict]:
+        try:
+            with open(self.urls_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Stored entry for a URL, if its object is still present and intact"""
+        entry = self.urls.get(url)
+        if entry and self._intact(entry['sha256'], entry['size']):
+            return entry
+        return None
+
+    def _intact(self, digest: str, size: int) -> bool:
+        """
+        Check a stored object against its size and sha256 (once per run)
+
+        An object that does not match (e.g. written to through a hard link
+        an earlier version made) is evicted, so it is downloaded again.
+        """
+        if digest in self._verified:
+            return True
+        path = self.object_path(digest)
+        try:
+            intact = path.stat().st_size == size and file_sha256(path) == digest
+        except OSError:
+            return False
+        if not intact:
+            path.unlink(missing_ok=True)
+            return False
+        with self._lock:
+            self._verified.add(digest)
+        return True
+
+    def temp_file(self):
+        """Temporary file on the store's file system for streaming a download"""
+        return tempfile.NamedTemporaryFile(dir=self.root, prefix='.download-', delete=False)
+
+    def add(self, url: str, tmp_path: Path, digest: str, size: int, content_type: str) -> Tuple[dict, bool]:
+        """
+        Move a finished download into the store
+
+        Returns:
+            (entry, deduplicated) - deduplicated is True if the content was already stored
+        """
+        target = self.object_path(digest)
+        deduplicated = self._intact(digest, size)
+        if deduplicated:
+            tmp_path.unlink()
+        else:
+            target.parent.mkdir(exist_ok=True)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, target)
+            with self._lock:
+                self._verified.add(digest)
+        entry = {'sha256': digest, 'size': size, 'content_type': content_type}
+        with self._lock:
+            self.urls[url] = entry
+            self._new_urls[url] = entry
+        return entry, deduplicated
+
+    def save(self):
+        """Merge this run's URLs into urls.json (other runs may have written it meanwhile)"""
+        if not self._new_urls:
+            return
+        urls = self._load_urls()
+        urls.update(self._new_urls)
+        tmp = self.urls_file.with_name(f"{self.urls_file.name}.tmp.{os.getpid()}")
+        tmp.write_text(json.dumps(urls, indent=1, sort_keys=True))
+        os.replace(tmp, self.urls_file)
+
+    def holds(self, digest: str, dest: Path) -> bool:
+        """Check whether dest exists and has the content of a stored object"""
+        return dest.exists() and file_sha256(dest) == digest
+
+    def link(self, digest: str, dest: Path) -> bool:
+        """
+        Materialize a stored object at dest (a copy, cloned where the file system can)
+
+        Returns:
+            True if dest was written, False if it already had this content
+        """
+        source = self.object_path(digest)
+        if self.holds(digest, dest):
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+        clone_file(source, tmp)
+        os.replace(tmp, dest)
+        return True
+
+
+def clone_file(source: Path, dest: Path):
+    """Copy a file, sharing its blocks copy-on-write if the file system supports it"""
+    if fcntl is not None:
+        with open(source, 'rb') as src, open(dest, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass  # No reflinks here (ext4, tmpfs, other file system than the store)
+    shutil.copyfile(source, dest)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_store_dir() -> Path:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'slidev' / 'images'
+
+
+def filename_from_url(url: str, content_type: str = '') -> str:
+    """
+    File name for a URL, as download-image.sh derives it
+
+    Args:
+        url: Image URL
+        content_type: Response Content-Type, used when the URL has no image extension
+
+    Returns:
+        File name
+    """
+    name = unquote(Path(urlsplit(url).path).name) or 'image'
+    name = re.sub(r'[^A-Za-z0-9._-]+', '-', name)
+    if not name.lower().endswith(IMAGE_EXTENSIONS):
+        name += CONTENT_TYPE_EXTENSIONS.get(content_type.split(';')[0].strip().lower(), '.jpg')
+    return name
+
+
+def check_name(name: str):
+    """
+    Reject file names that would land outside the output directory
+
+    Raises:
+        FetchError: If name is empty, absolute or contains a '..' component
+    """
+    parts = re.split(r'[\\/]', name)
+    if not name or name.startswith(('/', '\\')) or re.match(r'^[A-Za-z]:', name) or '..' in parts:
+        raise FetchError(f"unsafe file name {name!r}: must be a relative path without '..'")
+
+
+class ImageFetcher:
+    """Download a batch of URLs into a deck through the pool and the store"""
+
+    def __init__(self, store: ImageStore, output_dir: Path, jobs: int = 8, per_host: int = 4,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 30.0, refresh: bool = False):
+        self.store = store
+        self.output_dir = output_dir
+        self.jobs = jobs
+        self.retries = retries
+        self.backoff = backoff
+        self.refresh = refresh
+        self.pool = ConnectionPool(per_host, timeout)
+        self._names_lock = threading.Lock()
+        self._claimed: Dict[str, str] = {}
+
+    def _send(self, key: Tuple[str, str, int], path: str):
+        """
+        Send a GET on a pooled connection
+
+        Returns:
+            (connection, response)
+        """
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'image/*,*/*;q=0.8'}
+        conn, reused = self.pool.acquire(key)
+        try:
+            conn.request('GET', path, headers=headers)
+            return conn, conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        # The server closed an idle keep-alive connection: try once more on a fresh one
+        conn = self.pool.connect(key)
+        try:
+            conn.request('GET', path, headers=headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def _download(self, url: str) -> Tuple[dict, bool]:
+        """One attempt: follow redirects and stream the body into the store"""
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(current)
+            path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+            key = self.pool.key(current)
+            with self.pool.slot(key):
+                conn = None
+                try:
+                    conn, response = self._send(key, path)
+                    status = response.status
+                    if status != 200:
+                        response.read()
+                        self._finish(key, conn, response)
+                        conn = None
+                        if status in REDIRECT_STATUSES and response.getheader('Location'):
+                            current = urljoin(current, response.getheader('Location'))
+                            continue
+                        if status in RETRY_STATUSES:
+                            retry_after = response.getheader('Retry-After', '')
+                            raise RetryableError(f"HTTP {status}",
+                                                 float(retry_after) if retry_after.isdigit() else None)
+                        raise FetchError(f"HTTP {status}")
+
+                    content_type = response.getheader('Content-Type', '')
+                    if content_type and not content_type.startswith(('image/', 'application/octet-stream')):
+                        response.read()
+                        self._finish(key, conn, response)
+                        conn = None
+                        raise FetchError(f"not an image ({content_type.split(';')[0]})")
+
+                    digest = hashlib.sha256()
+                    size = 0
+                    with self.store.temp_file() as tmp:
+                        try:
+                            for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                                digest.update(chunk)
+                                tmp.write(chunk)
+                                size += len(chunk)
+                        except BaseException:
+                            tmp.close()
+                            os.unlink(tmp.name)
+                            raise
+                    self._finish(key, conn, response)
+                    conn = None
+                    if size == 0:
+                        os.unlink(tmp.name)
+                        raise FetchError("empty response")
+                    return self.store.add(url, Path(tmp.name), digest.hexdigest(), size, content_type)
+                except (OSError, http.client.HTTPException) as e:
+                    if conn:
+                        conn.close()
+                    raise RetryableError(str(e) or type(e).__name__)
+                except BaseException:
+                    if conn:
+                        conn.close()
+                    raise
+        raise FetchError("too many redirects")
+
+    def _finish(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection,
+                response: http.client.HTTPResponse):
+        """Hand the connection back to the pool unless the server is closing it"""
+        if response.will_close:
+            conn.close()
+        else:
+            self.pool.release(key, conn)
+
+    def _claim_name(self, url: str, name: str, digest: str) -> str:
+        """
+        Give each URL of the batch its own file name (-2, -3, ... on collisions)
+
+        A name is also taken if a file with different content already exists
+        there, so files in the output directory are never overwritten.
+        """
+        with self._names_lock:
+            path = Path(name)
+            candidate = name
+            counter = 2
+            while (self._claimed.get(candidate, url) != url
+                   or (candidate not in self._claimed and (self.output_dir / candidate).exists()
+                       and not self.store.holds(digest, self.output_dir / candidate))):
+                candidate = path.with_name(f"{path.stem}-{counter}{path.suffix}").as_posix()
+                counter += 1
+            self._claimed[candidate] = url
+            return candidate
+
+    def fetch(self, url: str, name: Optional[str] = None) -> dict:
+        """
+        Fetch one URL into the output directory
+
+        Args:
+            url: Image URL
+            name: File name relative to the output directory (default: from URL)
+
+        Returns:
+            Result dict: url, path, size, sha256, source ('network', 'store' or
+            'dedup'), attempts; or url and error
+        """
+        result = {'url': url}
+        try:
+            if name is not None:
+                check_name(name)
+            entry = None if self.refresh else self.store.lookup(url)
+            source = 'store'
+            attempts = 0
+            while entry is None:
+                attempts += 1
+                try:
+                    entry, deduplicated = self._download(url)
+                    source = 'dedup' if deduplicated else 'network'
+                except RetryableError as e:
+                    if attempts > self.retries:
+                        raise FetchError(f"{e} (after {attempts} attempts)")
+                    delay = e.retry_after if e.retry_after is not None else self.backoff * 2 ** (attempts - 1)
+                    time.sleep(min(delay, 30.0))
+
+            name = self._claim_name(url, name or filename_from_url(url, entry['content_type']), entry['sha256'])
+            dest = self.output_dir / name
+            self.store.link(entry['sha256'], dest)
+            result.update(path=str(dest), size=entry['size'], sha256=entry['sha256'], source=source,
+                          attempts=attempts)
+        except FetchError as e:
+            result['error'] = str(e)
+        return result
+
+    def fetch_all(self, items: List[Tuple[str, Optional[str]]]) -> List[dict]:
+        """Fetch all (url, name) pairs concurrently; results are in input order"""
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                return list(executor.map(lambda item: self.fetch(*item), items))
+        finally:
+            self.pool.close()
+            self.store.save()
+
+
+def parse_items(lines: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Parse 'URL [name]' lines, skipping blanks and # comments"""
+    items = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split(None, 1)
+        items.append((parts[0], parts[1].strip() if len(parts) > 1 else None))
+    return items
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Download images concurrently into a deck, deduplicated by content',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Fetch all images chosen for a deck:
+    python fetch-images.py < image-urls.txt
+
+  Fetch two images into a sub-directory:
+    python fetch-images.py --output-dir public/images/arch https://example.com/a.jpg https://example.com/b.png
+        """
+    )
+    parser.add_argument('urls', nargs='*', help='URLs to fetch (default: read "URL [name]" lines from stdin)')
+    parser.add_argument('--output-dir', type=Path, default=Path('public/images'),
+                        help='Directory to place images in (default: public/images)')
+    parser.add_argument('--jobs', type=int, default=8, help='Concurrent downloads (default: 8)')
+    parser.add_argument('--per-host', type=int, default=4, help='Concurrent connections per host (default: 4)')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per URL (default: 3)')
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help='First retry delay in seconds, doubled per retry (default: 0.5)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Socket timeout in seconds (default: 30)')
+    parser.add_argument('--store', type=Path, default=None,
+                        help='Content-addressed store (default: $XDG_CACHE_HOME/slidev/images)')
+    parser.add_argument('--refresh', action='store_true', help='Download again even if the URL is in the store')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args()
+
+    items = [(url, None) for url in args.urls] or parse_items(sys.stdin.readlines())
+    if not items:
+        parser.error("no URLs given")
+    if args.jobs < 1 or args.per_host < 1 or args.retries < 0:
+        parser.error("--jobs and --per-host must be at least 1, --retries at least 0")
+
+    store = ImageStore(args.store or default_store_dir())
+    fetcher = ImageFetcher(store, args.output_dir, args.jobs, args.per_host, args.retries,
+                           args.backoff, args.timeout, args.refresh)
+
+    started = time.monotonic()
+    results = fetcher.fetch_all(items)
+    elapsed = time.monotonic() - started
+    failed = [r for r in results if 'error' in r]
+
+    if args.json:
+        print(json.dumps({'results': results, 'connections': fetcher.pool.opened,
+                          'seconds': round(elapsed, 3)}, indent=2))
+    else:
+        for r in results:
+            if 'error' in r:
+                print(f"✗ {r['url']}: {r['error']}", file=sys.stderr)
+            else:
+                print(f"✓ {r['path']}  ({format_size(r['size'])}, {r['source']})")
+        print(f"\n{len(results) - len(failed)}/{len(results)} image(s) in {elapsed:.1f}s "
+              f"over {fetcher.pool.opened} connection(s)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Image Optimizer
+
+Resizes and re-encodes the raster images of a deck in parallel, caching the
+derived files by source hash in .slidev-cache/images.json. Backs the
+optimize-images command of manage-slides.py and needs Pillow.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from assets import AssetCollector
+from deck import CACHE_DIR_NAME, SlideManager, atomic_write_text, format_size
+
+
+RASTER_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+
+
+def optimize_image_file(task: dict) -> dict:
+    """
+    Resize, re-encode and strip metadata of one image (runs in a worker process)
+
+    Uses Pillow if installed, otherwise ImageMagick (magick/convert).
+
+    Args:
+        task: Dict with source, output, max_width, max_height, format, quality
+
+    Returns:
+        Dict with source, output, size (bytes) or error
+    """
+    source, output = task['source'], task['output']
+    tmp = f"{output}.tmp.{os.getpid()}"
+    try:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            Image = None
+
+        if Image is not None:
+            with Image.open(source) as img:
+                if getattr(img, 'is_animated', False):
+                    return {'source': source, 'output': output, 'error': 'animated image skipped'}
+                # Apply EXIF orientation before the metadata is dropped
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((task['max_width'], task['max_height']), Image.LANCZOS)
+                fmt = Path(output).suffix.lower().lstrip('.')
+                # Only the color profile survives; EXIF, XMP and text chunks are dropped
+                options = {'icc_profile': img.info['icc_profile']} if img.info.get('icc_profile') else {}
+                if fmt == 'webp':
+                    img.save(tmp, 'WEBP', quality=task['quality'], method=6, **options)
+                elif fmt in ('jpg', 'jpeg'):
+                    img.convert('RGB').save(tmp, 'JPEG', quality=task['quality'], optimize=True,
+                                            progressive=True, **options)
+                elif fmt == 'png':
+                    img.save(tmp, 'PNG', optimize=True, **options)
+                else:
+                    img.save(tmp, fmt.upper(), **options)
+        else:
+            magick = shutil.which('magick') or shutil.which('convert')
+            if not magick:
+                return {'source': source, 'output': output,
+                        'error': 'neither Pillow (pip install Pillow) nor ImageMagick found'}
+            subprocess.run(
+                [magick, f"{source}[0]", '-auto-orient',
+                 '-resize', f"{task['max_width']}x{task['max_height']}>",
+                 '-strip', '-quality', str(task['quality']), f"{Path(output).suffix.lstrip('.')}:{tmp}"],
+                check=True,
+                capture_output=True
+            )
+        os.replace(tmp, output)
+        return {'source': source, 'output': output, 'size': os.path.getsize(output)}
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        return {'source': source, 'output': output, 'error': str(e)}
+
+
+class ImageOptimizer:
+    """
+    Optimize the raster images slides refer to and point the slides at the results
+
+    Each referenced image under public/images/ is resized to fit the slide
+    resolution, re-encoded (WebP by default) and stripped of metadata on a
+    process pool. The result is written next to the source as
+    <name>.opt.<ext> and slide references are rewritten to it. Results are
+    keyed by source hash plus settings in .slidev-cache/images.json, so
+    re-runs skip images that did not change. Outputs that would not be
+    smaller than their source are discarded and the slide keeps the original.
+    """
+
+    VERSION = 1
+    SUFFIX = '.opt'
+
+    def __init__(self, manager: SlideManager, max_width: int = 1920, max_height: int = 1080,
+                 fmt: str = 'webp', quality: int = 82):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.public_dir = self.root / 'public'
+        self.manifest_file = self.root / CACHE_DIR_NAME / 'images.json'
+        self.settings = {'max_width': max_width, 'max_height': max_height, 'format': fmt, 'quality': quality}
+        self.manifest = {'sources': {}, 'outputs': {}}
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.manifest = data
+        except (OSError, ValueError):
+            pass
+
+    def _save_manifest(self):
+        self.manifest['version'] = self.VERSION
+        self.manifest_file.parent.mkdir(exist_ok=True)
+        atomic_write_text(self.manifest_file, json.dumps(self.manifest, indent=1))
+
+    def _source_hash(self, rel: str) -> str:
+        """Content hash of a source image, cached by mtime and size"""
+        path = self.public_dir / rel
+        stat = path.stat()
+        entry = self.manifest['sources'].get(rel)
+        if not entry or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            entry = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': hashlib.sha256(path.read_bytes()).hexdigest(),
+            }
+            self.manifest['sources'][rel] = entry
+        return entry['sha256']
+
+    def output_for(self, rel: str) -> str:
+        """Derived output path (relative to public/) for a source image"""
+        path = Path(rel)
+        ext = path.suffix.lower()
+        if self.settings['format'] == 'webp' or ext not in ('.jpg', '.jpeg', '.png', '.webp'):
+            ext = '.webp'
+        return path.with_name(f"{path.stem}{self.SUFFIX}{ext}").as_posix()
+
+    def run(self, workers: Optional[int] = None, rewrite: bool = True):
+        """
+        Optimize all referenced images and rewrite slide references
+
+        Args:
+            workers: Worker processes (default: CPU count)
+            rewrite: If False, only produce the optimized files
+        """
+        self._load_manifest()
+        index = AssetCollector(self.manager).reference_index()
+        outputs = self.manifest['outputs']
+
+        # Referenced sources, including those already replaced by an output
+        referenced = {ref for refs in index.values() for ref in refs if ref.startswith('images/')}
+        sources = set()
+        for ref in referenced:
+            rel = ref
+            if rel in outputs:
+                rel = outputs[rel]['source']
+            path = self.public_dir / rel
+            if (Path(rel).suffix.lower() in RASTER_EXTENSIONS and self.SUFFIX + '.' not in Path(rel).name
+                    and path.is_file()):
+                sources.add(rel)
+
+        if not sources:
+            print("No raster images referenced by slides")
+            return
+
+        settings_key = json.dumps(self.settings, sort_keys=True)
+        tasks = []
+        results = {}
+        for rel in sorted(sources):
+            output = self.output_for(rel)
+            key = hashlib.sha256(f"{self._source_hash(rel)}:{settings_key}".encode()).hexdigest()[:16]
+            cached = outputs.get(output)
+            if cached and cached['key'] == key and (cached.get('kept_original') or (self.public_dir / output).exists()):
+                results[rel] = dict(cached, output=output, cached=True)
+                continue
+            tasks.append({'source': str(self.public_dir / rel), 'output': str(self.public_dir / output),
+                          'rel': rel, 'key': key, **self.settings})
+
+        print(f"Optimizing {len(tasks)} image(s), {len(sources) - len(tasks)} unchanged "
+              f"(max {self.settings['max_width']}x{self.settings['max_height']}, {self.settings['format']}, "
+              f"quality {self.settings['quality']})")
+
+        if tasks:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for task, result in zip(tasks, pool.map(optimize_image_file, tasks)):
+                    rel = task['rel']
+                    output = Path(result['output']).relative_to(self.public_dir).as_posix()
+                    original_size = (self.public_dir / rel).stat().st_size
+                    if 'error' in result:
+                        print(f"  ✗ {rel}: {result['error']}", file=sys.stderr)
+                        continue
+                    entry = {'source': rel, 'key': task['key'], 'original_size': original_size,
+                             'size': result['size']}
+                    if result['size'] >= original_size:
+                        # Not worth it: keep pointing at the original
+                        (self.public_dir / output).unlink()
+                        entry['kept_original'] = True
+                    outputs[output] = entry
+                    results[rel] = dict(entry, output=output, cached=False)
+                    saved = 'kept original' if entry.get('kept_original') else \
+                        f"{format_size(original_size)} -> {format_size(result['size'])}"
+                    print(f"  {rel} -> {output}  ({saved})")
+
+        # Point every earlier name of a source (the original, outputs of earlier
+        # settings) at its current target. Earlier outputs stay on disk so that
+        # undoing the rewrite never leaves a reference dangling.
+        replacements = {}
+        for output, entry in outputs.items():
+            result = results.get(entry['source'])
+            if result and output != result['output']:
+                replacements[output] = result
+        for rel, result in results.items():
+            replacements[rel] = result
+            replacements[result['output']] = result
+        replacements = {old: r['source'] if r.get('kept_original') else r['output']
+                        for old, r in replacements.items()}
+        replacements = {old: new for old, new in replacements.items() if old != new}
+
+        rewritten = self._rewrite_references(index, replacements) if rewrite else 0
+
+        self._save_manifest()
+
+        before = sum(r['original_size'] for r in results.values())
+        after = sum(r['original_size'] if r.get('kept_original') else r['size'] for r in results.values())
+        print(f"\n✓ {len(results)} image(s): {format_size(before)} -> {format_size(after)}")
+        if rewrite:
+            print(f"✓ Rewrote references in {rewritten} file(s)")
+            if rewritten:
+                print("Originals are kept next to the optimized files; 'undo' restores the old references")
+
+    def _rewrite_references(self, index: Dict[str, List[str]], replacements: Dict[str, str]) -> int:
+        """Rewrite image references in the files that contain them; returns files changed"""
+        if not replacements:
+            return 0
+        pattern = re.compile(
+            r'\b(' + '|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True))
+            + r')(?=[\s)"\'<>?#`]|$)'
+        )
+        changed = 0
+        for rel, refs in index.items():
+            if not any(ref in replacements for ref in refs):
+                continue
+            path = self.root / rel
+            text = path.read_text()
+            new_text = pattern.sub(lambda m: replacements[m.group(1)], text)
+            if new_text != text:
+                atomic_write_text(path, new_text)
+                changed += 1
+        return changed
@@ -5,6 +5,11 @@ Slide Management Script
 Manages slide additions, deletions, and moves with automatic renumbering and git-aware
 file operations for Slidev presentations.
 
+The deck model (slides.md parsing, slide file operations) lives in deck.py and
+each feature in its own module next to this script: snapshots.py (undo/redo),
+search_index.py, outline.py, assets.py (gc), image_optimizer.py, bundle.py,
+deck_export.py and notes.py. This file holds the deck lock and the CLI.
+
 IMPORTANT: Slide 1 is always the title from frontmatter (no file).
            First slide file is ALWAYS 02-xxx.md (never 01-).
            Renumbering preserves this gap: 02, 03, 04, ... (never 01)
@@ -14,6 +19,29 @@ Usage:
     python manage-slides.py add <slide-number> --title "Slide Title" [--layout default] [--renumber]
     python manage-slides.py move <slide-number> --after <target-slide-number>
     python manage-slides.py renumber
+    python manage-slides.py search <query> [--limit N] [--json] [--rebuild] [--workspace DIR]
+    python manage-slides.py outline [--format md|json] [--output FILE]
+    python manage-slides.py scaffold --from <outline.json> [--append]
+    python manage-slides.py undo [--steps N | --to ID]
+    python manage-slides.py redo [--steps N]
+    python manage-slides.py history
+    python manage-slides.py list [--json]
+    python manage-slides.py gc [--delete] [--json]
+    python manage-slides.py optimize-images [--max-width 1920] [--max-height 1080] [--format webp|auto]
+                                            [--quality 82] [--workers N] [--no-rewrite]
+    python manage-slides.py bundle [--output FILE | --in-place]
+    python manage-slides.py explode [--from FILE]
+    python manage-slides.py notes export [--format md|json] [--output FILE]
+    python manage-slides.py notes import <notes-file>
+    python manage-slides.py export [--format pdf|png] [--output PATH] [--workers N] [--dark]
+                                   [--with-clicks] [--force] [--dry-run]
+
+    Modifying operations (add, delete, move, renumber, scaffold, undo, redo, gc --delete,
+    optimize-images, bundle --in-place, explode, notes import) take an advisory lock on the
+    deck and accept:
+        --lock-timeout SECONDS   How long to wait for the lock (default: 30)
+        --expect-hash HASH       Optimistic mode: fail fast unless the deck still has
+                                 this hash (as printed by "list"); never waits for the lock
 
 Arguments:
     <slide-number>: The slide number from <!-- Slide N: ... --> comment (NOT list position)
@@ -26,812 +54,153 @@ Exit Codes:
     2: Invalid arguments
     3: Slide not found
     4: Git operation failed
+    5: Deck locked by another operation (lock timeout)
+    6: Deck changed since --expect-hash was read
 """
 
 import argparse
+import datetime
+import json
 import os
-import re
-import shutil
+import socket
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional
 
+from assets import run_gc
+from bundle import DeckBundler
+from deck import CACHE_DIR_NAME, ExitCode, SlideManager, atomic_write_text
+from deck_export import DeckExporter
+from image_optimizer import ImageOptimizer
+from notes import NotesPipeline
+from outline import OutlineExtractor
+from search_index import find_decks, run_search
+from snapshots import SnapshotStore
 
-class ExitCode:
-    """Exit code constants"""
-    SUCCESS = 0
-    GENERAL_ERROR = 1
-    INVALID_ARGS = 2
-    SLIDE_NOT_FOUND = 3
-    GIT_ERROR = 4
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to exclusive-create lock files
+    fcntl = None
 
 
-@dataclass
-class Slide:
-    """Represents a slide entry from slides.md"""
-    number: int
-    src: str
-    title: str
+class DeckLock:
+    """
+    Advisory lock serializing modifying operations on one deck
 
+    Uses flock() on .slidev-cache/deck.lock (exclusive-create lock file where
+    fcntl is unavailable). The holder writes its pid, host, operation and
+    start time into the file. The kernel drops an flock when its holder
+    dies, so stale locks only exist in the fallback: a lock file whose
+    recorded holder process no longer exists on this host is broken there.
 
-class SlideManager:
-    """Manages slide file operations with git awareness and automatic renumbering"""
+    Readers (list, search, outline, history) never take the lock.
+    """
 
-    def __init__(self, slides_md_path: Path):
-        self.slides_md = slides_md_path
-        self.slides_dir = slides_md_path.parent / "slides"
-        self.backup_file: Optional[Path] = None
-        self.moved_files: List[tuple[Path, Path]] = []  # For rollback
-        self.created_files: List[Path] = []  # For rollback
+    POLL_INTERVAL = 0.02
 
-    def parse_slides_md(self) -> List[Slide]:
-        """
-        Extract slide entries from slides.md
+    def __init__(self, manager: SlideManager, operation: str, timeout: float = 30.0):
+        self.path = manager.slides_md.parent / CACHE_DIR_NAME / 'deck.lock'
+        self.operation = operation
+        self.timeout = timeout
+        self.fd: Optional[int] = None
 
-        Returns slides in the order they appear, preserving any gaps in numbering.
+    def __enter__(self):
+        return self
 
-        Returns:
-            List of Slide objects with number, src path, and title
-        """
-        slides = []
-        current_src = None
-        in_block = False
-
-        with open(self.slides_md, 'r') as f:
-            for line in f:
-                line = line.rstrip()
-                if line == '---':
-                    in_block = not in_block
-                elif in_block and line.startswith('src:'):
-                    # Extract src path, remove leading './'
-                    current_src = line.split(':', 1)[1].strip().lstrip('./')
-                elif match := re.match(r'<!--\s*Slide\s+(\d+):\s*(.+?)\s*-->', line):
-                    number = int(match.group(1))
-                    title = match.group(2)
-                    if current_src:
-                        slides.append(Slide(number, current_src, title))
-                    current_src = None
-
-        return slides
-
-    def detect_gaps(self, slides: List[Slide], ignore_beginning: bool = True) -> List[int]:
-        """
-        Detect gaps in slide numbering
+    def __exit__(self, *exc):
+        self.release()
+        return False
 
-        Args:
-            slides: List of slides
-            ignore_beginning: If True, ignore gaps before the second slide
-                            (e.g., slide 1 then slide 5 is OK, but gaps in middle are not)
+    def acquire(self) -> bool:
+        """
+        Acquire the lock, waiting up to the timeout
 
         Returns:
-            List of missing slide numbers (empty if no gaps)
+            True if acquired, False on timeout
         """
-        if not slides or len(slides) < 2:
-            return []
-
-        slide_numbers = sorted([s.number for s in slides])
-
-        if ignore_beginning:
-            # Start checking from the second slide
-            # This allows slide 1 (title) then slide 5 (first content)
-            start_num = slide_numbers[1]
+        self.path.parent.mkdir(exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if self._try_acquire():
+                return True
+            # Never break an flock: its file may belong to a holder that has
+            # locked it but not written its pid yet
+            if fcntl is None and self._break_if_stale():
+                continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.POLL_INTERVAL)
+
+    def _try_acquire(self) -> bool:
+        """Single non-blocking acquisition attempt"""
+        if fcntl is None:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                return False
         else:
-            start_num = slide_numbers[0]
-
-        max_num = slide_numbers[-1]
-
-        # Find gaps from second slide onwards
-        existing = set(slide_numbers)
-        expected = set(range(start_num, max_num + 1))
-        gaps = sorted(expected - existing)
-
-        return gaps
-
-    def is_git_tracked(self, filepath: Path) -> bool:
-        """
-        Check if a file is tracked by git
-
-        Args:
-            filepath: Path to check
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+
+        holder = {
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'operation': self.operation,
+            'since': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps(holder).encode())
+        self.fd = fd
+        return True
+
+    def holder(self) -> dict:
+        """Holder info recorded in the lock file (empty if unknown)"""
+        try:
+            return json.loads(self.path.read_text() or '{}')
+        except (OSError, ValueError):
+            return {}
 
-        Returns:
-            True if file is git-tracked, False otherwise
-        """
+    def _break_if_stale(self) -> bool:
+        """Remove the lock file if its recorded holder process is gone (exclusive-create fallback only)"""
         try:
-            subprocess.run(
-                ['git', 'ls-files', '--error-unmatch', str(filepath)],
-                check=True,
-                capture_output=True,
-                cwd=self.slides_md.parent
-            )
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
             return True
-        except subprocess.CalledProcessError:
+        holder = self.holder()
+        if not holder.get('pid') or holder.get('host') != socket.gethostname():
             return False
-
-    def move_file(self, src: Path, dest: Path):
-        """
-        Move file with git awareness
-
-        Args:
-            src: Source path
-            dest: Destination path
-
-        Raises:
-            subprocess.CalledProcessError: If git mv fails
-            Exception: If regular move fails
-        """
         try:
-            if self.is_git_tracked(src):
-                subprocess.run(
-                    ['git', 'mv', str(src), str(dest)],
-                    check=True,
-                    capture_output=True,
-                    cwd=self.slides_md.parent
-                )
-            else:
-                shutil.move(str(src), str(dest))
-
-            self.moved_files.append((src, dest))  # Track for rollback
-        except subprocess.CalledProcessError as e:
-            print(f"Git move failed: {e.stderr.decode()}", file=sys.stderr)
-            raise
-        except Exception as e:
-            print(f"Move failed: {e}", file=sys.stderr)
-            raise
-
-    def backup_state(self):
-        """Backup slides.md before modifications"""
-        import time
-        self.backup_file = self.slides_md.with_suffix(f'.md.backup.{int(time.time())}')
-        shutil.copy(self.slides_md, self.backup_file)
-
-    def rollback(self):
-        """Rollback all changes on error"""
-        print("Rolling back changes...", file=sys.stderr)
-
-        # Restore slides.md
-        if self.backup_file and self.backup_file.exists():
-            shutil.move(self.backup_file, self.slides_md)
-
-        # Undo file moves (reverse order)
-        for src, dest in reversed(self.moved_files):
-            if dest.exists():
-                try:
-                    # Move back without git (rollback scenario)
-                    shutil.move(str(dest), str(src))
-                except Exception as e:
-                    print(f"Warning: Failed to rollback move {dest} -> {src}: {e}", file=sys.stderr)
-
-        # Remove created files
-        for filepath in self.created_files:
-            if filepath.exists():
-                try:
-                    filepath.unlink()
-                except Exception as e:
-                    print(f"Warning: Failed to remove {filepath}: {e}", file=sys.stderr)
-
-    def generate_slug(self, title: str) -> str:
-        """
-        Generate kebab-case slug from title
-
-        Args:
-            title: Slide title
-
-        Returns:
-            Slug string (max 40 chars)
-        """
-        slug = title.lower()
-        # Replace non-alphanumeric with hyphens
-        slug = re.sub(r'[^a-z0-9]+', '-', slug)
-        # Remove leading/trailing hyphens
-        slug = slug.strip('-')
-        # Limit to 40 characters
-        return slug[:40].rstrip('-')
-
-    def create_slide_file(self, filepath: Path, title: str, layout: str = 'default'):
-        """
-        Create new slide file with template
-
-        Args:
-            filepath: Path for new slide file
-            title: Slide title
-            layout: Slidev layout (default: 'default')
-        """
-        content = f"""---
-layout: {layout}
----
-
-# {title}
-
-Content here
-
-<!--
-Presenter notes
--->
-"""
-        filepath.write_text(content)
-        self.created_files.append(filepath)
-
-    def rebuild_slides_md(self, slides: List[Slide]):
-        """
-        Rebuild slides.md with updated slide list
-
-        Args:
-            slides: List of Slide objects to write
-        """
-        # Read original to preserve global frontmatter
-        with open(self.slides_md, 'r') as f:
-            lines = f.readlines()
-
-        # Find where global frontmatter ends (second ---)
-        global_frontmatter = []
-        separator_count = 0
-        for i, line in enumerate(lines):
-            global_frontmatter.append(line)
-            if line.strip() == '---':
-                separator_count += 1
-                if separator_count == 2:
-                    break
-
-        # Write new slides.md
-        with open(self.slides_md, 'w') as f:
-            # Write global frontmatter
-            f.writelines(global_frontmatter)
-
-            # Write slide entries
-            for slide in slides:
-                f.write('\n')
-                f.write('---\n')
-                f.write(f'src: ./{slide.src}\n')
-                f.write('---\n')
-                f.write(f'<!-- Slide {slide.number}: {slide.title} -->\n')
-
-    def validate_preconditions(self, operation: str, position: int) -> List[Slide]:
-        """
-        Validate preconditions before operation
-
-        Args:
-            operation: 'add' or 'delete'
-            position: Slide position
-
-        Returns:
-            List of current slides
-
-        Raises:
-            SystemExit: If validation fails
-        """
-        # Check slides.md exists
-        if not self.slides_md.exists():
-            print(f"Error: slides.md not found at {self.slides_md}", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Check slides/ directory exists
-        if not self.slides_dir.exists():
-            print(f"Error: slides/ directory not found at {self.slides_dir}", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Check write permissions
-        if not os.access(self.slides_md, os.W_OK):
-            print(f"Error: No write permission for {self.slides_md}", file=sys.stderr)
-            sys.exit(ExitCode.GENERAL_ERROR)
-
-        # Parse slides
-        slides = self.parse_slides_md()
-
-        if not slides:
-            print("Error: No slides found in slides.md", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Validate position range
-        if operation == 'delete':
-            if position < 1 or position > len(slides):
-                print(f"Error: Position must be 1-{len(slides)}", file=sys.stderr)
-                sys.exit(ExitCode.INVALID_ARGS)
-        elif operation == 'add':
-            if position < 1 or position > len(slides) + 1:
-                print(f"Error: Position must be 1-{len(slides) + 1}", file=sys.stderr)
-                sys.exit(ExitCode.INVALID_ARGS)
-
-        # Check max slides limit
-        if operation == 'add' and len(slides) >= 99:
-            print("Error: Maximum 99 slides supported. Consider splitting presentation.", file=sys.stderr)
-            sys.exit(ExitCode.INVALID_ARGS)
-
-        return slides
-
-    def verify_postconditions(self, expected_count: int, allow_gaps: bool = False):
-        """
-        Verify postconditions after operation
-
-        Args:
-            expected_count: Expected number of slides
-            allow_gaps: If True, don't fail on numbering gaps
-
-        Raises:
-            Exception: If verification fails
-        """
-        # Reparse slides.md
-        new_slides = self.parse_slides_md()
-
-        # Check count
-        if len(new_slides) != expected_count:
-            raise Exception(f"Slide count mismatch: expected {expected_count}, got {len(new_slides)}")
-
-        # Verify numbering sequence (warn about gaps but don't fail if allow_gaps=True)
-        gaps = self.detect_gaps(new_slides)
-        if gaps and not allow_gaps:
-            raise Exception(f"Numbering gaps detected at positions: {gaps}")
-        elif gaps:
-            print(f"Warning: Numbering gaps exist at positions: {gaps}", file=sys.stderr)
-            print(f"Tip: Run 'manage-slides.py renumber' to fix gaps", file=sys.stderr)
-
-        # Verify all files exist
-        for slide in new_slides:
-            filepath = self.slides_md.parent / slide.src
-            if not filepath.exists():
-                raise Exception(f"Missing file: {filepath}")
-
-    def delete_slide(self, slide_number: int, renumber: bool = False):
-        """
-        Delete slide by slide number
-
-        Args:
-            slide_number: Slide number to delete (from <!-- Slide N: ... --> comment)
-                         Example: slide_number=6 deletes the slide marked as "Slide 6"
-            renumber: If True, renumber all slides after deletion to close gaps
-        """
-        # Parse slides first
-        slides = self.parse_slides_md()
-
-        if not slides:
-            print("Error: No slides found in slides.md", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Find slide by number
-        target_slide = None
-        target_position = None
-        for i, slide in enumerate(slides):
-            if slide.number == slide_number:
-                target_slide = slide
-                target_position = i + 1  # 1-indexed position
-                break
-
-        if not target_slide:
-            print(f"Error: Slide {slide_number} not found", file=sys.stderr)
-            print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Validate preconditions using position
-        slides = self.validate_preconditions('delete', target_position)
-
-        print(f"Deleting Slide {slide_number} (position {target_position} in list)")
-        print(f"  Title: {target_slide.title}")
-        print(f"  File: {target_slide.src}")
-
-        # Backup state
-        self.backup_state()
-
-        try:
-            # Get the file to delete
-            target_file = self.slides_md.parent / target_slide.src
-
-            # Remove target slide from list
-            slides.pop(target_position - 1)
-
-            if renumber:
-                # Renumber slides sequentially, preserving gap at beginning
-                # Slide 1 = title (frontmatter), first file = 02-
-                print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
-
-                # First slide file should always be 02- (after title which is slide 1)
-                first_file_num = 2
-
-                for i, slide in enumerate(slides):
-                    new_num = first_file_num + i
-                    old_path = self.slides_md.parent / slide.src
-
-                    # Parse old filename
-                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
-                    if not match:
-                        raise Exception(f"Invalid filename format: {slide.src}")
-
-                    old_num = int(match.group(1))
-                    slug = match.group(2)
-
-                    if old_num != new_num:
-                        new_filename = f"{new_num:02d}-{slug}.md"
-                        new_path = self.slides_dir / new_filename
-
-                        print(f"  {old_path.name} -> {new_path.name}")
-                        self.move_file(old_path, new_path)
-
-                        # Update slide object
-                        slide.number = new_num
-                        slide.src = f"slides/{new_filename}"
-
-            # Rebuild slides.md
-            self.rebuild_slides_md(slides)
-
-            # Delete target file (after slides.md is updated)
-            if target_file.exists():
-                if self.is_git_tracked(target_file):
-                    subprocess.run(['git', 'rm', str(target_file)], check=True, cwd=self.slides_md.parent)
-                else:
-                    target_file.unlink()
-
-            # Verify postconditions (allow gaps if not renumbering)
-            self.verify_postconditions(len(slides), allow_gaps=(not renumber))
-
-            # Cleanup backup
-            if self.backup_file:
-                self.backup_file.unlink()
-
-            print(f"\n✓ Successfully deleted slide")
-            if renumber:
-                print(f"✓ Renumbered all slides sequentially")
-            else:
-                # Check for gaps
-                gaps = self.detect_gaps(slides)
-                if gaps:
-                    print(f"\n⚠ Warning: Numbering gaps exist at positions: {gaps}")
-                    print(f"Tip: Use --renumber flag to fix gaps automatically")
-
-        except Exception as e:
-            print(f"Error during deletion: {e}", file=sys.stderr)
-            self.rollback()
-            sys.exit(ExitCode.GENERAL_ERROR)
-
-    def add_slide(self, slide_number: int, title: str, layout: str = 'default', renumber: bool = False):
-        """
-        Add slide at slide number
-
-        Args:
-            slide_number: Slide number where to insert (from <!-- Slide N: ... --> comment)
-                         Example: slide_number=6 inserts a new "Slide 6", shifting existing 6+ forward
-            title: New slide title
-            layout: Slidev layout (default: 'default')
-            renumber: If True, renumber all slides after insertion to be sequential
-        """
-        # Parse slides first to find position
-        slides = self.parse_slides_md()
-
-        if not slides:
-            # Empty presentation, add as first slide
-            target_position = 1
-        else:
-            # Find where to insert based on slide number
-            target_position = None
-            for i, slide in enumerate(slides):
-                if slide.number >= slide_number:
-                    target_position = i + 1  # Insert before this slide
-                    break
-
-            if target_position is None:
-                # Insert at end
-                target_position = len(slides) + 1
-
-        # Validate preconditions
-        slides = self.validate_preconditions('add', target_position)
-
-        # Use the requested slide number
-        new_slide_num = slide_number
-
-        slug = self.generate_slug(title)
-        new_filename = f"{new_slide_num:02d}-{slug}.md"
-        new_filepath = self.slides_dir / new_filename
-
-        print(f"Adding Slide {slide_number} at position {target_position}")
-        print(f"  Title: {title}")
-        print(f"  File: slides/{new_filename}")
-        print(f"  Layout: {layout}")
-
-        # Backup state
-        self.backup_state()
-
-        try:
-            # Create new slide file
-            print(f"\nCreating new slide: {new_filepath}")
-            self.create_slide_file(new_filepath, title, layout)
-
-            # Insert new slide into list
-            new_slide = Slide(number=new_slide_num, src=f"slides/{new_filename}", title=title)
-            slides.insert(target_position - 1, new_slide)
-
-            if renumber:
-                # Renumber slides sequentially, preserving gap at beginning
-                # Slide 1 = title (frontmatter), first file = 02-
-                print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
-
-                # First slide file should always be 02- (after title which is slide 1)
-                first_file_num = 2
-
-                for i, slide in enumerate(slides):
-                    new_num = first_file_num + i
-                    old_path = self.slides_md.parent / slide.src
-
-                    # Parse old filename
-                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
-                    if not match:
-                        raise Exception(f"Invalid filename format: {slide.src}")
-
-                    old_num = int(match.group(1))
-                    slug_part = match.group(2)
-
-                    if old_num != new_num:
-                        new_filename_renumber = f"{new_num:02d}-{slug_part}.md"
-                        new_path = self.slides_dir / new_filename_renumber
-
-                        print(f"  {old_path.name} -> {new_path.name}")
-                        self.move_file(old_path, new_path)
-
-                        # Update slide object
-                        slide.number = new_num
-                        slide.src = f"slides/{new_filename_renumber}"
-
-            # Rebuild slides.md
-            self.rebuild_slides_md(slides)
-
-            # Verify postconditions (allow gaps if not renumbering)
-            self.verify_postconditions(len(slides), allow_gaps=(not renumber))
-
-            # Cleanup backup
-            if self.backup_file:
-                self.backup_file.unlink()
-
-            print(f"\n✓ Successfully added Slide {slide_number} at position {target_position}")
-            if renumber:
-                print(f"✓ Renumbered all slides sequentially")
-            else:
-                # Check for gaps
-                gaps = self.detect_gaps(slides)
-                if gaps:
-                    print(f"\n⚠ Warning: Numbering gaps exist at positions: {gaps}")
-                    print(f"Tip: Use --renumber flag to fix gaps automatically")
-
-        except Exception as e:
-            print(f"Error during addition: {e}", file=sys.stderr)
-            self.rollback()
-            sys.exit(ExitCode.GENERAL_ERROR)
-
-    def move_slide(self, from_slide_number: int, after_slide_number: int):
-        """
-        Move slide to position after specified slide number
-
-        Args:
-            from_slide_number: Slide number to move (from <!-- Slide N: ... --> comment)
-            after_slide_number: Slide number to place FROM slide after
-                               Example: from=6, after=3 → slide 6 becomes new slide 4
-
-        Example:
-            Current: Slide 2, 3, 4, 5, 6, 7
-            move_slide(6, 3)
-            Result:  Slide 2, 3, 4, 5, 6, 7 (renumbered: old 2,3,6,4,5,7 → new 2,3,4,5,6,7)
-        """
-        # 1. Parse slides
-        slides = self.parse_slides_md()
-
-        if not slides:
-            print("Error: No slides found in slides.md", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # 2. Find FROM slide
-        from_slide = None
-        from_position = None
-        for i, slide in enumerate(slides):
-            if slide.number == from_slide_number:
-                from_slide = slide
-                from_position = i + 1  # 1-indexed
-                break
-
-        if not from_slide:
-            print(f"Error: Slide {from_slide_number} not found", file=sys.stderr)
-            print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # 3. Validate FROM slide is not slide 1
-        if from_slide_number == 1:
-            print("Error: Cannot move slide 1 (title from frontmatter)", file=sys.stderr)
-            sys.exit(ExitCode.INVALID_ARGS)
-
-        # 4. Find AFTER slide position
-        after_position = None
-        if after_slide_number == 1:
-            # Move to beginning (becomes slide 2)
-            after_position = 0
-        else:
-            for i, slide in enumerate(slides):
-                if slide.number == after_slide_number:
-                    after_position = i + 1  # 1-indexed
-                    break
-
-            if after_position is None:
-                print(f"Error: Target slide {after_slide_number} not found", file=sys.stderr)
-                print(f"Available slides: {[s.number for s in slides]}", file=sys.stderr)
-                sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # 5. Validate move makes sense
-        if from_slide_number == after_slide_number:
-            print(f"Error: Cannot move slide {from_slide_number} after itself", file=sys.stderr)
-            sys.exit(ExitCode.INVALID_ARGS)
-
-        # Check if already in position (from is immediately after target)
-        if from_position == after_position + 1:
-            print(f"Slide {from_slide_number} is already after slide {after_slide_number}")
-            print("No changes needed.")
-            return
-
-        # 6. Preview move
-        print(f"Moving Slide {from_slide_number} to position after Slide {after_slide_number}")
-        print(f"  Title: {from_slide.title}")
-        print(f"  File: {from_slide.src}")
-        print(f"  Current position: {from_position}")
-        print(f"  New position: {after_position + 1}")
-
-        # 7. Backup state
-        self.backup_state()
+            os.kill(holder['pid'], 0)
+            return False
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            return False
 
         try:
-            # 8. Remove slide from current position
-            slides.pop(from_position - 1)
-
-            # 9. Calculate insert position (adjust if moving forward)
-            if from_position < after_position:
-                # Removed from earlier, so target position shifted back by 1
-                insert_index = after_position - 1
-            else:
-                # Moving backward, insert position stays same
-                insert_index = after_position
-
-            # 10. Insert at new position
-            slides.insert(insert_index, from_slide)
-
-            # 11. Renumber all slides sequentially (always for move)
-            print("\nRenumbering all slides sequentially (preserving slide 1 gap)...")
-
-            # First slide file should always be 02- (after title which is slide 1)
-            first_file_num = 2
-
-            for i, slide in enumerate(slides):
-                new_num = first_file_num + i
-                old_path = self.slides_md.parent / slide.src
-
-                # Parse old filename
-                match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
-                if not match:
-                    raise Exception(f"Invalid filename format: {slide.src}")
-
-                old_num = int(match.group(1))
-                slug = match.group(2)
-
-                if old_num != new_num:
-                    new_filename = f"{new_num:02d}-{slug}.md"
-                    new_path = self.slides_dir / new_filename
-
-                    print(f"  {old_path.name} -> {new_path.name}")
-                    self.move_file(old_path, new_path)
-
-                    # Update slide object
-                    slide.number = new_num
-                    slide.src = f"slides/{new_filename}"
-
-            # 12. Rebuild slides.md
-            self.rebuild_slides_md(slides)
-
-            # 13. Verify postconditions (no gaps after renumbering)
-            self.verify_postconditions(len(slides), allow_gaps=False)
-
-            # 14. Cleanup backup
-            if self.backup_file:
-                self.backup_file.unlink()
-
-            print(f"\n✓ Successfully moved slide {from_slide_number} to position after {after_slide_number}")
-            print(f"✓ Renumbered all slides sequentially")
-
-        except Exception as e:
-            print(f"Error during move: {e}", file=sys.stderr)
-            self.rollback()
-            sys.exit(ExitCode.GENERAL_ERROR)
-
-    def renumber_all(self):
-        """
-        Renumber all slides to close middle gaps while preserving beginning gap
-
-        Preserves the gap between slide 1 and slide 2 (typical: title at 1, content at 5+)
-        but fixes any gaps in the middle sequence.
-
-        Example:
-            Before: [1, 5, 6, 9, 10] (gap at beginning: 1->5, gap in middle: 6->9)
-            After:  [1, 5, 6, 7, 8]  (beginning gap preserved, middle gap fixed)
-        """
-        # Parse current slides
-        slides = self.parse_slides_md()
-
-        if not slides:
-            print("No slides found", file=sys.stderr)
-            sys.exit(ExitCode.SLIDE_NOT_FOUND)
-
-        # Check for gaps (ignore beginning gap)
-        gaps = self.detect_gaps(slides, ignore_beginning=True)
-        if not gaps:
-            print("No gaps detected in middle. Slides are properly numbered.")
-            print("(Beginning gap between slides 1 and 2 is preserved as designed)")
+            if os.stat(self.path).st_ino == inode:
+                self.path.unlink()
+                print(f"Warning: Removed stale deck lock of dead process {holder['pid']} "
+                      f"({holder.get('operation', 'unknown operation')})", file=sys.stderr)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def release(self):
+        """Release the lock (no-op if not held)"""
+        if self.fd is None:
             return
-
-        print(f"Detected gaps in middle at positions: {gaps}")
-        print(f"Renumbering {len(slides)} slides to close middle gaps...")
-        print(f"(Preserving gap between slide 1 and slide 2)")
-
-        # Backup state
-        self.backup_state()
-
-        try:
-            # Preserve first slide number
-            # Start sequential numbering from second slide onwards
-            if len(slides) >= 2:
-                first_slide_num = slides[0].number
-                second_slide_num = slides[1].number
-
-                print(f"\nPreserving beginning gap: slide {first_slide_num} -> slide {second_slide_num}")
-
-                # Keep first slide unchanged
-                # Renumber slides 2-N sequentially from second slide's number
-                for i, slide in enumerate(slides):
-                    if i == 0:
-                        # Keep first slide number unchanged
-                        new_num = first_slide_num
-                    else:
-                        # Sequential from second slide's number onwards
-                        new_num = second_slide_num + (i - 1)
-
-                    old_path = self.slides_md.parent / slide.src
-
-                    # Parse old filename
-                    match = re.match(r'slides/(\d+)-(.+)\.md', slide.src)
-                    if not match:
-                        raise Exception(f"Invalid filename format: {slide.src}")
-
-                    old_num = int(match.group(1))
-                    slug = match.group(2)
-
-                    if old_num != new_num:
-                        new_filename = f"{new_num:02d}-{slug}.md"
-                        new_path = self.slides_dir / new_filename
-
-                        print(f"  {old_path.name} -> {new_path.name}")
-                        self.move_file(old_path, new_path)
-
-                        # Update slide object
-                        slide.number = new_num
-                        slide.src = f"slides/{new_filename}"
-            else:
-                # Only one slide, keep it unchanged
-                print("Only one slide found, no renumbering needed")
-
-            # Rebuild slides.md
-            self.rebuild_slides_md(slides)
-
-            # Verify postconditions (allow beginning gap)
-            # Check for middle gaps only
-            new_gaps = self.detect_gaps(slides, ignore_beginning=True)
-            if new_gaps:
-                raise Exception(f"Middle gaps still exist after renumbering: {new_gaps}")
-
-            # Cleanup backup
-            if self.backup_file:
-                self.backup_file.unlink()
-
-            print(f"\n✓ Successfully renumbered all slides")
-            if len(slides) >= 2:
-                print(f"✓ Slides: {slides[0].number}, {slides[1].number}-{slides[-1].number} (beginning gap preserved)")
-            else:
-                print(f"✓ Slide: {slides[0].number}")
-
-        except Exception as e:
-            print(f"Error during renumbering: {e}", file=sys.stderr)
-            self.rollback()
-            sys.exit(ExitCode.GENERAL_ERROR)
+        os.ftruncate(self.fd, 0)
+        if fcntl is None:
+            self.path.unlink(missing_ok=True)
+        os.close(self.fd)
+        self.fd = None
 
 
 def main():
@@ -862,77 +231,491 @@ Examples:
   Fix all gaps in slide numbering:
     python manage-slides.py renumber
 
+  Find slides mentioning GPUs and the exact phrase "device plugin":
+    python manage-slides.py search 'gpu "device plugin"'
+
+  Search every deck below the current directory:
+    python manage-slides.py search kubernetes --workspace .
+
+  Create all slides of a new deck from a JSON outline in one pass:
+    python manage-slides.py scaffold --from outline.json
+
+  List slides with the deck hash, then delete only if nobody changed the deck meanwhile:
+    python manage-slides.py list
+    python manage-slides.py delete 5 --renumber --expect-hash 3f2a9c0d1b7e4a65
+
+  Find images and diagram sources no slide uses any more, then remove them:
+    python manage-slides.py gc
+    python manage-slides.py gc --delete
+
+  Shrink all images used by slides to slide resolution as WebP and update the slides:
+    python manage-slides.py optimize-images
+
+  Edit all presenter notes in one file, then write back only the changed ones:
+    python manage-slides.py notes export --output notes.md
+    python manage-slides.py notes import notes.md
+
+  Build from a single inlined file (faster dev-server start on big decks), or split one back:
+    python manage-slides.py bundle && slidev build slides.bundled.md
+    python manage-slides.py explode --from slides.bundled.md
+
+  Export to exports/slides.pdf, re-rendering only slides changed since the last export:
+    python manage-slides.py export
+
+  Undo the last operation, redo it, or list snapshots:
+    python manage-slides.py undo
+    python manage-slides.py redo
+    python manage-slides.py history
+
+  Extract the deck outline into outline.md (or as JSON):
+    python manage-slides.py outline --output outline.md
+    python manage-slides.py outline --format json
+
 Note: Arguments are SLIDE NUMBERS (from <!-- Slide N: ... -->), not list positions
         """
     )
 
-    parser.add_argument(
-        'operation',
-        choices=['add', 'delete', 'move', 'renumber'],
-        help='Operation to perform'
+    subparsers = parser.add_subparsers(dest='operation', metavar='operation', required=True)
+
+    # Options shared by all modifying operations
+    lock_options = argparse.ArgumentParser(add_help=False)
+    lock_options.add_argument(
+        '--lock-timeout',
+        type=float,
+        default=30.0,
+        help='Seconds to wait for other operations on the deck to finish (default: 30)'
+    )
+    lock_options.add_argument(
+        '--expect-hash',
+        help='Optimistic mode: fail immediately unless the deck still has this hash (see list)'
+    )
+
+    delete_parser = subparsers.add_parser('delete', help='Delete a slide', parents=[lock_options])
+    delete_parser.add_argument(
+        'slide_number',
+        type=int,
+        help='Slide number (from <!-- Slide N: ... --> comment)'
     )
-    parser.add_argument(
+    delete_parser.add_argument(
+        '--renumber',
+        action='store_true',
+        help='Renumber all slides after operation to close gaps'
+    )
+
+    add_parser = subparsers.add_parser('add', help='Insert a new slide', parents=[lock_options])
+    add_parser.add_argument(
         'slide_number',
         type=int,
-        nargs='?',
-        help='Slide number (from <!-- Slide N: ... --> comment, not required for renumber)'
+        help='Slide number (from <!-- Slide N: ... --> comment)'
     )
-    parser.add_argument(
+    add_parser.add_argument(
         '--title',
-        help='Slide title (required for add operation)'
+        required=True,
+        help='Slide title'
     )
-    parser.add_argument(
+    add_parser.add_argument(
         '--layout',
         default='default',
         help='Slidev layout (default: default)'
     )
-    parser.add_argument(
+    add_parser.add_argument(
         '--renumber',
         action='store_true',
-        help='Renumber all slides after operation to close gaps (for add/delete)'
+        help='Renumber all slides after operation to close gaps'
     )
-    parser.add_argument(
+
+    move_parser = subparsers.add_parser('move', help='Move a slide after another slide',
+                                        parents=[lock_options])
+    move_parser.add_argument(
+        'slide_number',
+        type=int,
+        help='Slide number (from <!-- Slide N: ... --> comment)'
+    )
+    move_parser.add_argument(
         '--after',
         type=int,
-        help='Target slide number to move after (required for move operation)'
+        required=True,
+        help='Target slide number to move after'
     )
 
-    args = parser.parse_args()
+    subparsers.add_parser('renumber', help='Close numbering gaps in the middle of the deck',
+                          parents=[lock_options])
 
-    # Validate arguments
-    if args.operation == 'add' and not args.title:
-        parser.error("--title is required for add operation")
+    search_parser = subparsers.add_parser('search', help='Full-text search over slides and presenter notes')
+    search_parser.add_argument(
+        'query',
+        help='Search terms; wrap phrases in double quotes'
+    )
+    search_parser.add_argument(
+        '--limit',
+        type=int,
+        default=10,
+        help='Maximum number of results (default: 10)'
+    )
+    search_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as JSON'
+    )
+    search_parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Discard the cached index and re-read all slide files'
+    )
+    search_parser.add_argument(
+        '--workspace',
+        type=Path,
+        help='Search every deck (slides.md) below this directory instead of the current deck'
+    )
 
-    if args.operation in ['add', 'delete'] and args.slide_number is None:
-        parser.error(f"slide_number is required for {args.operation} operation")
+    outline_parser = subparsers.add_parser('outline', help='Extract the deck outline from the slide files')
+    outline_parser.add_argument(
+        '--format',
+        choices=['md', 'json'],
+        default='md',
+        help='Output format (default: md, the outline.md layout)'
+    )
+    outline_parser.add_argument(
+        '--output',
+        type=Path,
+        help='Write to this file instead of stdout'
+    )
 
-    if args.operation == 'renumber' and args.slide_number is not None:
-        parser.error("slide_number is not used for renumber operation")
+    scaffold_parser = subparsers.add_parser('scaffold', help='Create many slides from an outline in one pass',
+                                            parents=[lock_options])
+    scaffold_parser.add_argument(
+        '--from',
+        dest='outline',
+        required=True,
+        help='JSON outline file ("-" for stdin): a list of {title, layout, body, notes} '
+             'or an object with "title" and "slides" (as written by "outline --format json")'
+    )
+    scaffold_parser.add_argument(
+        '--append',
+        action='store_true',
+        help='Add the slides after the existing ones instead of requiring an empty deck'
+    )
 
-    if args.operation == 'move':
-        if args.slide_number is None:
-            parser.error("slide_number is required for move operation")
-        if args.after is None:
-            parser.error("--after is required for move operation")
+    undo_parser = subparsers.add_parser('undo', help='Restore an earlier snapshot of the deck',
+                                        parents=[lock_options])
+    undo_target = undo_parser.add_mutually_exclusive_group()
+    undo_target.add_argument(
+        '--steps',
+        type=int,
+        default=1,
+        help='Number of snapshots to go back (default: 1)'
+    )
+    undo_target.add_argument(
+        '--to',
+        type=int,
+        dest='to_id',
+        help='Snapshot ID to restore (see history)'
+    )
+
+    redo_parser = subparsers.add_parser('redo', help='Re-apply snapshots after an undo',
+                                        parents=[lock_options])
+    redo_parser.add_argument(
+        '--steps',
+        type=int,
+        default=1,
+        help='Number of snapshots to go forward (default: 1)'
+    )
+
+    subparsers.add_parser('history', help='List recorded snapshots')
+
+    gc_parser = subparsers.add_parser('gc', help='Report (and delete) images and diagrams no slide refers to',
+                                      parents=[lock_options])
+    gc_parser.add_argument(
+        '--delete',
+        action='store_true',
+        help='Remove the unreferenced assets (git rm for tracked files, in one batch)'
+    )
+    gc_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the report as JSON'
+    )
+
+    optimize_parser = subparsers.add_parser('optimize-images', help='Resize and re-encode images used by slides',
+                                            parents=[lock_options])
+    optimize_parser.add_argument(
+        '--max-width',
+        type=int,
+        default=1920,
+        help='Maximum width in pixels (default: 1920)'
+    )
+    optimize_parser.add_argument(
+        '--max-height',
+        type=int,
+        default=1080,
+        help='Maximum height in pixels (default: 1080)'
+    )
+    optimize_parser.add_argument(
+        '--format',
+        choices=['webp', 'auto'],
+        default='webp',
+        help='Output format: webp, or auto to keep JPEG/PNG (default: webp)'
+    )
+    optimize_parser.add_argument(
+        '--quality',
+        type=int,
+        default=82,
+        help='Lossy encoding quality 1-100 (default: 82)'
+    )
+    optimize_parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes (default: CPU count)'
+    )
+    optimize_parser.add_argument(
+        '--no-rewrite',
+        action='store_true',
+        help='Only write optimized files, leave slide references unchanged'
+    )
+
+    bundle_parser = subparsers.add_parser('bundle', help='Inline all slide files into a single deck file',
+                                          parents=[lock_options])
+    bundle_target = bundle_parser.add_mutually_exclusive_group()
+    bundle_target.add_argument(
+        '--output',
+        type=Path,
+        default=Path('slides.bundled.md'),
+        help='Bundled deck to write (default: slides.bundled.md)'
+    )
+    bundle_target.add_argument(
+        '--in-place',
+        action='store_true',
+        help='Replace slides.md with the bundled deck and remove the slide files'
+    )
+
+    explode_parser = subparsers.add_parser('explode', help='Split an inlined deck into numbered slide files',
+                                           parents=[lock_options])
+    explode_parser.add_argument(
+        '--from',
+        dest='source',
+        type=Path,
+        help='Inlined deck to split (default: slides.md), e.g. an edited slides.bundled.md'
+    )
+
+    notes_parser = subparsers.add_parser('notes', help='Export or import the presenter notes of all slides')
+    notes_actions = notes_parser.add_subparsers(dest='notes_action', required=True)
+    notes_export = notes_actions.add_parser('export', help='Write all notes and coverage stats to one file')
+    notes_export.add_argument(
+        '--format',
+        choices=['md', 'json'],
+        default='md',
+        help='Output format (default: md)'
+    )
+    notes_export.add_argument(
+        '--output',
+        type=Path,
+        help='Write to file instead of stdout'
+    )
+    notes_import = notes_actions.add_parser('import', help='Write edited notes back into the slide files',
+                                            parents=[lock_options])
+    notes_import.add_argument(
+        'notes_file',
+        type=Path,
+        help='Notes file from "notes export" (Markdown or JSON)'
+    )
+
+    export_parser = subparsers.add_parser('export', help='Export to PDF/PNG, re-rendering only changed slides')
+    export_parser.add_argument(
+        '--format',
+        choices=['pdf', 'png'],
+        default='pdf',
+        help='Output format (default: pdf)'
+    )
+    export_parser.add_argument(
+        '--output',
+        type=Path,
+        help='Output PDF file or PNG directory (default: exports/slides.pdf or exports/slides/)'
+    )
+    export_parser.add_argument(
+        '--workers',
+        type=int,
+        default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+        help='Maximum concurrent slidev processes (default: half the CPUs, at most 4)'
+    )
+    export_parser.add_argument(
+        '--dark',
+        action='store_true',
+        help='Export in dark mode'
+    )
+    export_parser.add_argument(
+        '--with-clicks',
+        action='store_true',
+        help='Export one page per click step'
+    )
+    export_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render every slide'
+    )
+    export_parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only list the slides that would be re-rendered'
+    )
+
+    list_parser = subparsers.add_parser('list', help='List slides and the deck hash (never waits for locks)')
+    list_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print as JSON'
+    )
+
+    args = parser.parse_args()
+
+    if args.operation == 'search' and args.workspace:
+        decks = find_decks(args.workspace)
+        if not decks:
+            print(f"Error: No slides.md found below {args.workspace}", file=sys.stderr)
+            sys.exit(ExitCode.SLIDE_NOT_FOUND)
+        run_search(decks, args.query, args.limit, args.rebuild, args.json, args.workspace)
+        sys.exit(ExitCode.SUCCESS)
 
     # Find slides.md
     slides_md = Path.cwd() / 'slides.md'
-    if not slides_md.exists():
+
+    if args.operation == 'scaffold':
+        try:
+            if args.outline == '-':
+                outline = json.load(sys.stdin)
+            else:
+                with open(args.outline, 'r') as f:
+                    outline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read outline {args.outline}: {e}", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        entries = outline.get('slides', []) if isinstance(outline, dict) else outline
+        if not isinstance(entries, list) or not entries:
+            print("Error: Outline contains no slides", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        # Fresh deck: scaffold writes slides.md with this title (slide 1)
+        deck_title = outline.get('title', 'Presentation') if isinstance(outline, dict) else 'Presentation'
+
+    if not slides_md.exists() and args.operation != 'scaffold':
         print("Error: slides.md not found in current directory", file=sys.stderr)
         sys.exit(ExitCode.SLIDE_NOT_FOUND)
 
     # Create manager and execute operation
-    import os  # Import here for validate_preconditions
     manager = SlideManager(slides_md)
-
-    if args.operation == 'delete':
-        manager.delete_slide(args.slide_number, renumber=args.renumber)
-    elif args.operation == 'add':
-        manager.add_slide(args.slide_number, args.title, args.layout, renumber=args.renumber)
-    elif args.operation == 'move':
-        manager.move_slide(args.slide_number, args.after)
-    elif args.operation == 'renumber':
-        manager.renumber_all()
+    label = ' '.join(sys.argv[1:])
+
+    lock = None
+    history = None
+    modifying = ('add', 'delete', 'move', 'renumber', 'scaffold', 'undo', 'redo', 'optimize-images', 'explode')
+    importing_notes = args.operation == 'notes' and args.notes_action == 'import'
+    if args.operation in modifying or (args.operation == 'gc' and args.delete) or \
+            (args.operation == 'bundle' and args.in_place) or importing_notes:
+        # Optimistic mode never waits: a held lock means the deck is changing
+        lock = DeckLock(manager, label, timeout=0 if args.expect_hash else args.lock_timeout)
+        if not lock.acquire():
+            holder = lock.holder()
+            print(f"Error: Deck is locked by another operation: {holder.get('operation', 'unknown')} "
+                  f"(pid {holder.get('pid', '?')}, since {holder.get('since', '?')})", file=sys.stderr)
+            sys.exit(ExitCode.CONFLICT if args.expect_hash else ExitCode.LOCKED)
+
+        if args.expect_hash and manager.deck_hash() != args.expect_hash:
+            print("Error: Deck changed since its hash was read. Re-read it (list) and retry.",
+                  file=sys.stderr)
+            lock.release()
+            sys.exit(ExitCode.CONFLICT)
+
+    if args.operation in ('add', 'delete', 'move', 'renumber', 'scaffold', 'explode') or \
+            (args.operation == 'optimize-images' and not args.no_rewrite) or \
+            (args.operation == 'bundle' and args.in_place) or importing_notes:
+        # Snapshot the deck around every modifying operation (no-op if unchanged)
+        history = SnapshotStore(manager)
+        if slides_md.exists():
+            history.record('working changes')
+
+    try:
+        if args.operation == 'delete':
+            manager.delete_slide(args.slide_number, renumber=args.renumber)
+        elif args.operation == 'add':
+            manager.add_slide(args.slide_number, args.title, args.layout, renumber=args.renumber)
+        elif args.operation == 'move':
+            manager.move_slide(args.slide_number, args.after)
+        elif args.operation == 'renumber':
+            manager.renumber_all()
+        elif args.operation == 'search':
+            run_search([slides_md], args.query, args.limit, args.rebuild, args.json, slides_md.parent)
+        elif args.operation == 'scaffold':
+            manager.scaffold(entries, append=args.append, deck_title=str(deck_title))
+        elif args.operation == 'undo':
+            SnapshotStore(manager).undo(args.steps, args.to_id)
+        elif args.operation == 'redo':
+            SnapshotStore(manager).redo(args.steps)
+        elif args.operation == 'history':
+            SnapshotStore(manager).print_history()
+        elif args.operation == 'optimize-images':
+            ImageOptimizer(manager, args.max_width, args.max_height, args.format, args.quality).run(
+                args.workers, rewrite=not args.no_rewrite)
+        elif args.operation == 'bundle':
+            DeckBundler(manager).bundle(args.output, in_place=args.in_place)
+        elif args.operation == 'explode':
+            if args.source and not args.source.exists():
+                print(f"Error: {args.source} not found", file=sys.stderr)
+                sys.exit(ExitCode.INVALID_ARGS)
+            DeckBundler(manager).explode(args.source.resolve() if args.source else None)
+        elif args.operation == 'notes':
+            pipeline = NotesPipeline(manager)
+            if args.notes_action == 'export':
+                pipeline.export(args.format, args.output)
+            else:
+                if not args.notes_file.exists():
+                    print(f"Error: {args.notes_file} not found", file=sys.stderr)
+                    sys.exit(ExitCode.INVALID_ARGS)
+                pipeline.import_notes(args.notes_file)
+        elif args.operation == 'export':
+            output = args.output or Path('exports') / ('slides.pdf' if args.format == 'pdf' else 'slides')
+            try:
+                exporter = DeckExporter(manager, args.format, args.dark, args.with_clicks)
+                exporter.run(output, args.workers, force=args.force, dry_run=args.dry_run)
+            except (RuntimeError, subprocess.CalledProcessError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(ExitCode.GENERAL_ERROR)
+        elif args.operation == 'gc':
+            run_gc(manager, args.delete, args.json)
+        elif args.operation == 'list':
+            # Parse and hash the same read of slides.md so the listing matches the hash
+            content = manager.slides_md.read_bytes()
+            slides = manager.parse_slides_md(content.decode())
+            deck_hash = manager.deck_hash(content)
+            if args.json:
+                print(json.dumps({
+                    'hash': deck_hash,
+                    'slides': [{'number': s.number, 'src': s.src, 'title': s.title} for s in slides],
+                }, indent=2))
+            else:
+                print(f"Deck hash: {deck_hash}")
+                for slide in slides:
+                    print(f"  Slide {slide.number:<4} {slide.src}  {slide.title}")
+        elif args.operation == 'outline':
+            extractor = OutlineExtractor(manager)
+            slides = extractor.extract()
+            if args.format == 'json':
+                output = extractor.render_json(slides)
+            else:
+                output = extractor.render_markdown(slides)
+            if args.output:
+                atomic_write_text(args.output, output)
+                print(f"✓ Outline of {len(slides)} slides written to {args.output} "
+                      f"({len(slides) - extractor.cache_hits} scanned, {extractor.cache_hits} cached)")
+            else:
+                sys.stdout.write(output)
+
+        if history:
+            history.record(label)
+        if lock and args.expect_hash:
+            print(f"Deck hash: {manager.deck_hash()}")
+    finally:
+        if lock:
+            lock.release()
 
     sys.exit(ExitCode.SUCCESS)
 
@@ -0,0 +1,195 @@
+"""
+Notes Pipeline
+
+Exports the presenter notes of every slide to one Markdown or JSON file and
+imports an edited file back, backing the notes command of manage-slides.py.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from deck import ExitCode, SlideManager, atomic_write_text, notes_timing, set_slide_notes, split_slide
+
+
+class NotesPipeline:
+    """
+    Presenter notes of the whole deck as one file, out and back in
+
+    export makes one pass over the slide files and writes every slide's
+    trailing <!-- ... --> notes block to a JSON or Markdown file, with
+    coverage stats. import reads such a file and rewrites, atomically,
+    only the slides whose notes changed.
+
+    Markdown layout (one section per slide, notes text verbatim):
+
+        ## Slide 3: Title
+        <!-- src: slides/03-title.md -->
+
+        notes...
+    """
+
+    # Template text written by add/scaffold, counted as missing notes
+    PLACEHOLDERS = {'Presenter notes'}
+    SECTION_RE = re.compile(r'^## Slide (\d+): (.*)$')
+    SRC_RE = re.compile(r'^<!-- src: (\S+) -->$')
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+
+    def collect(self) -> dict:
+        """
+        Read the notes of every slide
+
+        Returns:
+            Dict with stats and a slides list (number, src, title, notes)
+        """
+        slides = []
+        missing = []
+        placeholder = []
+        words = 0
+        timing = 0
+        for slide in self.manager.parse_slides_md():
+            path = self.root / slide.src
+            notes = split_slide(path.read_text()).notes if path.exists() else ''
+            slides.append({'number': slide.number, 'src': slide.src, 'title': slide.title, 'notes': notes})
+            if not notes:
+                missing.append(slide.number)
+            elif notes in self.PLACEHOLDERS:
+                placeholder.append(slide.number)
+            else:
+                words += len(notes.split())
+                timing += notes_timing(notes) or 0
+
+        with_notes = len(slides) - len(missing) - len(placeholder)
+        stats = {
+            'slides': len(slides),
+            'with_notes': with_notes,
+            'coverage': round(100 * with_notes / len(slides), 1) if slides else 0.0,
+            'missing': missing,
+            'placeholder': placeholder,
+            'words': words,
+            'timing_seconds': timing,
+        }
+        return {'stats': stats, 'slides': slides}
+
+    def export(self, fmt: str = 'md', output: Optional[Path] = None):
+        """
+        Write all notes to one file (or stdout)
+
+        Args:
+            fmt: 'md' or 'json'
+            output: Target file (default: stdout)
+        """
+        data = self.collect()
+        stats = data['stats']
+        if fmt == 'json':
+            content = json.dumps(data, indent=2) + '\n'
+        else:
+            lines = [
+                '# Presenter Notes',
+                '',
+                f"<!-- Coverage: {stats['with_notes']}/{stats['slides']} slides ({stats['coverage']}%), "
+                f"{stats['words']} words, timing {stats['timing_seconds'] // 60}:{stats['timing_seconds'] % 60:02d} -->",
+                f"<!-- Missing: {', '.join(map(str, stats['missing'])) or 'none'}; "
+                f"placeholder: {', '.join(map(str, stats['placeholder'])) or 'none'} -->",
+            ]
+            for slide in data['slides']:
+                lines += ['', f"## Slide {slide['number']}: {slide['title']}", f"<!-- src: {slide['src']} -->", '']
+                if slide['notes']:
+                    lines.append(slide['notes'])
+            content = '\n'.join(lines) + '\n'
+
+        if output:
+            atomic_write_text(output, content)
+            print(f"✓ Notes of {stats['slides']} slides written to {output}")
+        else:
+            sys.stdout.write(content)
+        print(f"Coverage: {stats['with_notes']}/{stats['slides']} slides ({stats['coverage']}%)"
+              + (f", missing: {', '.join(map(str, stats['missing'] + stats['placeholder']))}"
+                 if stats['missing'] or stats['placeholder'] else ''),
+              file=sys.stderr if not output else sys.stdout)
+
+    def parse(self, path: Path) -> List[dict]:
+        """
+        Read a notes file written by export (JSON or Markdown)
+
+        Returns:
+            List of dicts with number, src, title and notes
+        """
+        text = path.read_text()
+        if text.lstrip().startswith('{'):
+            return json.loads(text)['slides']
+
+        entries = []
+        current = None
+        for line in text.splitlines():
+            if match := self.SECTION_RE.match(line):
+                current = {'number': int(match.group(1)), 'title': match.group(2), 'src': None, 'lines': []}
+                entries.append(current)
+            elif current is None:
+                continue
+            elif current['src'] is None and not current['lines'] and (match := self.SRC_RE.match(line)):
+                current['src'] = match.group(1)
+            else:
+                current['lines'].append(line)
+        for entry in entries:
+            entry['notes'] = '\n'.join(entry.pop('lines')).strip()
+        return entries
+
+    def import_notes(self, path: Path):
+        """
+        Write notes from a notes file back into the slide files
+
+        Entries are matched by src path, then by file name without its NN-
+        prefix (the deck may have been renumbered since the export). Only
+        slides whose notes differ are rewritten.
+
+        Args:
+            path: Notes file from export
+        """
+        try:
+            entries = self.parse(path)
+        except (ValueError, KeyError) as e:
+            print(f"Error: Cannot read notes file {path}: {e}", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        slides = self.manager.parse_slides_md()
+        by_src = {slide.src: slide for slide in slides}
+        by_slug = {}
+        for slide in slides:
+            by_slug.setdefault(re.sub(r'^\d+-', '', Path(slide.src).name), []).append(slide)
+
+        invalid = [e['number'] for e in entries if '-->' in (e.get('notes') or '')]
+        if invalid:
+            print(f"Error: Notes of slide(s) {', '.join(map(str, invalid))} contain '-->', "
+                  f"which would end the notes comment", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        changed = unchanged = 0
+        unmatched = []
+        for entry in entries:
+            slide = by_src.get(entry.get('src') or '')
+            if slide is None and entry.get('src'):
+                candidates = by_slug.get(re.sub(r'^\d+-', '', Path(entry['src']).name), [])
+                slide = candidates[0] if len(candidates) == 1 else None
+            if slide is None or not (self.root / slide.src).exists():
+                unmatched.append(f"{entry.get('number')} ({entry.get('src')})")
+                continue
+
+            file = self.root / slide.src
+            text = file.read_text()
+            notes = (entry.get('notes') or '').strip()
+            if split_slide(text).notes == notes:
+                unchanged += 1
+                continue
+            atomic_write_text(file, set_slide_notes(text, notes))
+            changed += 1
+
+        for item in unmatched:
+            print(f"Warning: No slide for notes of slide {item}", file=sys.stderr)
+        print(f"✓ Updated notes on {changed} slide(s), {unchanged} unchanged"
+              + (f", {len(unmatched)} not matched" if unmatched else ''))
@@ -0,0 +1,270 @@
+"""
+Outline Extractor
+
+Extracts the structure of a deck (layouts, headings, bullets, code and
+diagram blocks, images, notes and timing) for the outline command of
+manage-slides.py, with a per-slide cache in .slidev-cache/.
+"""
+
+import datetime
+import hashlib
+import json
+import re
+from typing import Dict, List
+
+from deck import CACHE_DIR_NAME, SlideManager, atomic_write_text, notes_timing, split_slide
+
+
+class OutlineExtractor:
+    """
+    Extract the deck structure from slides.md and the slide files
+
+    Each slide file is read once and scanned line by line for its layout,
+    headings, bullet structure, code/mermaid blocks, images and presenter
+    notes. Per-slide results are cached in .slidev-cache/outline-cache.json
+    keyed by content hash, so re-extraction after an edit only re-scans the
+    slides that actually changed.
+    """
+
+    VERSION = 1
+    DEFAULT_SLIDE_SECONDS = 90
+    SECTION_LAYOUTS = {'center', 'cover', 'section', 'section-header'}
+    HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+    BULLET_RE = re.compile(r'^(\s*)(?:[-*+]|\d+[.)])\s+(.+)$')
+    FENCE_RE = re.compile(r'^\s*(`{3,}|~{3,})\s*([\w+-]*)')
+    IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]+\)|<img\b', re.IGNORECASE)
+    LAYOUT_RE = re.compile(r'^layout:\s*(\S+)', re.MULTILINE)
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.cache_file = self.root / CACHE_DIR_NAME / 'outline-cache.json'
+        self.cache: Dict[str, dict] = {}
+        self.cache_hits = 0
+
+    def load_cache(self):
+        """Load cached per-slide results (silently starts empty if missing or stale)"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.VERSION:
+            self.cache = data['slides']
+
+    def save_cache(self, used: set):
+        """Persist the cache, dropping entries no longer referenced by any slide"""
+        self.cache = {digest: entry for digest, entry in self.cache.items() if digest in used}
+        self.cache_file.parent.mkdir(exist_ok=True)
+        data = {'version': self.VERSION, 'slides': self.cache}
+        atomic_write_text(self.cache_file, json.dumps(data, separators=(',', ':')))
+
+    @classmethod
+    def scan_slide(cls, text: str) -> dict:
+        """
+        Scan one slide file
+
+        Args:
+            text: Raw slide file content
+
+        Returns:
+            Dict with layout, headings, bullets, code_blocks, images and notes stats
+        """
+        parts = split_slide(text)
+        layout_match = cls.LAYOUT_RE.search(parts.frontmatter)
+
+        headings = []
+        bullets = []
+        code_blocks = []
+        images = 0
+        fence = None
+
+        for line in parts.body.splitlines():
+            if fence:
+                if line.strip().startswith(fence):
+                    fence = None
+                else:
+                    code_blocks[-1]['lines'] += 1
+                continue
+            if match := cls.FENCE_RE.match(line):
+                fence = match.group(1)
+                code_blocks.append({'lang': match.group(2) or 'text', 'lines': 0})
+            elif match := cls.HEADING_RE.match(line):
+                headings.append({'level': len(match.group(1)), 'text': match.group(2)})
+            elif match := cls.BULLET_RE.match(line):
+                depth = len(match.group(1).expandtabs(4)) // 2
+                bullets.append({'depth': depth, 'text': match.group(2)})
+            images += len(cls.IMAGE_RE.findall(line))
+
+        return {
+            'layout': layout_match.group(1) if layout_match else 'default',
+            'headings': headings,
+            'bullets': bullets,
+            'code_blocks': code_blocks,
+            'images': images,
+            'notes_words': len(parts.notes.split()),
+            'notes_chars': len(parts.notes),
+            'timing': notes_timing(parts.notes),
+        }
+
+    def extract(self) -> List[dict]:
+        """
+        Extract per-slide outline data for every slide in slides.md
+
+        Returns:
+            List of dicts (slide number, src, title plus scan_slide() fields)
+        """
+        self.load_cache()
+        used = set()
+        dirty = False
+        slides = []
+
+        for slide in self.manager.parse_slides_md():
+            entry = {'number': slide.number, 'src': slide.src, 'title': slide.title}
+            try:
+                content = (self.root / slide.src).read_bytes()
+            except FileNotFoundError:
+                entry['missing'] = True
+                slides.append(entry)
+                continue
+
+            digest = hashlib.sha256(content).hexdigest()
+            used.add(digest)
+            scanned = self.cache.get(digest)
+            if scanned is None:
+                scanned = self.scan_slide(content.decode('utf-8'))
+                self.cache[digest] = scanned
+                dirty = True
+            else:
+                self.cache_hits += 1
+            entry.update(scanned)
+            slides.append(entry)
+
+        if dirty or len(used) != len(self.cache):
+            self.save_cache(used)
+
+        return slides
+
+    def deck_title(self) -> str:
+        """Presentation title from the global frontmatter of slides.md"""
+        with open(self.manager.slides_md, 'r') as f:
+            frontmatter = split_slide(f.read()).frontmatter
+        match = re.search(r'^title:\s*(.+)$', frontmatter, re.MULTILINE)
+        return match.group(1).strip().strip('\'"') if match else self.root.name
+
+    def detect_sections(self, slides: List[dict]) -> List[dict]:
+        """
+        Group slides into sections
+
+        A section starts at every slide with a section-style layout (center,
+        cover, section, section-header). Everything from the first slide whose
+        title mentions "backup" onwards is grouped as backup material.
+
+        Returns:
+            List of dicts with name, slides (list of slide dicts) and seconds
+        """
+        sections = []
+        current = None
+        in_backup = False
+
+        for slide in slides:
+            if not in_backup and 'backup' in slide['title'].lower():
+                in_backup = True
+                current = {'name': 'Backup Slides', 'backup': True, 'slides': []}
+                sections.append(current)
+            elif not in_backup and slide.get('layout') in self.SECTION_LAYOUTS:
+                name = slide['headings'][0]['text'] if slide.get('headings') else slide['title']
+                current = {'name': name, 'backup': False, 'slides': []}
+                sections.append(current)
+            elif current is None:
+                current = {'name': 'Introduction', 'backup': False, 'slides': []}
+                sections.append(current)
+            current['slides'].append(slide)
+
+        for section in sections:
+            section['seconds'] = sum(s.get('timing') or self.DEFAULT_SLIDE_SECONDS
+                                     for s in section['slides'])
+        return sections
+
+    @staticmethod
+    def summarize(slide: dict) -> str:
+        """One-line content summary of a slide"""
+        if slide.get('missing'):
+            return f"File missing: ./{slide['src']}"
+        summary = []
+        if slide['bullets']:
+            top_level = sum(1 for b in slide['bullets'] if b['depth'] == 0)
+            nested = len(slide['bullets']) - top_level
+            summary.append(f"{top_level} bullet" + ('s' if top_level != 1 else '')
+                           + (f" (+{nested} nested)" if nested else ''))
+        diagrams = sum(1 for c in slide['code_blocks'] if c['lang'] == 'mermaid')
+        code = [c['lang'] for c in slide['code_blocks'] if c['lang'] != 'mermaid']
+        if diagrams:
+            summary.append(f"{diagrams} mermaid diagram" + ('s' if diagrams > 1 else ''))
+        if code:
+            summary.append(f"code ({', '.join(code)})")
+        if slide['images']:
+            summary.append(f"{slide['images']} image" + ('s' if slide['images'] > 1 else ''))
+        summary.append(f"notes: {slide['notes_words']} words" if slide['notes_words'] else 'no notes')
+        return ', '.join(summary)
+
+    def render_markdown(self, slides: List[dict]) -> str:
+        """Render the outline in the outline.md format used by /slidev:extract-outline"""
+        sections = self.detect_sections(slides)
+        backup_count = sum(len(s['slides']) for s in sections if s['backup'])
+        main_seconds = sum(s['seconds'] for s in sections if not s['backup'])
+
+        lines = [
+            f"# {self.deck_title()}",
+            '',
+            f"**Extracted from**: {self.manager.slides_md.name}",
+            f"**Extraction date**: {datetime.date.today().isoformat()}",
+            f"**Total slides**: {len(slides) - backup_count} main slides + {backup_count} backup slides",
+            f"**Estimated duration**: {round(main_seconds / 60)} minutes",
+        ]
+
+        for section in sections:
+            count = len(section['slides'])
+            heading = f"## {section['name']} ({count} slide{'s' if count != 1 else ''}"
+            if not section['backup']:
+                heading += f", ~{round(section['seconds'] / 60)} minutes"
+            lines += ['', '---', '', heading + ')', '']
+            for slide in section['slides']:
+                layout = f" `{slide['layout']}`" if slide.get('layout', 'default') != 'default' else ''
+                lines.append(f"{slide['number']}. **Slide {slide['number']}**: {slide['title']}{layout}")
+                lines.append(f"   - {self.summarize(slide)}")
+
+        diagrams = sum(1 for s in slides if any(c['lang'] == 'mermaid' for c in s.get('code_blocks', [])))
+        visuals = sum(1 for s in slides if s.get('images')) + diagrams
+        code = sum(1 for s in slides if any(c['lang'] != 'mermaid' for c in s.get('code_blocks', [])))
+        missing_notes = [str(s['number']) for s in slides if not s.get('missing') and not s['notes_words']]
+        lines += [
+            '', '---', '',
+            '## Notes',
+            '',
+            f"**Section structure**: {len(sections)} sections",
+            f"**Visual elements**: {visuals} slides with diagrams/images",
+            f"**Code examples**: {code} slides with code blocks",
+            f"**Slides without presenter notes**: {', '.join(missing_notes) or 'none'}",
+            '',
+        ]
+        return '\n'.join(lines)
+
+    def render_json(self, slides: List[dict]) -> str:
+        """Render the full extraction as JSON"""
+        sections = [
+            {
+                'name': section['name'],
+                'backup': section['backup'],
+                'seconds': section['seconds'],
+                'slides': [s['number'] for s in section['slides']],
+            }
+            for section in self.detect_sections(slides)
+        ]
+        data = {
+            'title': self.deck_title(),
+            'source': self.manager.slides_md.name,
+            'sections': sections,
+            'slides': slides,
+        }
+        return json.dumps(data, indent=2, ensure_ascii=False) + '\n'
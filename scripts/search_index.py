@@ -0,0 +1,316 @@
+"""
+Search Index
+
+Persistent inverted index over slide titles, bodies and presenter notes,
+backing the search command of manage-slides.py (single deck or a whole
+workspace).
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from deck import CACHE_DIR_NAME, SlideManager, split_slide
+
+
+class SlideIndex:
+    """
+    Persistent inverted index over slide titles, bodies and presenter notes
+
+    The index lives in .slidev-cache/search-index.sqlite next to slides.md:
+    one row per slide, and one posting row per (term, slide, field) holding
+    the term's positions. A query reads only the postings of its own terms
+    through the term key, so its cost follows the query rather than the size
+    of the deck. The index is updated incrementally: only slide files whose
+    mtime or size changed since the last run are re-read. Titles come from the
+    <!-- Slide N: ... --> comments in slides.md, so a renamed title is
+    re-indexed without touching the slide file.
+    """
+
+    VERSION = 2
+    FIELD_WEIGHTS = {'title': 3.0, 'body': 1.0, 'notes': 0.5}
+    FIELD_CODES = {'title': 't', 'body': 'b', 'notes': 'n'}
+    FIELD_NAMES = {code: field for field, code in FIELD_CODES.items()}
+    TOKEN_RE = re.compile(r'[^\W_]+')
+    SCHEMA = (
+        'CREATE TABLE docs (src TEXT PRIMARY KEY, number INTEGER, title TEXT, mtime_ns INTEGER, size INTEGER)',
+        # positions: comma-separated token offsets of the term within the field
+        'CREATE TABLE postings (term TEXT, src TEXT, field TEXT, positions TEXT, '
+        'PRIMARY KEY (term, src, field)) WITHOUT ROWID',
+        'CREATE INDEX postings_src ON postings (src, field)',
+    )
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.index_file = self.root / CACHE_DIR_NAME / 'search-index.sqlite'
+        self.db: Optional[sqlite3.Connection] = None
+        # src -> {number, title, mtime_ns, size}, loaded by update(); postings stay on disk
+        self.docs: Dict[str, dict] = {}
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Split text into lowercase word tokens"""
+        return cls.TOKEN_RE.findall(text.lower())
+
+    def open(self):
+        """Open the index database (created on first use)"""
+        self.index_file.parent.mkdir(exist_ok=True)
+        # Superseded JSON index (VERSION 1)
+        self.index_file.with_name('search-index.json').unlink(missing_ok=True)
+        # Transactions are explicit (see update)
+        self.db = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _begin(self):
+        """Take the write lock; an unreadable index file is replaced by an empty one"""
+        try:
+            self.db.execute('BEGIN IMMEDIATE')
+        except sqlite3.DatabaseError as e:
+            if isinstance(e, sqlite3.OperationalError):
+                raise  # Locked or unwritable, not corrupt
+            self.close()
+            self.index_file.unlink()
+            self.open()
+            self.db.execute('BEGIN IMMEDIATE')
+
+    def _add_field(self, src: str, field: str, text: str):
+        """Index one field of a document"""
+        positions: Dict[str, List[int]] = {}
+        for pos, term in enumerate(self.tokenize(text)):
+            positions.setdefault(term, []).append(pos)
+        code = self.FIELD_CODES[field]
+        self.db.executemany(
+            'INSERT INTO postings VALUES (?, ?, ?, ?)',
+            ((term, src, code, ','.join(map(str, term_positions))) for term, term_positions in positions.items())
+        )
+
+    def update(self, rebuild: bool = False) -> tuple[int, int]:
+        """
+        Bring the index in sync with slides.md and the slide files
+
+        Runs as one write transaction, so concurrent searches of the same deck
+        update the index one after the other and each sees the other's work.
+
+        Args:
+            rebuild: If True, discard the persisted index and re-read everything
+
+        Returns:
+            Tuple of (re-indexed slides, removed slides)
+        """
+        if self.db is None:
+            self.open()
+        self._begin()
+        try:
+            result = self._sync(rebuild)
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+        return result
+
+    def _sync(self, rebuild: bool) -> tuple[int, int]:
+        """Body of update(), inside its transaction"""
+        if rebuild or self.db.execute('PRAGMA user_version').fetchone()[0] != self.VERSION:
+            self.db.execute('DROP TABLE IF EXISTS docs')
+            self.db.execute('DROP TABLE IF EXISTS postings')
+            for statement in self.SCHEMA:
+                self.db.execute(statement)
+            self.db.execute(f'PRAGMA user_version = {self.VERSION}')
+        self.docs = {
+            src: {'number': number, 'title': title, 'mtime_ns': mtime_ns, 'size': size}
+            for src, number, title, mtime_ns, size in self.db.execute(
+                'SELECT src, number, title, mtime_ns, size FROM docs')
+        }
+
+        reindexed = 0
+        seen = set()
+
+        for slide in self.manager.parse_slides_md():
+            path = self.root / slide.src
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            seen.add(slide.src)
+
+            doc = self.docs.get(slide.src)
+            if doc and doc['mtime_ns'] == stat.st_mtime_ns and doc['size'] == stat.st_size:
+                if doc['title'] != slide.title:
+                    self.db.execute('DELETE FROM postings WHERE src = ? AND field = ?',
+                                    (slide.src, self.FIELD_CODES['title']))
+                    self._add_field(slide.src, 'title', slide.title)
+                if (doc['title'], doc['number']) != (slide.title, slide.number):
+                    self.db.execute('UPDATE docs SET number = ?, title = ? WHERE src = ?',
+                                    (slide.number, slide.title, slide.src))
+                    doc['title'], doc['number'] = slide.title, slide.number
+                continue
+
+            if doc:
+                self.db.execute('DELETE FROM postings WHERE src = ?', (slide.src,))
+            parts = split_slide(path.read_text())
+            self.docs[slide.src] = {
+                'number': slide.number,
+                'title': slide.title,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+            }
+            self.db.execute('INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)',
+                            (slide.src, slide.number, slide.title, stat.st_mtime_ns, stat.st_size))
+            self._add_field(slide.src, 'title', slide.title)
+            self._add_field(slide.src, 'body', parts.body)
+            self._add_field(slide.src, 'notes', parts.notes)
+            reindexed += 1
+
+        removed = [src for src in self.docs if src not in seen]
+        for src in removed:
+            self.db.execute('DELETE FROM postings WHERE src = ?', (src,))
+            self.db.execute('DELETE FROM docs WHERE src = ?', (src,))
+            del self.docs[src]
+
+        return reindexed, len(removed)
+
+    @staticmethod
+    def _has_phrase(postings: Dict[str, Dict[str, Dict[str, str]]], src: str, tokens: List[str]) -> bool:
+        """Check whether tokens occur consecutively in any field of a document"""
+        first = postings.get(tokens[0], {}).get(src, {})
+        following = [postings.get(t, {}).get(src, {}) for t in tokens[1:]]
+        for field, positions in first.items():
+            later = [{int(p) for p in fields[field].split(',')} if field in fields else set()
+                     for fields in following]
+            for pos in map(int, positions.split(',')):
+                if all(pos + i + 1 in field_positions for i, field_positions in enumerate(later)):
+                    return True
+        return False
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Run a ranked query against the index
+
+        Bare words are OR-ed and ranked by tf-idf with field weights (title >
+        body > notes), scaled by the fraction of query terms matched. Quoted
+        "phrases" must match consecutively within one field.
+
+        Args:
+            query: Query string, e.g. 'gpu "device plugin"'
+            limit: Maximum number of results
+
+        Returns:
+            List of result dicts with number, title, src and score, best first
+        """
+        phrases = [self.tokenize(p) for p in re.findall(r'"([^"]+)"', query)]
+        phrases = [p for p in phrases if p]
+        terms = set(self.tokenize(re.sub(r'"[^"]*"', ' ', query)))
+        for phrase in phrases:
+            terms.update(phrase)
+        if not terms:
+            return []
+
+        # term -> src -> field code -> positions, for the query terms only
+        postings: Dict[str, Dict[str, Dict[str, str]]] = {}
+        rows = self.db.execute(
+            f"SELECT term, src, field, positions FROM postings WHERE term IN ({','.join('?' * len(terms))})",
+            sorted(terms)
+        )
+        for term, src, field, positions in rows:
+            postings.setdefault(term, {}).setdefault(src, {})[field] = positions
+
+        total_docs = len(self.docs) or 1
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for term, term_postings in postings.items():
+            idf = math.log(1 + total_docs / len(term_postings))
+            for src, fields in term_postings.items():
+                tf = 0.0
+                for code, positions in fields.items():
+                    count = positions.count(',') + 1
+                    tf += self.FIELD_WEIGHTS[self.FIELD_NAMES[code]] * (1 + math.log(count))
+                scores[src] = scores.get(src, 0.0) + tf * idf
+                matched[src] = matched.get(src, 0) + 1
+
+        # Rank first, then verify phrases lazily: phrase checks decode
+        # positions, so only as many candidates as needed are inspected
+        ranked = sorted(
+            ((score * matched[src] / len(terms), src) for src, score in scores.items()),
+            key=lambda item: (-item[0], self.docs[item[1]]['number'])
+        )
+        results = []
+        for score, src in ranked:
+            if phrases and not all(self._has_phrase(postings, src, p) for p in phrases):
+                continue
+            doc = self.docs[src]
+            results.append({
+                'number': doc['number'],
+                'title': doc['title'],
+                'src': src,
+                'score': round(score, 4),
+            })
+            if len(results) == limit:
+                break
+
+        return results
+
+
+def find_decks(workspace: Path) -> List[Path]:
+    """
+    Find all slides.md files below a workspace directory
+
+    Skips node_modules and hidden directories.
+    """
+    decks = []
+    for dirpath, dirnames, filenames in os.walk(workspace):
+        dirnames[:] = sorted(d for d in dirnames if d != 'node_modules' and not d.startswith('.'))
+        if 'slides.md' in filenames:
+            decks.append(Path(dirpath) / 'slides.md')
+    return decks
+
+
+def run_search(slides_mds: List[Path], query: str, limit: int, rebuild: bool, as_json: bool,
+               base: Path):
+    """
+    Update the index of each deck and print ranked results across all of them
+
+    Args:
+        slides_mds: slides.md paths of the decks to search
+        query: Query string
+        limit: Maximum number of results
+        rebuild: Force a full index rebuild
+        as_json: Print results as JSON instead of a table
+        base: Directory deck paths are reported relative to
+    """
+    results = []
+    for slides_md in slides_mds:
+        index = SlideIndex(SlideManager(slides_md))
+        try:
+            index.update(rebuild=rebuild)
+            deck = os.path.relpath(slides_md.parent, base)
+            for result in index.search(query, limit):
+                result['deck'] = deck
+                results.append(result)
+        finally:
+            index.close()
+
+    results.sort(key=lambda r: (-r['score'], r['deck'], r['number']))
+    results = results[:limit]
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    if not results:
+        print(f"No slides match: {query}")
+        return
+
+    multi_deck = len(slides_mds) > 1
+    print(f"Found {len(results)} matching slide(s) for: {query}")
+    for result in results:
+        src = os.path.join(result['deck'], result['src']) if multi_deck else result['src']
+        print(f"  Slide {result['number']:<4} {src}  {result['title']}  (score {result['score']:.2f})")
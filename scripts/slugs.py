@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Slug Engine
+
+Single place for turning slide titles into file and directory slugs, shared by
+manage-slides.py (slide files) and create-diagram-slug.sh (diagram sources and
+renders).
+
+Policies:
+    slide:   kebab-case, max 40 chars            "Device Plugins Turn GPUs..." -> device-plugins-turn-gpus-into-schedulable
+    diagram: stop words removed, first 4 words,  "Device Plugins Turn GPUs..." -> slide-21-device-plugins-turn-gpus
+             max 30 chars, optional slide-N- prefix
+
+With --unique, slugs are checked against an index of existing slugs in
+slides/ (NN- prefix stripped), diagrams/ (file stems) and public/images/
+(directory names) plus the slugs already handed out in the same batch.
+Collisions are resolved deterministically by appending -2, -3, ...
+
+Usage:
+    python slugs.py [--policy slide|diagram] [--number N] [--unique] [--root DIR] "<title>" ...
+    python slugs.py [--policy slide|diagram] [--unique] < titles.txt
+
+    Without title arguments, titles are read from stdin, one per line. A line
+    may start with "N<TAB>" to give the slide number for the diagram policy.
+    Slugs are printed one per line, in input order.
+
+Exit Codes:
+    0: Success
+    2: Invalid arguments
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Set
+
+SLIDE_SLUG_MAX = 40
+DIAGRAM_SLUG_MAX = 30
+DIAGRAM_SLUG_WORDS = 4
+
+DIAGRAM_STOP_WORDS = re.compile(
+    r'\b(the|a|an|and|or|but|in|on|at|to|for|of|with|by|from|into|onto)\b'
+)
+
+
+def slide_slug(title: str) -> str:
+    """
+    Generate kebab-case slug for a slide file name
+
+    Args:
+        title: Slide title
+
+    Returns:
+        Slug string (max 40 chars)
+    """
+    slug = title.lower()
+    # Replace non-alphanumeric with hyphens
+    slug = re.sub(r'[^a-z0-9]+', '-', slug)
+    # Remove leading/trailing hyphens
+    slug = slug.strip('-')
+    # Limit to 40 characters
+    return slug[:SLIDE_SLUG_MAX].rstrip('-')
+
+
+def diagram_slug(title: str, slide_number: Optional[int] = None) -> str:
+    """
+    Generate short, readable slug for diagram sources and renders
+
+    Drops stop words and keeps the first four meaningful words, e.g.
+    "Device Plugins Turn GPUs Into Schedulable Resources" -> "device-plugins-turn-gpus".
+
+    Args:
+        title: Slide title
+        slide_number: If given, prefix the slug with "slide-N-"
+
+    Returns:
+        Slug string
+    """
+    slug = DIAGRAM_STOP_WORDS.sub('', title.lower())
+    slug = re.sub(r'[^a-z0-9]+', '-', slug).strip('-')
+    slug = '-'.join(slug.split('-')[:DIAGRAM_SLUG_WORDS])[:DIAGRAM_SLUG_MAX].rstrip('-')
+    if slide_number is not None:
+        return f"slide-{slide_number}-{slug}"
+    return slug
+
+
+class SlugIndex:
+    """
+    Index of slugs already in use in a deck
+
+    Scans slides/ (file names without NN- prefix and .md), diagrams/ (file
+    stems) and public/images/ (directory names) once; every slug handed out
+    by unique() is added, so a batch never produces duplicates either.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.taken: Set[str] = set()
+
+        slides_dir = root / 'slides'
+        if slides_dir.is_dir():
+            for path in slides_dir.glob('*.md'):
+                self.taken.add(re.sub(r'^\d+-', '', path.stem))
+
+        diagrams_dir = root / 'diagrams'
+        if diagrams_dir.is_dir():
+            for path in diagrams_dir.iterdir():
+                if path.is_file():
+                    self.taken.add(path.name.split('.', 1)[0])
+
+        images_dir = root / 'public' / 'images'
+        if images_dir.is_dir():
+            for path in images_dir.iterdir():
+                if path.is_dir():
+                    self.taken.add(path.name)
+
+    def unique(self, slug: str, max_length: Optional[int] = None) -> str:
+        """
+        Return slug, or the first free slug-2, slug-3, ... and reserve it
+
+        Args:
+            slug: Candidate slug
+            max_length: Keep the result within this length by trimming the base
+
+        Returns:
+            A slug not present in the index
+        """
+        candidate = slug
+        counter = 2
+        while candidate in self.taken:
+            suffix = f"-{counter}"
+            base = slug[:max_length - len(suffix)].rstrip('-') if max_length else slug
+            candidate = f"{base}{suffix}"
+            counter += 1
+        self.taken.add(candidate)
+        return candidate
+
+
+def make_slugs(titles: List[str], policy: str = 'slide', numbers: Optional[List[Optional[int]]] = None,
+               index: Optional[SlugIndex] = None) -> List[str]:
+    """
+    Slugify many titles in one go
+
+    Args:
+        titles: Slide titles
+        policy: 'slide' or 'diagram'
+        numbers: Slide number per title (diagram policy only)
+        index: If given, resolve collisions against it
+
+    Returns:
+        Slugs in input order
+    """
+    numbers = numbers or [None] * len(titles)
+    slugs = []
+    for title, number in zip(titles, numbers):
+        if policy == 'diagram':
+            slug = diagram_slug(title, number)
+            max_length = None
+        else:
+            slug = slide_slug(title) or 'slide'
+            max_length = SLIDE_SLUG_MAX
+        slugs.append(index.unique(slug, max_length) if index else slug)
+    return slugs
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Generate slide and diagram slugs',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Diagram slug for slide 21:
+    python slugs.py --policy diagram --number 21 "Device Plugins Turn GPUs Into Schedulable Resources"
+
+  Slide file slugs for a whole deck, avoiding slugs already used in the deck:
+    printf '%s\\n' "Intro" "Architecture" "Intro" | python slugs.py --unique
+        """
+    )
+    parser.add_argument(
+        'titles',
+        nargs='*',
+        help='Titles to slugify (default: read from stdin, one per line)'
+    )
+    parser.add_argument(
+        '--policy',
+        choices=['slide', 'diagram'],
+        default='slide',
+        help='Slug policy (default: slide)'
+    )
+    parser.add_argument(
+        '--number',
+        type=int,
+        help='Slide number for the diagram policy ("slide-N-" prefix)'
+    )
+    parser.add_argument(
+        '--unique',
+        action='store_true',
+        help='Resolve collisions against slugs existing in the deck and in this batch'
+    )
+    parser.add_argument(
+        '--root',
+        type=Path,
+        default=Path.cwd(),
+        help='Deck directory for --unique (default: current directory)'
+    )
+
+    args = parser.parse_args()
+
+    titles = list(args.titles)
+    numbers: List[Optional[int]] = [args.number] * len(titles)
+    if not titles:
+        for line in sys.stdin:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            number = args.number
+            if match := re.match(r'^(\d+)\t(.*)$', line):
+                number = int(match.group(1))
+                line = match.group(2)
+            titles.append(line)
+            numbers.append(number)
+
+    if not titles:
+        parser.error("no titles given")
+
+    index = SlugIndex(args.root) if args.unique else None
+    for slug in make_slugs(titles, args.policy, numbers, index):
+        print(slug)
+
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+Snapshot Store
+
+Content-addressed snapshots of a deck in .slidev-history/, backing the undo,
+redo and history commands of manage-slides.py.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from deck import ExitCode, SlideManager, atomic_write_text
+
+
+class SnapshotStore:
+    """
+    Content-addressed snapshots of the deck for multi-level undo/redo
+
+    Layout of .slidev-history/ next to slides.md:
+        objects/ab/cdef...    file contents, stored once per sha256
+        snapshots/000012.json manifest: slides.md hash plus
+                              [slide number, filename, hash] per slides/*.md
+        history.json          ordered snapshot list and the current position
+        hash-cache.json       (inode, mtime, size) -> hash, so unchanged and
+                              merely renamed files are never re-read
+
+    Recording a snapshot only hashes files whose stat changed and only
+    writes blobs that are not stored yet; restoring one only renames,
+    writes or deletes the files that differ from the working tree.
+    """
+
+    VERSION = 1
+    HISTORY_DIR_NAME = '.slidev-history'
+    MAX_SNAPSHOTS = 100
+
+    def __init__(self, manager: SlideManager):
+        self.manager = manager
+        self.root = manager.slides_md.parent
+        self.history_dir = self.root / self.HISTORY_DIR_NAME
+        self.objects_dir = self.history_dir / 'objects'
+        self.snapshots_dir = self.history_dir / 'snapshots'
+        self.history_file = self.history_dir / 'history.json'
+        self.hash_cache_file = self.history_dir / 'hash-cache.json'
+        self.head = -1
+        self.entries: List[dict] = []
+        self.hash_cache: Dict[str, str] = {}
+        self.hash_cache_dirty = False
+        self.seen_keys: set = set()
+        self._load()
+
+    def _load(self):
+        """Load history and hash cache (silently starts empty if missing)"""
+        try:
+            with open(self.history_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.head = data['head']
+                self.entries = data['entries']
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self.hash_cache_file, 'r') as f:
+                self.hash_cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        """Persist history (and the hash cache if it changed)"""
+        self.history_dir.mkdir(exist_ok=True)
+        data = {'version': self.VERSION, 'head': self.head, 'entries': self.entries}
+        atomic_write_text(self.history_file, json.dumps(data, indent=1))
+        if self.hash_cache_dirty:
+            atomic_write_text(self.hash_cache_file, json.dumps(self.hash_cache, separators=(',', ':')))
+            self.hash_cache_dirty = False
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _hash_file(self, path: Path) -> str:
+        """Hash a file, storing its blob if new; unchanged files are served from the cache"""
+        stat = path.stat()
+        key = f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+        self.seen_keys.add(key)
+        digest = self.hash_cache.get(key)
+        if digest and self._blob_path(digest).exists():
+            return digest
+
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f'.{blob.name}.tmp.{os.getpid()}')
+            tmp.write_bytes(content)
+            os.replace(tmp, blob)
+        self.hash_cache[key] = digest
+        self.hash_cache_dirty = True
+        return digest
+
+    def current_manifest(self) -> dict:
+        """
+        Describe the working tree
+
+        Returns:
+            Dict with slides_md hash and a sorted [number, filename, hash] list
+        """
+        slides = []
+        if self.manager.slides_dir.exists():
+            for entry in os.scandir(self.manager.slides_dir):
+                if not entry.is_file() or not entry.name.endswith('.md'):
+                    continue
+                match = re.match(r'(\d+)-', entry.name)
+                number = int(match.group(1)) if match else None
+                slides.append([number, entry.name, self._hash_file(Path(entry.path))])
+        slides.sort(key=lambda s: s[1])
+        manifest = {'slides_md': self._hash_file(self.manager.slides_md), 'slides': slides}
+
+        # The cache only needs to describe the working tree
+        if len(self.hash_cache) != len(self.seen_keys):
+            self.hash_cache = {key: self.hash_cache[key] for key in self.seen_keys if key in self.hash_cache}
+            self.hash_cache_dirty = True
+        self.seen_keys = set()
+        return manifest
+
+    def _manifest(self, index: int) -> dict:
+        with open(self.snapshots_dir / f"{self.entries[index]['id']:06d}.json", 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _same(a: dict, b: dict) -> bool:
+        return a['slides_md'] == b['slides_md'] and a['slides'] == b['slides']
+
+    def record(self, operation: str) -> bool:
+        """
+        Record the working tree as a new snapshot unless it equals the current one
+
+        Recording after an undo discards the redo branch.
+
+        Args:
+            operation: Label shown in the history
+
+        Returns:
+            True if a snapshot was written
+        """
+        manifest = self.current_manifest()
+        if self.head >= 0 and self._same(manifest, self._manifest(self.head)):
+            if self.hash_cache_dirty:
+                self._save()
+            return False
+
+        dropped = self.entries[self.head + 1:]
+        del self.entries[self.head + 1:]
+
+        # Never reuse the id of a dropped redo entry: _drop() deletes its manifest
+        snapshot_id = max((entry['id'] for entry in self.entries + dropped), default=0) + 1
+        manifest['operation'] = operation
+        manifest['time'] = datetime.datetime.now().isoformat(timespec='seconds')
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.snapshots_dir / f"{snapshot_id:06d}.json",
+                          json.dumps(manifest, separators=(',', ':')))
+        self.entries.append({
+            'id': snapshot_id,
+            'operation': operation,
+            'time': manifest['time'],
+            'slides': len(manifest['slides']),
+        })
+
+        if len(self.entries) > self.MAX_SNAPSHOTS:
+            dropped += self.entries[:-self.MAX_SNAPSHOTS]
+            del self.entries[:-self.MAX_SNAPSHOTS]
+        self.head = len(self.entries) - 1
+
+        if dropped:
+            self._drop(dropped)
+        self._save()
+        return True
+
+    def retained_blobs(self) -> Dict[str, Path]:
+        """
+        Blobs referenced by the snapshots still in history
+
+        Returns:
+            Dict mapping content hash to blob path
+        """
+        live = {}
+        for index in range(len(self.entries)):
+            manifest = self._manifest(index)
+            for digest in [manifest['slides_md']] + [s[2] for s in manifest['slides']]:
+                live[digest] = self._blob_path(digest)
+        return live
+
+    def _drop(self, dropped: List[dict]):
+        """Delete dropped manifests and any blobs no remaining snapshot refers to"""
+        for entry in dropped:
+            (self.snapshots_dir / f"{entry['id']:06d}.json").unlink(missing_ok=True)
+
+        live = self.retained_blobs()
+        for bucket in self.objects_dir.iterdir():
+            for blob in bucket.iterdir():
+                if bucket.name + blob.name not in live:
+                    blob.unlink()
+
+    def restore(self, target: dict) -> int:
+        """
+        Make the working tree match a manifest
+
+        Files already matching are left alone, files whose content exists
+        elsewhere in the tree are renamed, everything else is written from
+        the blob store. Git's index is then synced for the touched paths.
+
+        Args:
+            target: Manifest to restore
+
+        Returns:
+            Number of files touched
+        """
+        current = self.current_manifest()
+        have = {name: digest for _, name, digest in current['slides']}
+        want = {name: digest for _, name, digest in target['slides']}
+
+        # Files whose name/content must change, and spare files to reuse
+        needed = {name: digest for name, digest in want.items() if have.get(name) != digest}
+        spare: Dict[str, List[str]] = {}
+        for name, digest in have.items():
+            if want.get(name) != digest:
+                spare.setdefault(digest, []).append(name)
+
+        renames = []
+        writes = []
+        for name, digest in sorted(needed.items()):
+            if spare.get(digest):
+                renames.append((spare[digest].pop(), name))
+            else:
+                writes.append((name, digest))
+        deletes = [name for names in spare.values() for name in names if name not in want]
+
+        slides_dir = self.manager.slides_dir
+        touched = set()
+
+        # Two phases so renames between existing names never collide
+        for old, _ in renames:
+            os.replace(slides_dir / old, slides_dir / f'.{old}.undo')
+        for name in deletes:
+            (slides_dir / name).unlink()
+            touched.add(name)
+        for old, new in renames:
+            os.replace(slides_dir / f'.{old}.undo', slides_dir / new)
+            touched.update((old, new))
+        for name, digest in writes:
+            atomic_write_text(slides_dir / name, self._blob_path(digest).read_text())
+            touched.add(name)
+
+        paths = [slides_dir / name for name in sorted(touched)]
+        if current['slides_md'] != target['slides_md']:
+            atomic_write_text(self.manager.slides_md, self._blob_path(target['slides_md']).read_text())
+            paths.append(self.manager.slides_md)
+
+        self._sync_git(paths)
+        return len(paths)
+
+    def _sync_git(self, paths: List[Path]):
+        """Stage restored paths if the deck lives in a git work tree (at most two git calls)"""
+        if not paths:
+            return
+        result = subprocess.run(
+            ['git', 'ls-files', '--'] + [str(p) for p in paths],
+            capture_output=True,
+            text=True,
+            cwd=self.root
+        )
+        if result.returncode != 0:
+            return  # Not a git work tree
+        tracked = {(self.root / line).resolve() for line in result.stdout.splitlines()}
+        # Stage tracked paths and restored files; untracked deletions need nothing
+        stage = [str(p) for p in paths if p.exists() or p.resolve() in tracked]
+        if stage:
+            subprocess.run(['git', 'add', '-A', '--'] + stage, capture_output=True, cwd=self.root)
+
+    def checkout(self, index: int):
+        """
+        Restore the snapshot at a history position and move the head there
+
+        Raises:
+            SystemExit: If the position is out of range
+        """
+        if index < 0 or index >= len(self.entries):
+            print("Error: No such snapshot in history", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+
+        entry = self.entries[index]
+        touched = self.restore(self._manifest(index))
+        self.head = index
+        self._save()
+        print(f"✓ Restored snapshot {entry['id']} ({entry['operation']}, {entry['time']})")
+        print(f"✓ {touched} file(s) changed")
+
+    def undo(self, steps: int = 1, to_id: Optional[int] = None):
+        """
+        Go back in history
+
+        Unrecorded edits in the working tree are saved as a snapshot first, so
+        undo never loses work (undo again to step past them).
+        """
+        if self.record('working changes'):
+            print(f"Recorded uncommitted edits as snapshot {self.entries[self.head]['id']}")
+
+        if to_id is not None:
+            index = next((i for i, e in enumerate(self.entries) if e['id'] == to_id), -1)
+        else:
+            index = self.head - steps
+        if index < 0 or index >= self.head:
+            print("Error: Nothing to undo", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+        self.checkout(index)
+
+    def redo(self, steps: int = 1):
+        """Go forward in history after an undo"""
+        if self.head + steps >= len(self.entries):
+            print("Error: Nothing to redo", file=sys.stderr)
+            sys.exit(ExitCode.INVALID_ARGS)
+        if not self._same(self.current_manifest(), self._manifest(self.head)):
+            print("Error: Deck changed since the last undo; redo would discard those edits", file=sys.stderr)
+            print("Tip: Run 'manage-slides.py history' and 'undo --to ID' to pick a snapshot", file=sys.stderr)
+            sys.exit(ExitCode.GENERAL_ERROR)
+        self.checkout(self.head + steps)
+
+    def print_history(self):
+        """List snapshots, marking the current one"""
+        if not self.entries:
+            print("No history recorded yet")
+            return
+        for index, entry in enumerate(self.entries):
+            marker = '*' if index == self.head else ' '
+            print(f"{marker} {entry['id']:>4}  {entry['time']}  {entry['slides']:>3} slides  {entry['operation']}")
+        if self.head < len(self.entries) - 1:
+            print(f"\n{len(self.entries) - 1 - self.head} snapshot(s) can be redone")
@@ -0,0 +1,101 @@
+"""
+Shared helpers for the standalone test scripts in this directory
+
+Each test-*.py script builds scratch decks in a temporary directory, runs
+scripts/manage-slides.py against them and collects problems with Checks,
+which prints the outcome and exits non-zero on failure.
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+MANAGE_SLIDES = SCRIPTS_DIR / 'manage-slides.py'
+
+
+def load_script(name: str):
+    """Import a script from scripts/ as a module (file names may contain dashes)"""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(deck: Path, *args: str, input: str = None, env: dict = None) -> subprocess.CompletedProcess:
+    """Run manage-slides.py in a deck directory"""
+    return subprocess.run(
+        [sys.executable, str(MANAGE_SLIDES), *args],
+        cwd=deck,
+        input=input,
+        capture_output=True,
+        text=True,
+        env=env
+    )
+
+
+def create_deck(deck: Path, outline: list, use_git: bool = False):
+    """
+    Scaffold a scratch deck from outline entries
+
+    Args:
+        deck: Empty directory to create the deck in
+        outline: Scaffold entries ({'title': ..., 'body': ..., 'notes': ...})
+        use_git: Initialise a git repository and commit the deck
+    """
+    (deck / 'slides.md').write_text("---\ntheme: default\ntitle: Test Deck\n---\n")
+    (deck / 'outline.json').write_text(json.dumps(outline))
+    if use_git:
+        subprocess.run(['git', 'init', '-q'], cwd=deck, check=True)
+    result = run(deck, 'scaffold', '--from', 'outline.json')
+    if result.returncode != 0:
+        raise SystemExit(f"Scaffold failed: {result.stderr}")
+    (deck / 'outline.json').unlink()
+    if use_git:
+        subprocess.run(['git', 'add', '-A'], cwd=deck, check=True)
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com',
+                        'commit', '-q', '-m', 'deck'], cwd=deck, check=True)
+
+
+def list_slides(deck: Path) -> list:
+    """Slides as listed by 'manage-slides.py list --json'"""
+    result = run(deck, 'list', '--json')
+    if result.returncode != 0:
+        raise SystemExit(f"list failed: {result.stderr}")
+    return json.loads(result.stdout)['slides']
+
+
+def tree(deck: Path) -> dict:
+    """slides.md and slides/*.md contents, for comparing deck states"""
+    files = {'slides.md': (deck / 'slides.md').read_text()}
+    for path in sorted((deck / 'slides').glob('*.md')):
+        files[f"slides/{path.name}"] = path.read_text()
+    return files
+
+
+class Checks:
+    """Collects failed checks and reports them"""
+
+    def __init__(self):
+        self.problems = []
+
+    def check(self, condition: bool, message: str):
+        if not condition:
+            self.problems.append(message)
+
+    def ok(self, result: subprocess.CompletedProcess, what: str) -> bool:
+        """Check that a manage-slides.py run succeeded"""
+        self.check(result.returncode == 0, f"{what} exited {result.returncode}: {result.stderr.strip()}")
+        return result.returncode == 0
+
+    def report(self, success: str):
+        if self.problems:
+            print("\n✗ FAILED")
+            for problem in self.problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print(f"\n✓ {success}")
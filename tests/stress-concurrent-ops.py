@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Stress Test: Concurrent Slide Operations
+
+Runs hundreds of manage-slides.py operations from parallel processes against a
+scratch deck and checks that the deck is consistent afterwards:
+
+- verify_postconditions() passes (count matches, no gaps, all files exist)
+- slides are numbered 02, 03, ... and every file name prefix matches its number
+- every file in slides/ is referenced exactly once by slides.md
+- no slides.md backup files are left behind
+
+Writers mix pessimistic mode (wait for the deck lock) and optimistic mode
+(list --json, then --expect-hash; conflicts are expected and fine). Readers
+(list, search, outline) run alongside and must never fail.
+
+Usage:
+    python tests/stress-concurrent-ops.py [--ops 300] [--workers 16] [--slides 20] [--git]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from helpers import Checks, create_deck, load_script, run
+
+# Exit codes that are legitimate outcomes under contention
+EXPECTED_FAILURES = {
+    2,  # invalid arguments (e.g. move a slide after itself)
+    3,  # slide not found (picked from a stale listing)
+    6,  # deck changed since --expect-hash was read
+}
+
+
+def random_operation(deck: Path, rng: random.Random) -> tuple[str, int]:
+    """Run one random operation; returns (kind, exit code)"""
+    kind = rng.choices(
+        ['add', 'delete', 'move', 'renumber', 'list', 'search', 'outline'],
+        weights=[25, 20, 25, 5, 10, 10, 5]
+    )[0]
+
+    if kind in ('list', 'search', 'outline'):
+        if kind == 'list':
+            result = run(deck, 'list', '--json')
+        elif kind == 'search':
+            result = run(deck, 'search', f"topic {rng.randint(0, 30)}")
+        else:
+            result = run(deck, 'outline', '--format', 'json')
+        return kind, result.returncode
+
+    # Half of the writers work optimistically on a lock-free listing
+    extra = []
+    count = 20
+    if rng.random() < 0.5:
+        listing = run(deck, 'list', '--json')
+        if listing.returncode != 0:
+            return 'list', listing.returncode
+        data = json.loads(listing.stdout)
+        extra = ['--expect-hash', data['hash']]
+        count = len(data['slides'])
+        kind += '-optimistic'
+
+    number = rng.randint(2, count + 1)
+    if kind.startswith('add'):
+        args = ['add', str(number), '--title', f"Added {rng.randint(0, 10 ** 6)}", '--renumber']
+    elif kind.startswith('delete'):
+        args = ['delete', str(number), '--renumber']
+    elif kind.startswith('move'):
+        args = ['move', str(number), '--after', str(rng.randint(1, count + 1))]
+    else:
+        args = ['renumber']
+
+    return kind, run(deck, *args, '--lock-timeout', '120', *extra).returncode
+
+
+def check_invariants(checks: Checks, deck_module, deck: Path, expected_count: int):
+    """Check that the deck is consistent"""
+    manager = deck_module.SlideManager(deck / 'slides.md')
+
+    try:
+        manager.verify_postconditions(expected_count, allow_gaps=False)
+    except Exception as e:
+        checks.check(False, f"verify_postconditions: {e}")
+
+    slides = manager.parse_slides_md()
+    numbers = [s.number for s in slides]
+    checks.check(numbers == list(range(2, 2 + len(slides))), f"numbering not sequential from 2: {numbers}")
+
+    for slide in slides:
+        prefix = int(Path(slide.src).name.split('-', 1)[0])
+        checks.check(prefix == slide.number, f"{slide.src} listed as slide {slide.number}")
+
+    referenced = Counter(Path(s.src).name for s in slides)
+    on_disk = {p.name for p in (deck / 'slides').glob('*.md')}
+    duplicates = [name for name, n in referenced.items() if n > 1]
+    checks.check(not duplicates, f"files referenced twice: {duplicates}")
+    checks.check(set(referenced) == on_disk, f"orphaned files: {sorted(on_disk - set(referenced))}, "
+                                             f"missing files: {sorted(set(referenced) - on_disk)}")
+
+    backups = list(deck.glob('slides.md.backup.*'))
+    checks.check(not backups, f"leftover backups: {[b.name for b in backups]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress test concurrent manage-slides.py operations')
+    parser.add_argument('--ops', type=int, default=300, help='Number of operations (default: 300)')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent processes (default: 16)')
+    parser.add_argument('--slides', type=int, default=20, help='Initial slide files (default: 20)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--git', action='store_true', help='Run the deck inside a git repository')
+    args = parser.parse_args()
+
+    checks = Checks()
+    deck_module = load_script('deck')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, [{'title': f"Slide {i} topic", 'body': f"- point {i}"} for i in range(args.slides)],
+                    use_git=args.git)
+
+        rngs = [random.Random(args.seed * 100003 + i) for i in range(args.ops)]
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            outcomes = list(pool.map(lambda rng: random_operation(deck, rng), rngs))
+
+        succeeded = Counter(kind.split('-')[0] for kind, code in outcomes if code == 0)
+        unexpected = [(kind, code) for kind, code in outcomes
+                      if code != 0 and not (code in EXPECTED_FAILURES and kind.split('-')[0] not in
+                                            ('list', 'search', 'outline'))]
+        expected_count = args.slides + succeeded['add'] - succeeded['delete']
+
+        print(f"Operations: {len(outcomes)}")
+        for kind, n in sorted(Counter(kind for kind, _ in outcomes).items()):
+            codes = Counter(code for k, code in outcomes if k == kind)
+            print(f"  {kind:<20} {n:>4}  exit codes: {dict(sorted(codes.items()))}")
+        print(f"Expected slide count: {expected_count}")
+
+        check_invariants(checks, deck_module, deck, expected_count)
+        checks.check(not unexpected, f"unexpected failures: {Counter(unexpected)}")
+
+    checks.report("Deck consistent after concurrent operations")
+
+
+if __name__ == '__main__':
+    main()
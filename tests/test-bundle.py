@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test: Bundle/Explode Round Trip
+
+Bundles a scratch deck (in a git repository) whose slides share titles and
+explodes it again. Checks:
+
+- bundle --in-place followed by explode restores every file byte for byte,
+  including the -2 names of duplicate titles, and leaves git status clean
+- bundle --in-place removes the slide files with git rm
+- exploding an edited bundle keeps the recorded names of bundled slides and
+  gives new slides a slug that is unique in the deck
+- keys of a src entry in slides.md (hide:, layout:) reach the bundled slide,
+  win over the slide file's, and go back on the entry when exploded
+- without src markers, duplicate titles still get distinct file names
+
+Usage:
+    python tests/test-bundle.py
+"""
+
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, run, tree
+
+OUTLINE = [{'title': f"Topic {i % 7}", 'notes': f"Notes for slide {i + 2}"} for i in range(9)]
+OUTLINE[1]['layout'] = 'center'
+OUTLINE[2]['body'] = '```yaml\n---\nkey: value\n---\n```'
+
+
+def set_entry_keys(deck: Path, number: int, keys: str):
+    """Add keys after src: in the slides.md entry of slide NN"""
+    text = (deck / 'slides.md').read_text()
+    text = re.sub(rf'^(src: \./slides/{number:02d}-.*\n)', rf'\g<1>{keys}', text, flags=re.M)
+    (deck / 'slides.md').write_text(text)
+
+
+def git_status(deck: Path) -> list:
+    """Changes git reports for slides.md and slides/"""
+    return subprocess.run(['git', 'status', '--porcelain', '--', 'slides.md', 'slides'], cwd=deck,
+                          capture_output=True, text=True).stdout.splitlines()
+
+
+def slide_files(deck: Path) -> list:
+    return sorted(path.name for path in (deck / 'slides').glob('*.md'))
+
+
+def main():
+    checks = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, OUTLINE, use_git=True)
+        set_entry_keys(deck, 4, 'hide: true\nclass: text-center\n')
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com',
+                        'commit', '-q', '-am', 'entry keys'], cwd=deck, check=True)
+        original = tree(deck)
+        original_names = slide_files(deck)
+        checks.check('02-topic-0.md' in original_names and '09-topic-0-2.md' in original_names,
+                     f"scaffolded names: {original_names}")
+
+        checks.ok(run(deck, 'bundle'), "bundle")
+        checks.check(tree(deck) == original, "bundle changed the deck")
+        bundled = (deck / 'slides.bundled.md').read_text()
+        checks.check('<!-- src: slides/09-topic-0-2.md -->' in bundled, "bundle did not record slide files")
+        checks.check('layout: default\nhide: true\nclass: text-center\n---\n<!-- Slide 4: Topic 2 -->\n'
+                     '<!-- src: slides/04-topic-2.md entry: hide, class -->\n' in bundled,
+                     "entry keys not merged into the bundled slide")
+        (deck / 'slides.bundled.md').unlink()
+
+        # In place and back: identical files, nothing left for git to report
+        checks.ok(run(deck, 'bundle', '--in-place'), "bundle --in-place")
+        checks.check(not list((deck / 'slides').glob('*.md')), "slide files left behind")
+        tracked = subprocess.run(['git', 'ls-files', 'slides'], cwd=deck, capture_output=True, text=True).stdout
+        checks.check(tracked == '', f"bundle --in-place did not git rm the slide files: {tracked.split()}")
+        checks.ok(run(deck, 'explode'), "explode")
+        restored = tree(deck)
+        changed = sorted(name for name in set(original) | set(restored) if original.get(name) != restored.get(name))
+        checks.check(not changed, f"round trip changed: {changed}")
+        checks.check(git_status(deck) == [], f"git status after round trip: {git_status(deck)}")
+
+        # Edit the bundle: a new slide with a taken title goes in before slide 5
+        checks.ok(run(deck, 'bundle'), "bundle")
+        text = (deck / 'slides.bundled.md').read_text()
+        marker = '\n---\nlayout: default\n---\n<!-- Slide 5: Topic 3 -->'
+        checks.check(marker in text, "slide 5 marker not found in the bundle")
+        text = text.replace(marker, '\n---\n\n# Topic 0\n\nInserted in the bundle\n' + marker)
+        (deck / 'slides.bundled.md').write_text(text)
+        checks.ok(run(deck, 'explode', '--from', 'slides.bundled.md'), "explode --from")
+        names = slide_files(deck)
+        expected = ['02-topic-0.md', '03-topic-1.md', '04-topic-2.md', '05-topic-0-3.md', '06-topic-3.md',
+                    '07-topic-4.md', '08-topic-5.md', '09-topic-6.md', '10-topic-0-2.md', '11-topic-1-2.md']
+        checks.check(names == expected, f"exploded names: {names}")
+        moved = deck / 'slides' / '10-topic-0-2.md'
+        checks.check(moved.exists() and moved.read_text() == original['slides/09-topic-0-2.md'],
+                     "renumbered slide content changed")
+        staged = git_status(deck)
+        checks.check(all(line[0] != '?' and line[1] == ' ' for line in staged),
+                     f"explode left changes unstaged: {staged}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, OUTLINE)
+        # The entry's layout overrides the file's, as Slidev reads it
+        set_entry_keys(deck, 4, 'layout: center\nhide: true\n')
+        checks.ok(run(deck, 'bundle'), "bundle")
+        slide = (deck / 'slides.bundled.md').read_text().split('<!-- Slide 4: Topic 2 -->')[0].rsplit('\n---\n', 2)[-2]
+        checks.check(slide == 'layout: center\nhide: true', f"slide 4 frontmatter in the bundle: {slide!r}")
+        checks.ok(run(deck, 'bundle', '--in-place'), "bundle --in-place")
+        text = (deck / 'slides.md').read_text()
+        (deck / 'slides.md').write_text(re.sub(r'<!-- src: .* -->\n', '', text))
+        checks.ok(run(deck, 'explode'), "explode without src markers")
+        names = slide_files(deck)
+        checks.check(names == original_names, f"names without src markers: {names}")
+
+    checks.report("bundle and explode round-trip the deck")
+
+
+if __name__ == '__main__':
+    main()
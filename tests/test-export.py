@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test: Incremental Sharded Export
+
+Exports a scratch deck to PDF with a stand-in slidev command (below) that
+logs every --range it is asked for and renders each page at a size derived
+from the page's source file. Checks:
+
+- export --dry-run on a fresh deck (no .slidev-cache/ yet) lists every page
+- the first export is split into contiguous shards, one slidev call each
+- the stitched PDF has every page in deck order
+- export --dry-run after an unchanged deck reports nothing to re-render
+- inserting an early slide re-renders only the new slide and the slide that
+  shows $page, not every slide after it
+- editing the frontmatter of a src entry in slides.md re-renders that slide
+- a global file showing the page number makes every page position-dependent
+
+Requires pypdf (skipped otherwise).
+
+Usage:
+    python tests/test-export.py
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, run
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# Renders page p of the deck as a blank page whose height is derived from the
+# page's source file (the headmatter for page 1)
+FAKE_SLIDEV = r'''
+import hashlib, os, re, sys
+from pathlib import Path
+from pypdf import PdfWriter
+
+args = sys.argv[1:]
+output = Path(args[args.index('--output') + 1])
+text = Path('slides.md').read_text()
+sources = [text[:text.find('\n---\nsrc:')]] + [Path(src).read_text()
+                                               for src in re.findall(r'^src:\s*\./(.+)$', text, re.M)]
+pages = [int(p) for p in args[args.index('--range') + 1].split(',')]
+with open(os.environ['FAKE_SLIDEV_LOG'], 'a') as log:
+    log.write(','.join(map(str, pages)) + '\n')
+writer = PdfWriter()
+for page in pages:
+    writer.add_blank_page(100, 100 + int(hashlib.sha256(sources[page - 1].encode()).hexdigest(), 16) % 500)
+writer.write(str(output))
+'''
+
+OUTLINE = [{'title': f"Section {i}", 'body': f"Point {i}"} for i in range(19)]
+OUTLINE[8]['body'] = 'Footer: page {{ $page }}'
+
+
+def expected_heights(deck: Path) -> list:
+    """Page heights the stand-in renders for the current deck"""
+    text = (deck / 'slides.md').read_text()
+    sources = [text[:text.find('\n---\nsrc:')]] + [(deck / src).read_text()
+                                                   for src in re.findall(r'^src:\s*\./(.+)$', text, re.M)]
+    return [100 + int(hashlib.sha256(source.encode()).hexdigest(), 16) % 500 for source in sources]
+
+
+def main():
+    if pypdf is None:
+        print("pypdf not installed: skipping the export test")
+        sys.exit(0)
+
+    checks = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = Path(tmp) / 'bin'
+        bin_dir.mkdir()
+        (bin_dir / 'slidev').write_text(f"#!{sys.executable}" + FAKE_SLIDEV)
+        (bin_dir / 'slidev').chmod(0o755)
+        log = Path(tmp) / 'slidev.log'
+        env = dict(os.environ, PATH=f"{bin_dir}{os.pathsep}{os.environ['PATH']}", FAKE_SLIDEV_LOG=str(log))
+
+        deck = Path(tmp) / 'deck'
+        deck.mkdir()
+        create_deck(deck, OUTLINE)
+        pdf = deck / 'exports' / 'slides.pdf'
+
+        def export(what: str, *args: str) -> list:
+            """Run export; returns the --range lists slidev was called with"""
+            log.write_text('')
+            checks.ok(run(deck, 'export', '--workers', '3', *args, env=env), what)
+            return sorted([int(p) for p in line.split(',')] for line in log.read_text().splitlines())
+
+        def dry_run(what: str) -> list:
+            """Run export --dry-run; returns the labels of the pages it would re-render"""
+            result = run(deck, 'export', '--dry-run', env=env)
+            checks.ok(result, what)
+            return re.findall(r'^\s+\d+\s+(\S+)$', result.stdout, re.M)
+
+        def heights() -> list:
+            return [round(float(page.mediabox.height)) for page in pypdf.PdfReader(str(pdf)).pages]
+
+        # As in a fresh clone: the cache directory is not in version control
+        shutil.rmtree(deck / '.slidev-cache')
+        checks.check(len(dry_run("dry run of a fresh deck")) == 20, "fresh deck should re-render every page")
+        calls = export("first export")
+        checks.check(calls == [list(range(1, 8)), list(range(8, 15)), list(range(15, 21))],
+                     f"first export shards: {calls}")
+        checks.check(heights() == expected_heights(deck), "stitched PDF pages out of order")
+
+        checks.check(dry_run("dry run of an unchanged deck") == [], "unchanged deck has stale pages")
+        checks.check(export("export of an unchanged deck") == [], "unchanged deck re-rendered")
+
+        # Everything after slide 3 moves down one page; only new and $page content renders
+        checks.ok(run(deck, 'add', '3', '--title', 'Inserted', '--renumber'), "add")
+        stale = dry_run("dry run after insert")
+        checks.check(stale == ['slides/03-inserted.md', 'slides/11-section-8.md'], f"stale after insert: {stale}")
+        calls = export("export after insert")
+        checks.check(calls == [[3, 11]], f"slidev calls after insert: {calls}")
+        checks.check(heights() == expected_heights(deck), "stitched PDF wrong after insert")
+
+        # Frontmatter of the src entry in slides.md overrides the slide file's
+        text = (deck / 'slides.md').read_text()
+        text = text.replace('---\nsrc: ./slides/05-', '---\nclass: text-center\nsrc: ./slides/05-')
+        (deck / 'slides.md').write_text(text)
+        stale = dry_run("dry run after entry frontmatter edit")
+        checks.check(len(stale) == 1 and stale[0].startswith('slides/05-'), f"stale after entry edit: {stale}")
+        export("export after entry frontmatter edit")
+
+        (deck / 'global-bottom.vue').write_text('<template><div>{{ $nav.currentPage }}</div></template>\n')
+        checks.check(len(dry_run("dry run after global footer")) == 21, "global page number did not reach all pages")
+        export("export with a global page number")
+        checks.ok(run(deck, 'move', '4', '--after', '21'), "move")
+        checks.check(len(dry_run("dry run after move")) == 18, "pages 4-21 should re-render after the move")
+
+    checks.report("export re-renders only pages whose content changed")
+
+
+if __name__ == '__main__':
+    main()
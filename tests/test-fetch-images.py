@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test: Batch Image Fetcher Against a Local Stand-in Server
+
+Starts a keep-alive HTTP/1.1 server on 127.0.0.1 that serves fake images
+(with a small delay per request) and runs scripts/fetch-images.py against it
+with a scratch store and output directory. Checks:
+
+- every image lands in the output directory with the served content
+- connections are pooled: no more than --per-host connections are opened and
+  no more than --per-host requests are ever in flight at once
+- downloads run in parallel (more than one request in flight)
+- 503 responses are retried, redirects followed, 404 and HTML pages fail
+- identical content from different URLs is stored once; decks get copies,
+  so editing an image in place leaves the store alone
+- colliding file names get -2 suffixes, also against existing files with
+  different content, which are never overwritten
+- absolute file names and names with '..' are rejected
+- a second run is served from the store without any request
+- a damaged store object is evicted and downloaded again
+
+Usage:
+    python tests/test-fetch-images.py
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FETCH_IMAGES = Path(__file__).resolve().parent.parent / 'scripts' / 'fetch-images.py'
+PER_HOST = 4
+IMAGES = 16
+DELAY = 0.05
+
+
+def image_bytes(name: str) -> bytes:
+    """Deterministic fake image content"""
+    return b'\x89PNG\r\n\x1a\n' + hashlib.sha256(name.encode()).digest() * 64
+
+
+class StandInState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.flaky_failures = 0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: StandInState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status: int, body: bytes = b'', content_type: str = 'image/png', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            time.sleep(DELAY)
+            path = self.path
+            if path.startswith('/img/') or path.startswith('/dir'):
+                self.send(200, image_bytes(path))
+            elif path in ('/same-a.png', '/same-b.png'):
+                self.send(200, image_bytes('same'))
+            elif path == '/noext':
+                self.send(200, image_bytes(path), 'image/webp')
+            elif path == '/flaky.png':
+                with state.lock:
+                    state.flaky_failures += 1
+                    fail = state.flaky_failures <= 2
+                if fail:
+                    self.send(503, b'busy', 'text/plain', {'Retry-After': '0'})
+                else:
+                    self.send(200, image_bytes(path))
+            elif path == '/redirect':
+                self.send(302, b'', 'text/plain', {'Location': '/img/redirected.png'})
+            elif path == '/page.png':
+                self.send(200, b'<html>login</html>', 'text/html')
+            else:
+                self.send(404, b'not found', 'text/plain')
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+
+def run_fetch(base: str, tmp: Path, lines: list) -> tuple[int, dict]:
+    result = subprocess.run(
+        [sys.executable, str(FETCH_IMAGES), '--json', '--per-host', str(PER_HOST), '--jobs', '8',
+         '--backoff', '0.01', '--store', str(tmp / 'store'), '--output-dir', str(tmp / 'public' / 'images')],
+        input='\n'.join(lines),
+        capture_output=True,
+        text=True
+    )
+    if not result.stdout:
+        raise SystemExit(f"fetch-images.py produced no output: {result.stderr}")
+    return result.returncode, json.loads(result.stdout)
+
+
+def main():
+    state = StandInState()
+    StandInHandler.state = state
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    lines = [f"{base}/img/{i}.png" for i in range(IMAGES)] + [
+        f"{base}/same-a.png",
+        f"{base}/same-b.png",
+        f"{base}/noext",
+        f"{base}/flaky.png",
+        f"{base}/redirect   redirected.png",
+        f"{base}/dir1/photo.png",
+        f"{base}/dir2/photo.png",
+        f"{base}/img/kept.png   kept.png",
+        # Failing entries last; the second run leaves them out
+        f"{base}/missing.png",
+        f"{base}/page.png",
+        f"{base}/img/escape.png   ../escape.png",
+        f"{base}/img/nested-escape.png   sub/../../escape.png",
+    ]
+    failing = 5
+
+    problems = []
+
+    def check(condition: bool, message: str):
+        if not condition:
+            problems.append(message)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        lines.append(f"{base}/img/absolute.png   {tmp}/absolute.png")
+        images = tmp / 'public' / 'images'
+        images.mkdir(parents=True)
+        (images / 'kept.png').write_bytes(b'hand-made image')
+
+        code, data = run_fetch(base, tmp, lines)
+        results = {r['url'].split(base, 1)[1]: r for r in data['results']}
+
+        check(code == 1, f"exit code {code}, expected 1 ({failing} URLs must fail)")
+        check(results['/missing.png'].get('error', '').startswith('HTTP 404'), "404 not reported")
+        check('not an image' in results['/page.png'].get('error', ''), "HTML page not rejected")
+        for path in ('/img/escape.png', '/img/nested-escape.png', '/img/absolute.png'):
+            check('unsafe file name' in results[path].get('error', ''), f"{path} name not rejected: {results[path]}")
+        check(not (tmp / 'public' / 'escape.png').exists() and not (tmp / 'absolute.png').exists(),
+              "file written outside the output directory")
+        check((images / 'kept.png').read_bytes() == b'hand-made image', "existing file overwritten")
+        check((images / 'kept-2.png').exists() and (images / 'kept-2.png').read_bytes() == image_bytes('/img/kept.png'),
+              "kept-2.png not written")
+        for i in range(IMAGES):
+            path = images / f"{i}.png"
+            check(path.exists() and path.read_bytes() == image_bytes(f"/img/{i}.png"), f"{path.name} wrong")
+        check(results['/flaky.png'].get('attempts') == 3, f"flaky.png attempts: {results['/flaky.png']}")
+        check((images / 'redirected.png').read_bytes() == image_bytes('/img/redirected.png'), "redirect not followed")
+        check((images / 'noext.webp').exists(), "extension not derived from Content-Type")
+        check((images / 'photo.png').exists() and (images / 'photo-2.png').exists(), "name collision not resolved")
+
+        check((images / 'same-a.png').read_bytes() == (images / 'same-b.png').read_bytes(),
+              "duplicate content differs")
+        objects = [p for p in (tmp / 'store' / 'objects').rglob('*') if p.is_file()]
+        check(len(objects) == IMAGES + 7, f"{len(objects)} stored objects, expected {IMAGES + 7}")
+
+        check(state.connections <= PER_HOST, f"{state.connections} connections opened, limit {PER_HOST}")
+        check(state.max_in_flight <= PER_HOST, f"{state.max_in_flight} requests in flight, limit {PER_HOST}")
+        check(state.max_in_flight > 1, "downloads did not run in parallel")
+
+        requests = state.requests
+        code, data = run_fetch(base, tmp, lines[:-failing])
+        check(code == 0, f"second run exit code {code}")
+        check(state.requests == requests, f"second run made {state.requests - requests} request(s)")
+        check(all(r['source'] == 'store' for r in data['results']), "second run not served from the store")
+
+        def store_object(url_path: str) -> Path:
+            digest = hashlib.sha256(image_bytes(url_path)).hexdigest()
+            return tmp / 'store' / 'objects' / digest[:2] / digest[2:]
+
+        # A deck editing its image in place must not reach the store
+        with open(images / '0.png', 'r+b') as f:
+            f.write(b'edited')
+        check(store_object('/img/0.png').read_bytes() == image_bytes('/img/0.png'), "in-place edit changed the store")
+
+        # An object damaged before (same size, other content) is downloaded again
+        damaged = store_object('/img/1.png')
+        os.chmod(damaged, 0o644)
+        damaged.write_bytes(bytes(len(image_bytes('/img/1.png'))))
+        (images / '1.png').unlink()
+        requests = state.requests
+        code, data = run_fetch(base, tmp, [f"{base}/img/1.png"])
+        check(code == 0 and data['results'][0]['source'] == 'network', f"damaged object served: {data['results']}")
+        check(state.requests == requests + 1, "damaged object not downloaded again")
+        check((images / '1.png').read_bytes() == image_bytes('/img/1.png'), "damaged content reached the deck")
+        check(damaged.read_bytes() == image_bytes('/img/1.png'), "damaged object not replaced")
+
+        print(f"Requests: {requests}, connections: {state.connections}, max in flight: {state.max_in_flight}")
+
+    server.shutdown()
+
+    if problems:
+        print("\n✗ FAILED")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+
+    print("\n✓ Batch fetcher pools connections, retries, and deduplicates")
+
+
+if __name__ == '__main__':
+    main()
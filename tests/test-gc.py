@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test: Asset Garbage Collection Liveness
+
+Builds a scratch deck (in a git repository) with referenced and stray assets
+and checks what gc reports and deletes:
+
+- directory-level liveness for public/images/<name>/ and diagram sources
+  kept alive by their render directory
+- assets used only by layouts/, components/, styles/ or global Vue files
+  are live
+- assets used only by slides in the undo history are kept (reported as
+  kept_for_undo), so undo after gc --delete never leaves dangling references
+- gc --delete removes tracked files with git rm and untracked ones directly
+- optimize-images, gc --delete, undo leaves the original images in place
+  (skipped without Pillow)
+
+Usage:
+    python tests/test-gc.py
+"""
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, run
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+OUTLINE = [
+    {'title': 'Architecture', 'body': '![arch](/images/architecture/diagram.svg)'},
+    {'title': 'Photo', 'body': '<img src="/images/photo.jpg" />'},
+    {'title': 'Closing', 'body': 'Thanks'},
+]
+
+
+def gc(checks: Checks, deck: Path, *args: str) -> dict:
+    result = run(deck, 'gc', '--json', *args)
+    checks.ok(result, f"gc {' '.join(args)}")
+    return json.loads(result.stdout) if result.returncode == 0 else {'unreferenced': [], 'kept_for_undo': []}
+
+
+def paths(entries: list) -> list:
+    return sorted(entry['path'] for entry in entries)
+
+
+def check_liveness(checks: Checks):
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        images = deck / 'public' / 'images'
+        (images / 'architecture').mkdir(parents=True)
+        (images / 'architecture' / 'diagram.svg').write_text('<svg/>')
+        (images / 'architecture' / 'diagram-dark.svg').write_text('<svg/>')
+        (images / 'old-render').mkdir()
+        (images / 'old-render' / 'diagram.svg').write_text('<svg/>')
+        (images / 'unused.png').write_bytes(b'png')
+        (images / 'photo.jpg').write_bytes(b'jpg')
+        (images / 'background.png').write_bytes(b'png')
+        (images / 'logo.svg').write_text('<svg/>')
+        (images / 'footer.png').write_bytes(b'png')
+        (deck / 'diagrams').mkdir()
+        (deck / 'diagrams' / 'architecture.mmd').write_text('graph TD\n')
+        (deck / 'diagrams' / 'old-render.mmd').write_text('graph TD\n')
+        (deck / 'layouts').mkdir()
+        (deck / 'layouts' / 'hero.vue').write_text('<div style="background: url(/images/background.png)" />\n')
+        (deck / 'components').mkdir()
+        (deck / 'components' / 'Logo.vue').write_text('<img src="/images/logo.svg" />\n')
+        (deck / 'global-bottom.vue').write_text('<img src="/images/footer.png" />\n')
+        create_deck(deck, OUTLINE, use_git=True)
+
+        data = gc(checks, deck)
+        expected = ['diagrams/old-render.mmd', 'public/images/old-render/', 'public/images/unused.png']
+        checks.check(paths(data['unreferenced']) == expected, f"unreferenced: {paths(data['unreferenced'])}")
+        checks.check(data['kept_for_undo'] == [], f"kept for undo: {data['kept_for_undo']}")
+
+        # Deleting the photo slide leaves the photo referenced only by history
+        checks.ok(run(deck, 'delete', '3', '--renumber'), "delete photo slide")
+        data = gc(checks, deck)
+        checks.check(paths(data['unreferenced']) == expected, f"after delete: {paths(data['unreferenced'])}")
+        checks.check(paths(data['kept_for_undo']) == ['public/images/photo.jpg'],
+                     f"kept for undo: {data['kept_for_undo']}")
+
+        data = gc(checks, deck, '--delete')
+        checks.check(not (images / 'unused.png').exists() and not (images / 'old-render').exists(),
+                     "gc --delete left unreferenced assets")
+        for kept in ('background.png', 'logo.svg', 'footer.png', 'architecture/diagram-dark.svg'):
+            checks.check((images / kept).exists(), f"gc --delete removed live {kept}")
+        checks.check((deck / 'diagrams' / 'architecture.mmd').exists(), "gc --delete removed a live diagram")
+        tracked = subprocess.run(['git', 'ls-files', 'public', 'diagrams'], cwd=deck,
+                                 capture_output=True, text=True).stdout.split()
+        checks.check('public/images/unused.png' not in tracked, "deleted file still tracked by git")
+        checks.check((images / 'photo.jpg').exists(), "gc --delete removed an image undo still needs")
+
+        checks.ok(run(deck, 'undo'), "undo delete")
+        checks.check(gc(checks, deck)['unreferenced'] == [], "undo left unreferenced assets behind")
+
+
+def check_optimize_undo(checks: Checks):
+    """optimize-images, gc --delete, undo must not leave dangling references"""
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        images = deck / 'public' / 'images'
+        images.mkdir(parents=True)
+        Image.new('RGB', (2400, 1600), (200, 60, 30)).save(images / 'photo.jpg', quality=95)
+        create_deck(deck, OUTLINE[1:])
+
+        checks.ok(run(deck, 'optimize-images'), "optimize-images")
+        photo_slide = next((deck / 'slides').glob('02-*.md'))
+        checks.check('/images/photo.jpg' not in photo_slide.read_text(), "optimize-images did not rewrite")
+        data = gc(checks, deck, '--delete')
+        checks.check(paths(data['kept_for_undo']) == ['public/images/photo.jpg'],
+                     f"original not kept for undo: {data}")
+        checks.ok(run(deck, 'undo'), "undo optimize-images")
+        checks.check('/images/photo.jpg' in photo_slide.read_text(), "undo did not restore the reference")
+        checks.check((images / 'photo.jpg').exists(), "undo left a dangling reference to photo.jpg")
+
+        cache = json.loads((deck / '.slidev-cache' / 'assets.json').read_text())
+        checks.check(len(cache.get('blobs', {})) > 0, "snapshot references not cached")
+
+
+def main():
+    checks = Checks()
+    check_liveness(checks)
+    if Image is None:
+        print("Pillow not installed: skipping the optimize-images/gc/undo check")
+    else:
+        check_optimize_undo(checks)
+    checks.report("gc keeps everything slides, layouts and undo still use")
+
+
+if __name__ == '__main__':
+    main()
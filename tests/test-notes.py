@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test: Presenter Notes Export/Import Round Trip
+
+Exports the notes of a scratch deck, edits the exported file and imports it
+back. Checks:
+
+- coverage stats: missing and placeholder notes, words, TIMING: totals
+- exporting and importing unchanged notes (Markdown and JSON) rewrites nothing
+- an edited export changes exactly the edited slides, byte for byte elsewhere
+- notes still land on the right slides after the deck was renumbered
+- notes containing '-->' are rejected without touching any file
+
+Usage:
+    python tests/test-notes.py
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, load_script, run, tree
+
+
+def main():
+    checks = Checks()
+    deck_module = load_script('deck')
+
+    outline = [
+        {'title': 'Opening', 'notes': 'Welcome everyone.\nTIMING: 2 min'},
+        {'title': 'Placeholder'},
+        {'title': 'Details', 'notes': 'Walk through the diagram.\n\n- left\n- right\n\nTIMING: 90s'},
+        {'title': 'Silent', 'notes': 'to be removed'},
+        {'title': 'Closing', 'notes': 'Questions?'},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, outline)
+        silent = next((deck / 'slides').glob('05-*.md'))
+        silent.write_text(deck_module.set_slide_notes(silent.read_text(), ''))
+        before = tree(deck)
+
+        result = run(deck, 'notes', 'export', '--format', 'json', '--output', 'notes.json')
+        checks.ok(result, "notes export --format json")
+        data = json.loads((deck / 'notes.json').read_text())
+        stats = data['stats']
+        checks.check(stats['missing'] == [5], f"missing notes: {stats['missing']}")
+        checks.check(stats['placeholder'] == [3], f"placeholder notes: {stats['placeholder']}")
+        checks.check(stats['with_notes'] == 3 and stats['coverage'] == 60.0, f"coverage: {stats}")
+        checks.check(stats['timing_seconds'] == 210, f"timing: {stats['timing_seconds']}s, expected 210s")
+        checks.check(data['slides'][2]['notes'] == outline[2]['notes'], "multi-line notes not exported verbatim")
+
+        # Unchanged round trips rewrite nothing
+        checks.ok(run(deck, 'notes', 'export', '--output', 'notes.md'), "notes export")
+        for name in ('notes.md', 'notes.json'):
+            stats_before = {p.name: p.stat().st_mtime_ns for p in (deck / 'slides').glob('*.md')}
+            result = run(deck, 'notes', 'import', name)
+            checks.ok(result, f"notes import {name}")
+            checks.check('Updated notes on 0 slide(s)' in result.stdout, f"{name}: {result.stdout.strip()}")
+            stats_after = {p.name: p.stat().st_mtime_ns for p in (deck / 'slides').glob('*.md')}
+            checks.check(stats_before == stats_after, f"{name}: unchanged import rewrote files")
+        checks.check(tree(deck) == before, "unchanged round trip altered the deck")
+
+        # Edit two sections of the Markdown export
+        text = (deck / 'notes.md').read_text()
+        text = text.replace('Questions?', 'Questions and answers.\nTIMING: 3 min')
+        text = text.replace('## Slide 5: Silent\n<!-- src: slides/05-silent.md -->\n',
+                            '## Slide 5: Silent\n<!-- src: slides/05-silent.md -->\n\nNow with notes.\n')
+        (deck / 'notes.md').write_text(text)
+
+        # Renumber the deck in between: entries are matched by slug
+        checks.ok(run(deck, 'add', '2', '--title', 'Inserted', '--renumber'), "add")
+        renumbered = tree(deck)
+        result = run(deck, 'notes', 'import', 'notes.md')
+        checks.ok(result, "notes import after edit")
+        checks.check('Updated notes on 2 slide(s)' in result.stdout, f"edited import: {result.stdout.strip()}")
+
+        after = tree(deck)
+        changed = sorted(name for name in after if after[name] != renumbered.get(name))
+        checks.check(changed == ['slides/06-silent.md', 'slides/07-closing.md'], f"changed files: {changed}")
+        checks.check(deck_module.split_slide(after['slides/06-silent.md']).notes == 'Now with notes.',
+                     "notes not added to the slide without notes")
+        checks.check(deck_module.split_slide(after['slides/07-closing.md']).notes
+                     == 'Questions and answers.\nTIMING: 3 min', "edited notes not imported")
+        checks.check(deck_module.split_slide(after['slides/07-closing.md']).body == '# Closing\n\nContent here',
+                     "slide body changed by the import")
+
+        checks.ok(run(deck, 'notes', 'export', '--format', 'json', '--output', 'notes.json'), "second export")
+        stats = json.loads((deck / 'notes.json').read_text())['stats']
+        checks.check(stats['timing_seconds'] == 390, f"timing after edit: {stats['timing_seconds']}s")
+
+        # A notes comment cannot contain its own terminator
+        (deck / 'notes.md').write_text(text.replace('Welcome everyone.', 'Welcome --> everyone.'))
+        result = run(deck, 'notes', 'import', 'notes.md')
+        checks.check(result.returncode == 2, f"'-->' in notes: exit {result.returncode}, expected 2")
+        checks.check(tree(deck) == after, "rejected import changed files")
+
+    checks.report("Presenter notes survive an export/import round trip")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test: Image Optimization Rewrite and Cache
+
+Runs optimize-images against a scratch deck with generated images and checks:
+
+- referenced images get a <name>.opt.<ext> output and slide references are
+  rewritten to it; unreferenced images are left alone
+- an output that is not smaller than its source is discarded and the slide
+  keeps the original
+- a second run is served from .slidev-cache/images.json and rewrites nothing
+- changing a source re-encodes only that image; new settings re-point
+  references from the earlier output to the new one
+- undo restores the original references, --no-rewrite leaves slides alone
+
+Requires Pillow (skipped otherwise).
+
+Usage:
+    python tests/test-optimize-images.py
+"""
+
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, run, tree
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+OUTLINE = [
+    {'title': 'Photo', 'body': '![photo](/images/photo.jpg)'},
+    {'title': 'Chart', 'body': '<img src="/images/charts/chart.png" />'},
+    {'title': 'Icon', 'body': '![icon](/images/icon.webp)'},
+]
+
+
+def optimize(checks: Checks, deck: Path, what: str, *args: str) -> tuple:
+    """Run optimize-images; returns (optimized, unchanged) counts"""
+    result = run(deck, 'optimize-images', *args)
+    checks.ok(result, what)
+    match = re.search(r'Optimizing (\d+) image\(s\), (\d+) unchanged', result.stdout)
+    if not match:
+        checks.check(False, f"{what}: no counts in {result.stdout.strip()!r}")
+        return -1, -1
+    return int(match.group(1)), int(match.group(2))
+
+
+def slide_text(deck: Path, number: int) -> str:
+    return next((deck / 'slides').glob(f"{number:02d}-*.md")).read_text()
+
+
+def main():
+    if Image is None:
+        print("Pillow not installed: skipping the optimize-images test")
+        sys.exit(0)
+
+    checks = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        images = deck / 'public' / 'images'
+        (images / 'charts').mkdir(parents=True)
+        Image.effect_noise((2400, 1600), 80).convert('RGB').save(images / 'photo.jpg', quality=95)
+        Image.new('RGB', (3000, 2000), (20, 120, 220)).save(images / 'charts' / 'chart.png')
+        # Already heavily compressed: re-encoding cannot win, the original stays in use
+        Image.effect_noise((64, 64), 80).convert('RGB').save(images / 'icon.webp', quality=5)
+        Image.new('RGB', (800, 600)).save(images / 'unused.png')
+        create_deck(deck, OUTLINE)
+
+        counts = optimize(checks, deck, "first optimize-images")
+        checks.check(counts == (3, 0), f"first run: {counts}")
+        checks.check('/images/photo.opt.webp' in slide_text(deck, 2), "photo reference not rewritten")
+        checks.check('/images/charts/chart.opt.webp' in slide_text(deck, 3), "chart reference not rewritten")
+        checks.check('/images/icon.webp' in slide_text(deck, 4), "icon should keep its original")
+        checks.check(not (images / 'icon.opt.webp').exists(), "larger output not discarded")
+        checks.check(not (images / 'unused.opt.webp').exists(), "unreferenced image optimized")
+        checks.check((images / 'photo.jpg').exists(), "original removed")
+        with Image.open(images / 'photo.opt.webp') as img:
+            checks.check(img.size == (1620, 1080), f"photo not resized to fit 1920x1080: {img.size}")
+
+        manifest = json.loads((deck / '.slidev-cache' / 'images.json').read_text())
+        checks.check(sorted(manifest['outputs']) ==
+                     ['images/charts/chart.opt.webp', 'images/icon.opt.webp', 'images/photo.opt.webp'],
+                     f"manifest outputs: {sorted(manifest['outputs'])}")
+        checks.check(manifest['outputs']['images/icon.opt.webp'].get('kept_original'), "icon not kept original")
+
+        # Second run: everything served from the manifest, no file touched
+        before = tree(deck)
+        counts = optimize(checks, deck, "cached optimize-images")
+        checks.check(counts == (0, 3), f"cached run: {counts}")
+        checks.check(tree(deck) == before, "cached run rewrote slides")
+
+        # A changed source is the only one re-encoded
+        Image.effect_noise((2000, 2000), 60).convert('RGB').save(images / 'photo.jpg', quality=95)
+        counts = optimize(checks, deck, "optimize-images after source change")
+        checks.check(counts == (1, 2), f"after source change: {counts}")
+
+        # New settings: references move from the earlier outputs to the new ones
+        counts = optimize(checks, deck, "optimize-images --format auto", '--format', 'auto', '--quality', '70')
+        checks.check(counts == (3, 0), f"new settings: {counts}")
+        photo = slide_text(deck, 2)
+        checks.check('/images/photo.opt.jpg' in photo and '.opt.webp' not in photo, f"photo slide: {photo!r}")
+        checks.check('/images/charts/chart.opt.png' in slide_text(deck, 3), "chart not re-pointed")
+        checks.check((images / 'photo.opt.webp').exists(), "earlier output removed while undo may need it")
+
+        # Only the first run and the settings change rewrote slides
+        checks.ok(run(deck, 'undo', '--steps', '2'), "undo both rewrites")
+        checks.check('/images/photo.jpg' in slide_text(deck, 2), "undo did not restore photo reference")
+        checks.check('/images/charts/chart.png' in slide_text(deck, 3), "undo did not restore chart reference")
+
+        before = tree(deck)
+        counts = optimize(checks, deck, "optimize-images --no-rewrite", '--no-rewrite',
+                          '--format', 'auto', '--quality', '70')
+        checks.check(counts == (0, 3), f"--no-rewrite run: {counts}")
+        checks.check(tree(deck) == before, "--no-rewrite changed slides")
+
+    checks.report("optimize-images rewrites references and re-encodes only what changed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test: Outline Extraction and Its Per-Slide Cache
+
+Runs the outline command repeatedly against a scratch deck and checks:
+
+- the scan picks up layout, headings, bullets, code blocks and TIMING:
+- a second run is served from .slidev-cache/outline-cache.json and renders
+  the same outline as a fresh scan
+- editing one slide re-scans only that slide; moving slides re-scans none
+- cache entries of removed slides are dropped, a corrupt cache is ignored
+
+Usage:
+    python tests/test-outline.py
+"""
+
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, run
+
+OUTLINE = [
+    {'title': 'Why Schedulers', 'layout': 'center', 'body': '- latency\n- fairness\n  - per tenant'},
+    {'title': 'Architecture', 'body': '```mermaid\ngraph LR\n  A --> B\n```', 'notes': 'Point at B.\nTIMING: 2 min'},
+    {'title': 'Queues', 'body': '1. admit\n2. bind'},
+    {'title': 'Backup: Numbers', 'body': '![chart](/images/chart.png)'},
+]
+
+
+def outline(checks: Checks, deck: Path, what: str) -> tuple:
+    """Run outline --format json; returns (parsed outline, scanned, cached)"""
+    result = run(deck, 'outline', '--format', 'json', '--output', 'outline.json')
+    checks.ok(result, what)
+    match = re.search(r'\((\d+) scanned, (\d+) cached\)', result.stdout)
+    if not match:
+        checks.check(False, f"{what}: no cache stats in {result.stdout.strip()!r}")
+        return {}, -1, -1
+    return json.loads((deck / 'outline.json').read_text()), int(match.group(1)), int(match.group(2))
+
+
+def main():
+    checks = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, OUTLINE)
+        cache_file = deck / '.slidev-cache' / 'outline-cache.json'
+
+        data, scanned, cached = outline(checks, deck, "first outline")
+        checks.check((scanned, cached) == (4, 0), f"first run: {scanned} scanned, {cached} cached")
+        slides = {s['number']: s for s in data['slides']}
+        checks.check(slides[2]['layout'] == 'center', f"layout: {slides[2]['layout']}")
+        checks.check([b['depth'] for b in slides[2]['bullets']] == [0, 0, 1], f"bullets: {slides[2]['bullets']}")
+        checks.check(slides[3]['code_blocks'] == [{'lang': 'mermaid', 'lines': 2}],
+                     f"code blocks: {slides[3]['code_blocks']}")
+        checks.check(slides[3]['timing'] == 120, f"timing: {slides[3]['timing']}")
+        checks.check(slides[5]['images'] == 1, f"images: {slides[5]['images']}")
+        checks.check([s['backup'] for s in data['sections']][-1], "backup section not detected")
+
+        again, scanned, cached = outline(checks, deck, "cached outline")
+        checks.check((scanned, cached) == (0, 4), f"second run: {scanned} scanned, {cached} cached")
+        checks.check(again == data, "cached outline differs from the first scan")
+
+        # Edit one slide: only it is re-scanned
+        queues = next((deck / 'slides').glob('04-*.md'))
+        queues.write_text(queues.read_text().replace('2. bind', '2. bind\n\n## Preemption'))
+        edited, scanned, cached = outline(checks, deck, "outline after edit")
+        checks.check((scanned, cached) == (1, 3), f"after edit: {scanned} scanned, {cached} cached")
+        headings = [h['text'] for h in next(s for s in edited['slides'] if s['number'] == 4)['headings']]
+        checks.check(headings == ['Queues', 'Preemption'], f"edited headings: {headings}")
+
+        # Moving renames files but keeps contents: nothing to re-scan
+        checks.ok(run(deck, 'move', '5', '--after', '1'), "move")
+        moved, scanned, cached = outline(checks, deck, "outline after move")
+        checks.check((scanned, cached) == (0, 4), f"after move: {scanned} scanned, {cached} cached")
+        checks.check([s['title'] for s in moved['slides']][0] == 'Backup: Numbers', "move not reflected")
+
+        # A fresh scan renders exactly what the cache served
+        shutil.rmtree(deck / '.slidev-cache')
+        fresh, scanned, _ = outline(checks, deck, "outline without cache")
+        checks.check(scanned == 4 and fresh == moved, "cached outline differs from a fresh scan")
+
+        checks.ok(run(deck, 'delete', '3', '--renumber'), "delete")
+        outline(checks, deck, "outline after delete")
+        entries = json.loads(cache_file.read_text())['slides']
+        checks.check(len(entries) == 3, f"{len(entries)} cache entries for 3 slides")
+
+        cache_file.write_text('{not json')
+        _, scanned, cached = outline(checks, deck, "outline with corrupt cache")
+        checks.check((scanned, cached) == (3, 0), f"corrupt cache: {scanned} scanned, {cached} cached")
+
+    checks.report("Outline cache re-scans only changed slides")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test: Slide Search Index
+
+Indexes scratch decks and runs queries through SlideIndex and the search
+command. Checks:
+
+- ranking: title matches above body matches above notes matches, more
+  matched query terms first, ties in slide order
+- quoted phrases must match consecutively within one field
+- the index is updated incrementally: unchanged slides are not re-read,
+  edited, renamed (title comment only) and removed slides are
+- a query reads only the postings of its own terms
+- a corrupt index file is rebuilt, concurrent searches update it safely
+- --workspace searches several decks
+
+Usage:
+    python tests/test-search.py
+"""
+
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from helpers import MANAGE_SLIDES, Checks, create_deck, load_script, run
+
+OUTLINE = [
+    {'title': 'GPU Scheduling', 'body': 'Placement of pods on nodes', 'notes': 'Intro'},
+    {'title': 'Device Plugins', 'body': 'A device plugin exposes the GPU to the kubelet'},
+    {'title': 'Queues', 'body': 'Plugin device ordering', 'notes': 'Mention the GPU shortage'},
+    {'title': 'Summary', 'body': 'Nothing to see'},
+]
+
+
+def titles(results: list) -> list:
+    return [result['title'] for result in results]
+
+
+def main():
+    checks = Checks()
+    search_index = load_script('search_index')
+    deck_module = load_script('deck')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, OUTLINE)
+        manager = deck_module.SlideManager(deck / 'slides.md')
+
+        def index() -> object:
+            return search_index.SlideIndex(manager)
+
+        first = index()
+        checks.check(first.update() == (4, 0), "first update should index all 4 slides")
+        # Title beats body beats notes; matching more terms beats a title hit
+        expected = {
+            'gpu': ['GPU Scheduling', 'Device Plugins', 'Queues'],
+            'device plugin': ['Device Plugins', 'Queues'],
+            '"device plugin"': ['Device Plugins'],
+            'kubelet gpu': ['Device Plugins', 'GPU Scheduling', 'Queues'],
+        }
+        for query, ranking in expected.items():
+            found = titles(first.search(query))
+            checks.check(found == ranking, f"{query}: {found}, expected {ranking}")
+        checks.check(first.search('nonexistent') == [] and first.search('  ') == [], "empty queries matched")
+        first.close()
+
+        # Unchanged deck: nothing is re-read
+        second = index()
+        checks.check(second.update() == (0, 0), "unchanged deck re-indexed")
+
+        # Only the postings of the query terms are read
+        statements = []
+        second.db.set_trace_callback(statements.append)
+        second.search('placement')
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        checks.check(len(selects) == 1 and 'WHERE term IN' in selects[0], f"search queries: {selects}")
+        second.close()
+
+        # Edit one slide, rename another's title comment, remove a third
+        queues = next((deck / 'slides').glob('04-*.md'))
+        queues.write_text(queues.read_text().replace('Plugin device ordering', 'Fair sharing'))
+        text = (deck / 'slides.md').read_text().replace('<!-- Slide 5: Summary -->', '<!-- Slide 5: Wrap-up -->')
+        (deck / 'slides.md').write_text(text)
+        checks.ok(run(deck, 'delete', '2'), "delete")
+
+        third = index()
+        reindexed, removed = third.update()
+        checks.check((reindexed, removed) == (1, 1), f"after edits: {reindexed} re-indexed, {removed} removed")
+        found = titles(third.search('device'))
+        checks.check(found == ['Device Plugins'], f"device after edit: {found}")
+        checks.check(titles(third.search('wrap')) == ['Wrap-up'], "renamed title not re-indexed")
+        checks.check(third.search('placement') == [], "removed slide still found")
+        rows = third.db.execute('SELECT COUNT(*) FROM postings WHERE src LIKE ?', ('%gpu-scheduling%',)).fetchone()
+        checks.check(rows[0] == 0, "postings of the removed slide left behind")
+        third.close()
+
+        # A corrupt index is rebuilt instead of failing the search
+        index_file = deck / '.slidev-cache' / 'search-index.sqlite'
+        index_file.write_bytes(b'not a database')
+        result = run(deck, 'search', 'gpu', '--json')
+        checks.ok(result, "search with a corrupt index")
+        results = json.loads(result.stdout) if result.returncode == 0 else []
+        checks.check(titles(results) == ['Device Plugins', 'Queues'], f"search after corrupt index: {results}")
+        with sqlite3.connect(index_file) as db:
+            checks.check(db.execute('SELECT COUNT(*) FROM docs').fetchone()[0] == 3, "index not rebuilt")
+
+        # Concurrent first searches build the index once, one writer at a time
+        shutil.rmtree(deck / '.slidev-cache')
+        processes = [subprocess.Popen([sys.executable, str(MANAGE_SLIDES), 'search', 'gpu', '--json'], cwd=deck,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                     for _ in range(6)]
+        outputs = [process.communicate() for process in processes]
+        failed = [stderr.strip().splitlines()[-1] for _, stderr in outputs if stderr.strip()]
+        checks.check(not failed, f"concurrent searches failed: {failed}")
+        checks.check(len({stdout for stdout, _ in outputs}) == 1, "concurrent searches disagree")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        for name, outline in (('alpha', OUTLINE[:2]), ('beta', OUTLINE[2:])):
+            (workspace / name).mkdir()
+            create_deck(workspace / name, outline)
+        result = run(workspace, 'search', 'gpu', '--workspace', '.', '--json')
+        checks.ok(result, "search --workspace")
+        results = json.loads(result.stdout) if result.returncode == 0 else []
+        checks.check([(r['deck'], r['title']) for r in results] ==
+                     [('alpha', 'GPU Scheduling'), ('alpha', 'Device Plugins'), ('beta', 'Queues')],
+                     f"workspace results: {results}")
+        checks.check(all((workspace / name / '.slidev-cache' / 'search-index.sqlite').exists()
+                         for name in ('alpha', 'beta')), "per-deck indexes not written")
+
+    checks.report("Search index ranks, updates incrementally and reads only queried postings")
+
+
+if __name__ == '__main__':
+    main()
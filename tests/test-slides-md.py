@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test: slides.md Preamble and Entry Handling
+
+Runs operations against hand-written slides.md files and checks:
+
+- a src entry with other frontmatter keys before src: is an entry, not part
+  of the preamble: rebuilding slides.md does not duplicate it, and bundle
+  and export read the same preamble
+- other keys of src entries (layout:, class:) survive add, renumber and move
+- the global frontmatter and a global <style> block survive rebuilds
+- scaffold enforces the same 99-slide limit as add, before writing anything
+- scaffold quotes the deck title of a fresh deck and rejects a multi-line
+  layout without leaving a slides.md behind
+
+Usage:
+    python tests/test-slides-md.py
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, list_slides, load_script, run
+
+PREAMBLE = """---
+theme: default
+title: Preamble Test
+---
+
+<style>
+h1 { color: teal; }
+</style>
+"""
+
+ENTRIES = """
+---
+layout: center
+src: ./slides/02-alpha.md
+---
+<!-- Slide 2: Alpha -->
+
+---
+src: ./slides/03-beta.md
+class: text-right
+---
+<!-- Slide 3: Beta -->
+"""
+
+
+def write_deck(deck: Path):
+    (deck / 'slides').mkdir()
+    (deck / 'slides' / '02-alpha.md').write_text("---\nlayout: default\n---\n\n# Alpha\n")
+    (deck / 'slides' / '03-beta.md').write_text("---\nlayout: default\n---\n\n# Beta\n")
+    (deck / 'slides.md').write_text(PREAMBLE + ENTRIES)
+
+
+def main():
+    checks = Checks()
+    deck_module = load_script('deck')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        write_deck(deck)
+
+        manager = deck_module.SlideManager(deck / 'slides.md')
+        preamble = manager.read_preamble()
+        checks.check(preamble.rstrip('\n') == PREAMBLE.rstrip('\n'), f"preamble: {preamble!r}")
+
+        checks.ok(run(deck, 'add', '4', '--title', 'Gamma'), "add")
+        checks.ok(run(deck, 'renumber'), "renumber")
+        slides = list_slides(deck)
+        numbers = [s['number'] for s in slides]
+        srcs = [s['src'] for s in slides]
+        checks.check(numbers == [2, 3, 4], f"slide numbers after add/renumber: {numbers}")
+        checks.check(len(set(srcs)) == len(srcs), f"slides listed twice: {srcs}")
+
+        text = (deck / 'slides.md').read_text()
+        checks.check(text.startswith(PREAMBLE), "preamble not preserved")
+        checks.check(text.count('<style>') == 1 and text.count('theme: default') == 1, "preamble duplicated")
+        checks.check(text.count('02-alpha.md') == 1, "entry copied into the preamble")
+        keys = {s.src: s.frontmatter for s in manager.parse_slides_md()}
+        checks.check(keys == {'slides/02-alpha.md': 'layout: center', 'slides/03-beta.md': 'class: text-right',
+                              'slides/04-gamma.md': ''}, f"entry keys after add/renumber: {keys}")
+
+        checks.ok(run(deck, 'move', '2', '--after', '3'), "move")
+        keys = {s.title: s.frontmatter for s in manager.parse_slides_md()}
+        checks.check(keys['Alpha'] == 'layout: center' and keys['Beta'] == 'class: text-right',
+                     f"entry keys after move: {keys}")
+
+        checks.ok(run(deck, 'bundle'), "bundle")
+        bundled = (deck / 'slides.bundled.md').read_text()
+        checks.check(bundled.count('<!-- Slide 3: Alpha -->') == 1, "bundle repeated the moved slide")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        outline = deck / 'outline.json'
+        outline.write_text(json.dumps({'title': 'Kubernetes: Deep Dive', 'slides': [{'title': 'One'}]}))
+        checks.ok(run(deck, 'scaffold', '--from', outline.name), "scaffold a fresh deck")
+        headmatter = (deck / 'slides.md').read_text().split('---\n')[1]
+        checks.check('title: "Kubernetes: Deep Dive"\n' in headmatter, f"deck title not quoted: {headmatter!r}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        outline = deck / 'outline.json'
+        outline.write_text(json.dumps([{'title': 'One'}, {'title': 'Two', 'layout': 'center\nhide: true'}]))
+        result = run(deck, 'scaffold', '--from', outline.name)
+        checks.check(result.returncode == 2, f"multi-line layout: exit {result.returncode}, expected 2")
+        checks.check(not (deck / 'slides.md').exists(), "rejected scaffold left a slides.md behind")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, [{'title': f"Topic {i}"} for i in range(90)])
+        before = (deck / 'slides.md').read_text()
+
+        outline = deck / 'more.json'
+        outline.write_text(json.dumps([{'title': f"More {i}"} for i in range(10)]))
+        result = run(deck, 'scaffold', '--from', outline.name, '--append')
+        checks.check(result.returncode == 2, f"scaffold past 99 slides: exit {result.returncode}, expected 2")
+        checks.check('Maximum 99 slides' in result.stderr, f"scaffold limit message: {result.stderr.strip()}")
+        checks.check((deck / 'slides.md').read_text() == before, "rejected scaffold changed slides.md")
+        checks.check(len(list((deck / 'slides').glob('*.md'))) == 90, "rejected scaffold wrote files")
+
+        outline.write_text(json.dumps([{'title': f"More {i}"} for i in range(9)]))
+        checks.ok(run(deck, 'scaffold', '--from', outline.name, '--append'), "scaffold up to 99 slides")
+        result = run(deck, 'add', '2', '--title', 'One too many', '--renumber')
+        checks.check(result.returncode == 2, f"add past 99 slides: exit {result.returncode}, expected 2")
+
+    checks.report("slides.md entries and preamble are told apart")
+
+
+if __name__ == '__main__':
+    main()
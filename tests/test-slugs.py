@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test: Slug Engine Matches the Former Shell Implementation
+
+create-diagram-slug.sh used to build diagram slugs with a tr/sed/cut
+pipeline; it now delegates to slugs.py. This test runs the original pipeline
+(kept verbatim below) next to slugs.py and the wrapper script and checks:
+
+- diagram slugs are identical for every title, with and without a slide number
+- the wrapper passes titles starting with '-' through as titles
+- --unique resolves collisions against the deck and within a batch
+
+Usage:
+    python tests/test-slugs.py
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from helpers import SCRIPTS_DIR, Checks
+
+# create_slug() from the shell version of create-diagram-slug.sh
+LEGACY_PIPELINE = r'''
+title="$1"
+slide_num="$2"
+title=$(echo "$title" | tr '[:upper:]' '[:lower:]')
+title=$(echo "$title" | sed -E '
+    s/\b(the|a|an|and|or|but|in|on|at|to|for|of|with|by|from|into|onto)\b//gi
+')
+title=$(echo "$title" | sed 's/[^a-z0-9]/-/g')
+title=$(echo "$title" | sed 's/-\+/-/g')
+title=$(echo "$title" | sed 's/^-//;s/-$//')
+title=$(echo "$title" | cut -d'-' -f1-4 | cut -c1-30)
+title=$(echo "$title" | sed 's/-$//')
+if [[ -n "$slide_num" ]]; then
+    echo "slide-${slide_num}-${title}"
+else
+    echo "$title"
+fi
+'''
+
+TITLES = [
+    "Device Plugins Turn GPUs Into Schedulable Resources",
+    "21. Device Plugins Turn GPUs Into Schedulable Resources",
+    "The Art of War",
+    "A an the",
+    "Kubernetes: scheduling_on GPUs (v1.28) & beyond!!",
+    "  leading spaces and trailing   ",
+    "onto into from by with",
+    "Averyveryverylongwordthatexceedsthirtycharacters and more",
+    "Theory of Operation: Thermal Management",
+    "Why Andromeda Orbits Into Onto-Fortran",
+    "CI/CD -- from commit to prod",
+    "100% uptime? 99.99% SLOs",
+]
+
+
+def legacy_slug(title: str, number: str = '') -> str:
+    result = subprocess.run(['bash', '-c', LEGACY_PIPELINE, 'legacy', title, number],
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def slugs_py(*args: str, input: str = None, cwd: Path = None) -> list:
+    result = subprocess.run([sys.executable, str(SCRIPTS_DIR / 'slugs.py'), *args],
+                            input=input, capture_output=True, text=True, check=True, cwd=cwd)
+    return result.stdout.splitlines()
+
+
+def main():
+    checks = Checks()
+
+    # One batch call per policy variant, numbers given as "N<TAB>title"
+    plain = slugs_py('--policy', 'diagram', input='\n'.join(TITLES))
+    numbered = slugs_py('--policy', 'diagram', input='\n'.join(f"{i + 2}\t{t}" for i, t in enumerate(TITLES)))
+
+    for i, title in enumerate(TITLES):
+        expected = legacy_slug(title)
+        checks.check(plain[i] == expected, f"{title!r}: slugs.py {plain[i]!r}, shell {expected!r}")
+        expected = legacy_slug(title, str(i + 2))
+        checks.check(numbered[i] == expected, f"{title!r} #{i + 2}: slugs.py {numbered[i]!r}, shell {expected!r}")
+
+    wrapper = SCRIPTS_DIR / 'create-diagram-slug.sh'
+    for title, number in [(TITLES[0], '21'), (TITLES[4], ''), ('-v Verbose Mode', '3')]:
+        result = subprocess.run(['bash', str(wrapper), title, number], capture_output=True, text=True)
+        expected = legacy_slug(title, number)
+        checks.check(result.stdout.strip() == expected,
+                     f"wrapper {title!r}: {result.stdout.strip() or result.stderr.strip()!r}, shell {expected!r}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        (deck / 'slides').mkdir()
+        (deck / 'slides' / '02-intro.md').write_text('# Intro\n')
+        (deck / 'diagrams').mkdir()
+        (deck / 'diagrams' / 'architecture.mmd').write_text('graph TD\n')
+        unique = slugs_py('--unique', input='Intro\nArchitecture\nIntro\nSummary\n', cwd=deck)
+        checks.check(unique == ['intro-2', 'architecture-2', 'intro-3', 'summary'], f"--unique gave {unique}")
+
+    checks.report("slugs.py reproduces the shell diagram slugs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test: Undo/Redo Snapshot History
+
+Runs operations, undo and redo against a scratch deck and checks:
+
+- undo and redo restore the exact deck state of each snapshot
+- a new operation after an undo discards the redo branch without losing
+  its own snapshot (snapshot ids are never reused), and can be undone
+- every snapshot listed in history.json has its manifest and blobs on disk
+
+Usage:
+    python tests/test-snapshots.py
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from helpers import Checks, create_deck, list_slides, run, tree
+
+
+def check_store(checks: Checks, deck: Path):
+    """Every listed snapshot must have its manifest and blobs"""
+    history_dir = deck / '.slidev-history'
+    history = json.loads((history_dir / 'history.json').read_text())
+    for entry in history['entries']:
+        manifest_path = history_dir / 'snapshots' / f"{entry['id']:06d}.json"
+        if not manifest_path.exists():
+            checks.check(False, f"snapshot {entry['id']} ({entry['operation']}) has no manifest")
+            continue
+        manifest = json.loads(manifest_path.read_text())
+        for digest in [manifest['slides_md']] + [s[2] for s in manifest['slides']]:
+            checks.check((history_dir / 'objects' / digest[:2] / digest[2:]).exists(),
+                         f"snapshot {entry['id']} is missing blob {digest[:12]}")
+
+
+def main():
+    checks = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = Path(tmp)
+        create_deck(deck, [{'title': f"Topic {i}", 'body': f"- point {i}"} for i in range(5)])
+        scaffolded = tree(deck)
+
+        checks.ok(run(deck, 'delete', '3', '--renumber'), "delete")
+        deleted = tree(deck)
+        checks.ok(run(deck, 'undo'), "undo delete")
+        checks.check(tree(deck) == scaffolded, "undo did not restore the scaffolded deck")
+
+        # Recording after an undo drops the redo entry; the new snapshot must survive
+        checks.ok(run(deck, 'add', '4', '--title', 'Inserted', '--renumber'), "add after undo")
+        added = tree(deck)
+        check_store(checks, deck)
+        checks.check(any(s['title'] == 'Inserted' for s in list_slides(deck)), "added slide not listed")
+
+        history = run(deck, 'history')
+        checks.ok(history, "history")
+        checks.check('delete' not in history.stdout, "dropped redo entry still listed")
+        checks.check('can be redone' not in history.stdout, "redo branch not discarded")
+
+        checks.ok(run(deck, 'undo'), "undo add")
+        checks.check(tree(deck) == scaffolded, "undoing the add did not restore the scaffolded deck")
+        checks.ok(run(deck, 'redo'), "redo add")
+        checks.check(tree(deck) == added, "redo did not restore the added slide")
+        checks.check(tree(deck) != deleted, "redo brought back the discarded delete")
+
+        # Several rounds of undo followed by a new operation
+        for i in range(3):
+            checks.ok(run(deck, 'undo'), f"undo round {i}")
+            checks.ok(run(deck, 'add', '2', '--title', f"Round {i}", '--renumber'), f"add round {i}")
+        check_store(checks, deck)
+        checks.ok(run(deck, 'undo', '--steps', '1'), "final undo")
+        check_store(checks, deck)
+
+    checks.report("Undo history survives new operations after an undo")
+
+
+if __name__ == '__main__':
+    main()